@@ -1,6 +1,9 @@
 # inventario/admin.py
 from django.contrib import admin
-from .models import Sucursal, Perfil, Caja, Venta, Producto
+from .models import (
+    Sucursal, Perfil, Caja, Venta, Producto, ReporteJob, Ticket, Transferencia, TransferenciaLinea,
+    MovimientoStock,
+)
 
 
 @admin.register(Sucursal)
@@ -18,7 +21,8 @@ class PerfilAdmin(admin.ModelAdmin):
 
 @admin.register(Caja)
 class CajaAdmin(admin.ModelAdmin):
-    list_display = ('sucursal', 'fecha', 'estado', 'apertura_monto', 'cierre_monto')
+    list_display = ('sucursal', 'fecha', 'estado', 'apertura_monto', 'total_vendido', 'num_ventas', 'cierre_monto')
+    readonly_fields = ('total_vendido', 'num_items', 'num_ventas')
     list_filter = ('estado', 'sucursal', 'fecha')
     search_fields = ('sucursal__nombre',)
     date_hierarchy = 'fecha'
@@ -32,8 +36,69 @@ class VentaAdmin(admin.ModelAdmin):
     date_hierarchy = 'creado_en'
 
 
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ('id', 'caja', 'usuario', 'total', 'creado_en')
+    list_filter = ('caja__sucursal',)
+    date_hierarchy = 'creado_en'
+
+
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'sucursal', 'precio', 'stock', 'fecha_creacion')
+    list_display = ('nombre', 'codigo', 'sucursal', 'precio', 'stock', 'punto_reorden', 'fecha_creacion')
     list_filter = ('sucursal',)
-    search_fields = ('nombre', 'descripcion')
+    search_fields = ('nombre', 'codigo', 'descripcion')
+
+
+@admin.register(ReporteJob)
+class ReporteJobAdmin(admin.ModelAdmin):
+    list_display = ('formato', 'desde', 'hasta', 'sucursal', 'usuario', 'estado', 'creado_en', 'terminado_en')
+    list_filter = ('estado', 'formato')
+    search_fields = ('usuario__username',)
+
+
+class TransferenciaLineaInline(admin.TabularInline):
+    model = TransferenciaLinea
+    extra = 0
+    raw_id_fields = ('producto_origen', 'producto_destino')
+    can_delete = False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Transferencia)
+class TransferenciaAdmin(admin.ModelAdmin):
+    """Solo lectura: el stock se mueve al crearlas con transferencias.transferir()."""
+    list_display = ('id', 'origen', 'destino', 'usuario', 'creado_en')
+    list_filter = ('origen', 'destino')
+    date_hierarchy = 'creado_en'
+    inlines = [TransferenciaLineaInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MovimientoStock)
+class MovimientoStockAdmin(admin.ModelAdmin):
+    """Solo lectura: el libro solo crece con los cambios de stock (ver movimientos.py)."""
+    list_display = ('creado_en', 'producto', 'tipo', 'cantidad', 'referencia')
+    list_filter = ('tipo', 'producto__sucursal')
+    search_fields = ('producto__nombre', 'producto__codigo', 'referencia')
+    date_hierarchy = 'creado_en'
+    list_select_related = ('producto',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,19 @@
+# inventario/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class PerfilBackend(ModelBackend):
+    """
+    ModelBackend que carga el usuario de la sesión con su Perfil y la sucursal
+    del perfil en la misma consulta (JOIN), así request.user.perfil no dispara
+    otra consulta en cada request (ver permissions.principal).
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('perfil', 'perfil__sucursal').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
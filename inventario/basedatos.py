@@ -0,0 +1,64 @@
+# inventario/basedatos.py
+"""
+Ajustes por conexión según el perfil de base de datos (ver INVENTARIO_DB en
+settings). Se aplican desde la señal connection_created (signals.py).
+
+SQLite, pensado para varias cajas registrando ventas a la vez:
+  - journal_mode=WAL: los lectores no bloquean al escritor ni al revés.
+  - synchronous=NORMAL: con WAL solo sincroniza en los checkpoints; una caída
+    del equipo puede perder las últimas transacciones, no corromper la base.
+  - mmap_size: lecturas por memoria mapeada.
+settings.INVENTARIO_SQLITE_PRAGMAS permite cambiar o agregar valores. La espera
+por el lock de escritura es OPTIONS['timeout'] de la base (busy_timeout).
+"""
+from pathlib import Path
+
+from django.conf import settings
+
+PRAGMAS_SQLITE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def pragmas_sqlite():
+    return {**PRAGMAS_SQLITE, **getattr(settings, 'INVENTARIO_SQLITE_PRAGMAS', {})}
+
+
+def configurar(connection):
+    if connection.vendor != 'sqlite' or not getattr(settings, 'INVENTARIO_SQLITE_AJUSTES', True):
+        return
+    with connection.cursor() as cur:
+        for nombre, valor in pragmas_sqlite().items():
+            cur.execute(f"PRAGMA {nombre} = {valor}")
+
+
+def es_desechable(connection):
+    """
+    True si la base activa es de pruebas: SQLite en memoria o cuyo archivo empieza
+    por test/bench, o PostgreSQL con nombre test_*/bench_*. Los benchmarks que
+    confirman datos desde varios hilos (no pueden revertirlos en una transacción)
+    solo corren sobre una de estas, p. ej. una copia en SQLITE_PATH=/tmp/bench.sqlite3.
+    """
+    nombre = str(connection.settings_dict['NAME'])
+    if connection.vendor == 'sqlite':
+        return connection.is_in_memory_db() or Path(nombre).name.startswith(('test', 'bench'))
+    return nombre.startswith(('test_', 'bench_'))
+
+
+def perfil(connection):
+    """Descripción corta del perfil activo (para benchmarks y diagnósticos)."""
+    if connection.vendor != 'sqlite':
+        ajustes = connection.settings_dict
+        pool = 'pool' in ajustes.get('OPTIONS', {})
+        return f"{connection.vendor} (CONN_MAX_AGE={ajustes['CONN_MAX_AGE']}, pool={'sí' if pool else 'no'})"
+    with connection.cursor() as cur:
+        valores = {}
+        for nombre in ('journal_mode', 'synchronous', 'busy_timeout'):
+            cur.execute(f"PRAGMA {nombre}")
+            valores[nombre] = cur.fetchone()[0]
+    modo = connection.settings_dict.get('OPTIONS', {}).get('transaction_mode', 'DEFERRED')
+    return (f"sqlite (journal_mode={valores['journal_mode']}, synchronous={valores['synchronous']}, "
+            f"busy_timeout={valores['busy_timeout']}, transaction_mode={modo})")
@@ -0,0 +1,128 @@
+# inventario/busqueda.py
+"""
+Búsqueda de productos con un índice FTS5 de SQLite.
+
+La tabla virtual inventario_producto_fts guarda (nombre, descripcion,
+sucursal) con rowid = id del producto. Se crea en la migración 0012 (que
+lleva su propia copia del SQL, así los cambios de aquí no la alteran) y se
+mantiene con señales de Producto/Sucursal (ver signals.py); las cargas
+masivas deben llamar a indexar() o al comando reindexar_productos.
+En otras bases de datos se usa el filtro icontains de siempre.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLA = 'inventario_producto_fts'
+
+SQL_CREAR = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLA} USING fts5("
+    "nombre, descripcion, sucursal, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+)
+
+# Pesos de bm25 por columna: el nombre pesa más que la descripción
+RANGO = f"bm25({FTS_TABLA}, 10.0, 2.0, 1.0)"
+
+_SQL_INSERTAR = (
+    f"INSERT INTO {FTS_TABLA} (rowid, nombre, descripcion, sucursal) "
+    "SELECT p.id, p.nombre, p.descripcion, s.nombre "
+    "FROM inventario_producto p JOIN inventario_sucursal s ON s.id = p.sucursal_id "
+)
+
+_disponible = None
+
+
+def disponible():
+    """True si la BD es SQLite y la tabla FTS existe (se consulta hasta encontrarla)."""
+    global _disponible
+    if connection.vendor != 'sqlite':
+        return False
+    if not _disponible:
+        _disponible = FTS_TABLA in connection.introspection.table_names()
+    return _disponible
+
+
+def expresion(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada palabra
+    como prefijo ("pal"*), todas requeridas. Devuelve '' si no hay palabras.
+    """
+    palabras = re.findall(r'\w+', texto or '')
+    return ' '.join(f'"{p}"*' for p in palabras)
+
+
+def buscar(qs, texto):
+    """
+    Filtra un queryset de Producto por texto y lo ordena por relevancia.
+    Sin FTS (otra BD) usa icontains sobre nombre/descripcion/sucursal. Un
+    texto sin palabras (p. ej. "--") no encuentra nada.
+    """
+    expr = expresion(texto)
+    if not expr:
+        return qs.none()
+    if not disponible():
+        return qs.filter(
+            Q(nombre__icontains=texto) |
+            Q(descripcion__icontains=texto) |
+            Q(sucursal__nombre__icontains=texto)
+        )
+    # JOIN con el índice por rowid (models.ProductoBusqueda): MATCH y bm25 necesitan la
+    # tabla FTS en el mismo SELECT; en una subconsulta por fila FTS5 repite la búsqueda
+    return (
+        qs.filter(busqueda__isnull=False)
+        .filter(RawSQL(f"{FTS_TABLA} MATCH %s", [expr], output_field=BooleanField()))
+        .annotate(rango=RawSQL(RANGO, [], output_field=FloatField()))
+        .order_by('rango', 'nombre')
+    )
+
+
+def indexar(ids):
+    """(Re)indexa los productos indicados; los que ya no existen quedan fuera."""
+    if not disponible():
+        return
+    ids = list(ids)
+    with connection.cursor() as cur:
+        for i in range(0, len(ids), 500):
+            lote = ids[i:i + 500]
+            marcas = ','.join(['%s'] * len(lote))
+            cur.execute(f"DELETE FROM {FTS_TABLA} WHERE rowid IN ({marcas})", lote)
+            cur.execute(_SQL_INSERTAR + f"WHERE p.id IN ({marcas})", lote)
+
+
+def desindexar(producto_id):
+    if disponible():
+        with connection.cursor() as cur:
+            cur.execute(f"DELETE FROM {FTS_TABLA} WHERE rowid = %s", [producto_id])
+
+
+def reindexar_sucursal(sucursal_id, nombre):
+    """Actualiza el nombre de sucursal indexado si cambió (renombrar es raro)."""
+    if not disponible():
+        return
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT f.sucursal FROM {FTS_TABLA} f JOIN inventario_producto p ON p.id = f.rowid "
+            "WHERE p.sucursal_id = %s LIMIT 1", [sucursal_id],
+        )
+        fila = cur.fetchone()
+        if fila is None or fila[0] == nombre:
+            return
+        cur.execute(
+            f"DELETE FROM {FTS_TABLA} WHERE rowid IN "
+            "(SELECT id FROM inventario_producto WHERE sucursal_id = %s)", [sucursal_id],
+        )
+        cur.execute(_SQL_INSERTAR + "WHERE p.sucursal_id = %s", [sucursal_id])
+
+
+def reindexar_todo():
+    """Reconstruye el índice completo. Devuelve la cantidad de productos indexados."""
+    if not disponible():
+        return 0
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLA}")
+        cur.execute(_SQL_INSERTAR)
+        cur.execute(f"INSERT INTO {FTS_TABLA}({FTS_TABLA}) VALUES ('optimize')")
+        cur.execute(f"SELECT count(*) FROM {FTS_TABLA}")
+        return cur.fetchone()[0]
@@ -0,0 +1,126 @@
+# inventario/cache.py
+"""
+Caché de la app sobre el backend configurado en settings.CACHES (ver
+INVENTARIO_CACHE: memoria local por proceso o archivo/BD compartidos entre
+procesos).
+
+Las claves van por espacio ('perfiles', 'sucursales', ...), cada uno con su
+TTL (ESPACIOS, ajustable con settings.INVENTARIO_CACHE_TTL). Invalidar un
+espacio no borra sus claves: sube su versión, que también vive en la caché,
+y las entradas viejas dejan de leerse y vencen solas. Así una señal de modelo
+invalida todo lo que dependa de él con una sola escritura (ver signals.py).
+
+Los aciertos y fallos se cuentan por espacio en cada proceso
+(estadisticas()).
+"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache as _backend
+from django.db import transaction
+
+PREFIJO = 'inventario'
+
+# espacio: TTL en segundos
+ESPACIOS = {
+    'perfiles': 300,     # (rol, sucursal_id) por usuario
+    'sucursales': 300,   # nombres de sucursales para los selectores
+    'inicio': 30,        # resumen del día de la pantalla de inicio
+    'dashboard': 60,     # agregados de reportes_dashboard
+    'catalogo': 300,     # sin entradas: su versión entra en los ETag del dashboard
+    'bajas': 300,        # sin entradas: sube al borrar ventas; también entra en los ETag
+}
+
+# Espacios que dependen de cada modelo: signals.py los invalida al guardar o
+# borrar, y a mano donde se escribe sin señales (bulk_create, update())
+DEPENDENCIAS = {
+    'Sucursal': ('sucursales', 'inicio', 'dashboard', 'catalogo'),
+    'Producto': ('dashboard', 'catalogo'),
+    'Caja': ('inicio',),
+    'Venta': ('inicio', 'dashboard'),
+}
+
+_NINGUNO = object()
+_lock = threading.Lock()
+_aciertos = Counter()
+_fallos = Counter()
+
+
+def ttl(espacio):
+    return getattr(settings, 'INVENTARIO_CACHE_TTL', {}).get(espacio, ESPACIOS[espacio])
+
+
+def _clave_version(espacio):
+    return f'{PREFIJO}:v:{espacio}'
+
+
+def _clave(espacio, clave):
+    return f'{PREFIJO}:{espacio}:{clave}'
+
+
+def version(espacio):
+    v = _backend.get(_clave_version(espacio))
+    if v is None:
+        # Si la versión se perdió (reinicio, desalojo) se toma la hora en ms: siempre
+        # mayor que la anterior, así no reaparecen entradas invalidadas
+        v = int(time.time() * 1000)
+        if not _backend.add(_clave_version(espacio), v, None):
+            v = _backend.get(_clave_version(espacio), v)
+    return v
+
+
+def _contar(espacio, acierto):
+    with _lock:
+        (_aciertos if acierto else _fallos)[espacio] += 1
+
+
+def obtener(espacio, clave, calcular, timeout=None):
+    """Valor en caché o calcular() (que se guarda). Dos lecturas al backend: versión y valor."""
+    v = version(espacio)
+    valor = _backend.get(_clave(espacio, clave), _NINGUNO, version=v)
+    _contar(espacio, valor is not _NINGUNO)
+    if valor is _NINGUNO:
+        valor = calcular()
+        _backend.set(_clave(espacio, clave), valor, timeout or ttl(espacio), version=v)
+    return valor
+
+
+def borrar(espacio, clave):
+    _backend.delete(_clave(espacio, clave), version=version(espacio))
+
+
+def invalidar(*espacios):
+    """Sube la versión de los espacios: todas sus entradas quedan obsoletas."""
+    for espacio in espacios:
+        try:
+            _backend.incr(_clave_version(espacio))
+        except ValueError:
+            # Sin versión guardada: la próxima lectura crea una nueva
+            pass
+
+
+def invalidar_por(modelo):
+    """
+    Invalida los espacios que dependen del modelo cuando la transacción en curso
+    confirma: antes, otro request podría volver a cachear los datos viejos.
+    """
+    espacios = DEPENDENCIAS[modelo.__name__]
+    transaction.on_commit(lambda: invalidar(*espacios))
+
+
+def estadisticas():
+    """{espacio: {'aciertos', 'fallos', 'tasa', 'ttl'}} de este proceso."""
+    with _lock:
+        datos = {}
+        for espacio in ESPACIOS:
+            a, f = _aciertos[espacio], _fallos[espacio]
+            datos[espacio] = {'aciertos': a, 'fallos': f, 'tasa': a / (a + f) if a + f else None, 'ttl': ttl(espacio)}
+    return datos
+
+
+def reiniciar_estadisticas():
+    with _lock:
+        _aciertos.clear()
+        _fallos.clear()
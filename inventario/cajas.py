@@ -0,0 +1,58 @@
+# inventario/cajas.py
+"""
+Contadores denormalizados de Caja (total vendido, unidades, ventas).
+
+Se actualizan con F-expressions en la misma transacción que inserta las
+ventas, así cerrar la caja o mostrar su estado no recorre sus ventas.
+verificar() compara contra las ventas reales y opcionalmente repara.
+"""
+from django.db.models import Count, F, Sum, Q
+from django.db.models.functions import Coalesce
+
+from .models import Caja
+
+CONTADORES = ('total_vendido', 'num_items', 'num_ventas')
+
+
+def sumar(caja_id, total, items, ventas=1):
+    Caja.objects.filter(pk=caja_id).update(
+        total_vendido=F('total_vendido') + total,
+        num_items=F('num_items') + items,
+        num_ventas=F('num_ventas') + ventas,
+    )
+
+
+def restar_venta(venta):
+    """Resta una venta borrada (admin, cascada de ticket) de los contadores de su caja."""
+    sumar(venta.caja_id, -venta.total, -venta.cantidad, -1)
+
+
+def refrescar(caja):
+    """Recarga solo los contadores de la instancia (una consulta por PK)."""
+    caja.refresh_from_db(fields=CONTADORES)
+    return caja
+
+
+def verificar(reparar=False, cajas=None):
+    """
+    Compara los contadores con el agregado de las ventas de cada caja.
+    Devuelve [(caja_id, guardado, real), ...] con las cajas desviadas;
+    con reparar=True además las corrige.
+    """
+    qs = Caja.objects.all() if cajas is None else Caja.objects.filter(pk__in=cajas)
+    reales = qs.annotate(
+        r_total=Coalesce(Sum('ventas__total'), 0, output_field=Caja._meta.get_field('total_vendido')),
+        r_items=Coalesce(Sum('ventas__cantidad'), 0),
+        r_ventas=Count('ventas'),
+    ).filter(
+        ~Q(total_vendido=F('r_total')) | ~Q(num_items=F('r_items')) | ~Q(num_ventas=F('r_ventas'))
+    ).values_list('id', *CONTADORES, 'r_total', 'r_items', 'r_ventas')
+
+    desvios = []
+    for caja_id, total, items, ventas, r_total, r_items, r_ventas in reales:
+        desvios.append((caja_id, (total, items, ventas), (r_total, r_items, r_ventas)))
+        if reparar:
+            Caja.objects.filter(pk=caja_id).update(
+                total_vendido=r_total, num_items=r_items, num_ventas=r_ventas,
+            )
+    return desvios
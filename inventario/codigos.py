@@ -0,0 +1,86 @@
+# inventario/codigos.py
+"""
+Resolución de códigos de barras / SKU (Producto.codigo) para el escáner de caja.
+
+Cada proceso guarda en un LRU los últimos códigos resueltos, así un escaneo
+repetido no toca la BD. Las señales de Producto olvidan la entrada al
+guardar/borrar; como otros procesos no se enteran, las entradas además
+vencen a los CODIGOS_CACHE_TTL segundos.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from .models import Producto
+
+CODIGOS_CACHE_MAX = 10000
+CODIGOS_CACHE_TTL = 60
+
+
+class _CacheLRU:
+    def __init__(self, maximo, ttl):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()   # (sucursal_id, codigo) -> (vence, producto)
+        self._claves = {}             # producto_id -> (sucursal_id, codigo)
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            item = self._datos.get(clave)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                self._quitar(clave)
+                return None
+            self._datos.move_to_end(clave)
+            return item[1]
+
+    def put(self, clave, producto):
+        with self._lock:
+            anterior = self._claves.get(producto['id'])
+            if anterior is not None and anterior != clave:
+                self._quitar(anterior)
+            self._datos[clave] = (time.monotonic() + self.ttl, producto)
+            self._datos.move_to_end(clave)
+            self._claves[producto['id']] = clave
+            while len(self._datos) > self.maximo:
+                self._quitar(next(iter(self._datos)))
+
+    def olvidar_producto(self, producto_id):
+        with self._lock:
+            clave = self._claves.get(producto_id)
+            if clave is not None:
+                self._quitar(clave)
+
+    def _quitar(self, clave):
+        _vence, producto = self._datos.pop(clave, (None, None))
+        if producto is not None:
+            self._claves.pop(producto['id'], None)
+
+
+_cache = _CacheLRU(CODIGOS_CACHE_MAX, CODIGOS_CACHE_TTL)
+
+
+def resolver(sucursal_id, codigo):
+    """
+    {id, nombre, precio} del producto con ese código en la sucursal, o None.
+    Sin caché es una sola búsqueda por el índice único (sucursal, codigo).
+    """
+    codigo = (codigo or '').strip()
+    if not codigo:
+        return None
+    clave = (sucursal_id, codigo)
+    producto = _cache.get(clave)
+    if producto is None:
+        producto = (
+            Producto.objects.filter(sucursal_id=sucursal_id, codigo=codigo)
+            .values('id', 'nombre', 'precio').first()
+        )
+        if producto is not None:
+            _cache.put(clave, producto)
+    return producto
+
+
+def olvidar(producto_id):
+    _cache.olvidar_producto(producto_id)
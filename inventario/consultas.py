@@ -0,0 +1,123 @@
+# inventario/consultas.py
+"""
+Consultas de los reportes de ventas.
+
+VentasQuery reúne lo que comparten las exportaciones CSV/XLSX, los reportes
+en segundo plano y el dashboard: el rango de días locales, la sucursal pedida
+y las sucursales permitidas al usuario. Se arma una vez (desde el request o
+desde un ReporteJob), valida los permisos al armarse y entrega los querysets
+ya filtrados; cada salida proyecta solo las columnas que usa
+(exportes.COLUMNAS_EXPORT, dashboard.agregados).
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .fechas import rango_dias
+from .models import Venta, VentaDiaria
+from .permissions import ROLES_GLOBALES, role_and_sucursal_ids
+
+
+def alcance_de(permitidas_ids):
+    """Serializa las sucursales permitidas: "*" = sin restricción, o "1,3"."""
+    if permitidas_ids is None:
+        return "*"
+    return ",".join(str(i) for i in sorted(permitidas_ids))
+
+
+def ids_de_alcance(alcance):
+    if alcance == "*":
+        return None
+    return [int(i) for i in alcance.split(",") if i]
+
+
+def permitidas_de(user):
+    """Ids de las sucursales que el usuario puede consultar, o None si no tiene restricción."""
+    rol, ids = role_and_sucursal_ids(user)
+    return None if rol in ROLES_GLOBALES else ids
+
+
+def _fecha(valor, default):
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class VentasQuery:
+    """Ventas de [desde, hasta] (días locales) de una sucursal o de todas las del alcance."""
+    desde: date
+    hasta: date
+    sucursal_id: int | None = None
+    # None = sin restricción (roles globales)
+    permitidas_ids: frozenset | None = None
+
+    @classmethod
+    def de_request(cls, request, datos=None, dias=1):
+        """
+        Desde ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD&sucursal=<id|all> (o datos, p. ej.
+        request.POST). Sin fechas: los últimos `dias` días hasta hoy. Lanza
+        PermissionDenied si la sucursal no es válida o no está permitida.
+        """
+        datos = request.GET if datos is None else datos
+        permitidas = permitidas_de(request.user)
+        hoy = timezone.localdate()
+        desde = _fecha(datos.get("desde"), hoy - timedelta(days=dias - 1))
+        hasta = _fecha(datos.get("hasta"), hoy)
+
+        sucursal_id = None
+        sucursal = datos.get("sucursal", "all")
+        if sucursal != "all":
+            try:
+                sucursal_id = int(sucursal)
+            except ValueError:
+                raise PermissionDenied("Parámetro de sucursal inválido.")
+            if permitidas is not None and sucursal_id not in permitidas:
+                raise PermissionDenied("No tienes permiso para esta sucursal.")
+        return cls(desde, hasta, sucursal_id, permitidas)
+
+    @classmethod
+    def de_job(cls, job):
+        ids = ids_de_alcance(job.alcance)
+        return cls(job.desde, job.hasta, job.sucursal_id, None if ids is None else frozenset(ids))
+
+    @property
+    def alcance(self):
+        """Lo que ve la consulta como texto ("3", "*", "1,3"): igual para usuarios con el mismo alcance."""
+        return str(self.sucursal_id) if self.sucursal_id is not None else alcance_de(self.permitidas_ids)
+
+    def ventas(self):
+        inicio, fin = rango_dias(self.desde, self.hasta)
+        qs = Venta.objects.filter(creado_en__gte=inicio, creado_en__lt=fin)
+        if self.sucursal_id is not None:
+            return qs.filter(caja__sucursal_id=self.sucursal_id)
+        if self.permitidas_ids is not None:
+            qs = qs.filter(caja__sucursal_id__in=self.permitidas_ids)
+        return qs
+
+    def resumen(self):
+        """Las mismas ventas en el resumen diario (VentaDiaria), para agregados."""
+        qs = VentaDiaria.objects.filter(fecha__gte=self.desde, fecha__lte=self.hasta)
+        if self.sucursal_id is not None:
+            return qs.filter(sucursal_id=self.sucursal_id)
+        if self.permitidas_ids is not None:
+            qs = qs.filter(sucursal_id__in=self.permitidas_ids)
+        return qs
+
+    def huella(self):
+        """
+        {'ultimo', 'modificado'}: id y fecha de la venta más reciente del rango (None
+        si no hay). Lee una fila por el índice de creado_en, sin recorrer el rango;
+        no detecta ventas borradas (ver la versión 'bajas' en cache.py).
+        """
+        ultima = self.ventas().order_by("-creado_en", "-id").values("id", "creado_en").first()
+        return {"ultimo": ultima and ultima["id"], "modificado": ultima and ultima["creado_en"]}
+
+    def firma(self):
+        """Huella barata del contenido: cambia en cuanto entra o sale una venta del rango."""
+        agg = self.ventas().aggregate(n=Count("id"), ultimo=Max("id"))
+        return f"{agg['n']}:{agg['ultimo'] or 0}"
@@ -1,11 +1,12 @@
 # inventario/context_processors.py
+from .permissions import principal
+
+
 def role_context(request):
     """
-    Inyecta el rol del usuario autenticado en el contexto de plantillas.
-    Uso en templates: {{ role }}
+    Inyecta el rol y el principal del usuario en el contexto de plantillas.
+    Uso en templates: {{ role }}, {{ principal.es_global }}
+    Reusa request.principal (PrincipalMiddleware): sin consultas extra.
     """
-    role = None
-    if request.user.is_authenticated:
-        perfil = getattr(request.user, 'perfil', None)
-        role = getattr(perfil, 'rol', None)
-    return {'role': role}
+    p = getattr(request, 'principal', None) or principal(request.user)
+    return {'role': p.rol, 'principal': p}
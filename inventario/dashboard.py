@@ -0,0 +1,91 @@
+# inventario/dashboard.py
+"""
+Agregados del dashboard de ventas en una sola consulta.
+
+Las tres gráficas (por día, top productos y por sucursal) salen del mismo
+rango de VentaDiaria. En vez de un GROUP BY por gráfica, con los nombres de
+producto y sucursal unidos fila por fila, se agrupa una vez por día y otra
+por producto; como cada producto es de una sola sucursal, el total por
+sucursal sale de sumar los productos en Python. Los nombres se resuelven
+después: los de producto para los pocos cientos de grupos, los de sucursal
+desde la caché (permissions.nombres_de_sucursales).
+
+En PostgreSQL las dos agrupaciones son GROUPING SETS de un solo recorrido;
+en SQLite, que no las tiene, un UNION ALL de los dos GROUP BY en la misma
+consulta (ver manage.py bench_dashboard).
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection
+
+from .models import Producto, VentaDiaria
+from .permissions import nombres_de_sucursales
+
+TOP_PRODUCTOS = 10
+
+_GROUPING_SETS = """
+    SELECT GROUPING(fecha), fecha, producto_id, sucursal_id, SUM(total)
+    FROM ({filas}) AS filas
+    GROUP BY GROUPING SETS ((fecha), (producto_id, sucursal_id))
+"""
+
+_UNION_ALL = """
+    SELECT 0, fecha, NULL, NULL, SUM(total) FROM ({filas}) AS filas GROUP BY fecha
+    UNION ALL
+    SELECT 1, NULL, producto_id, sucursal_id, SUM(total) FROM ({filas}) AS filas GROUP BY producto_id, sucursal_id
+"""
+
+
+def agregados(qs):
+    """
+    ({fecha: total}, {(producto_id, sucursal_id): total}) del queryset de
+    VentaDiaria en una consulta.
+    """
+    sql, params = qs.order_by().values_list('fecha', 'producto_id', 'sucursal_id', 'total').query.sql_with_params()
+    if connection.vendor == 'postgresql':
+        consulta = _GROUPING_SETS.format(filas=sql)
+    else:
+        consulta, params = _UNION_ALL.format(filas=sql), params * 2
+    por_dia, por_producto = {}, {}
+    fecha_campo = VentaDiaria._meta.get_field('fecha')
+    with connection.cursor() as cursor:
+        cursor.execute(consulta, params)
+        for es_producto, fecha, producto_id, sucursal_id, total in cursor.fetchall():
+            if es_producto:
+                por_producto[(producto_id, sucursal_id)] = total or 0
+            else:
+                # SQL crudo: SQLite devuelve la fecha como texto
+                por_dia[fecha_campo.to_python(fecha)] = total or 0
+    return por_dia, por_producto
+
+
+def _ordenada(totales, limite=None):
+    filas = sorted(totales.items(), key=lambda kv: kv[1], reverse=True)[:limite]
+    return [k for k, _t in filas], [float(t) for _k, t in filas]
+
+
+def series(consulta):
+    """
+    {'dias': (labels, data), 'productos': (...), 'sucursales': (...)} de una
+    consultas.VentasQuery: ventas por día de desde a hasta (días sin ventas en 0), top TOP_PRODUCTOS
+    productos por total (agrupados por nombre) y total por sucursal.
+    """
+    por_dia, por_producto = agregados(consulta.resumen())
+
+    nombres_producto = dict(
+        Producto.objects.filter(pk__in={pid for pid, _s in por_producto}).values_list('id', 'nombre')
+    ) if por_producto else {}
+    nombres_sucursal = dict(nombres_de_sucursales())
+    productos, sucursales = defaultdict(int), defaultdict(int)
+    for (producto_id, suc_id), total in por_producto.items():
+        productos[nombres_producto.get(producto_id)] += total
+        sucursales[nombres_sucursal.get(suc_id, "Sin sucursal")] += total
+
+    desde, hasta = consulta.desde, consulta.hasta
+    dias = [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+    return {
+        'dias': ([d.strftime("%Y-%m-%d") for d in dias], [float(por_dia.get(d, 0)) for d in dias]),
+        'productos': _ordenada(productos, TOP_PRODUCTOS),
+        'sucursales': _ordenada(sucursales),
+    }
@@ -0,0 +1,142 @@
+# inventario/exportes.py
+"""
+Generación de los archivos de ventas (CSV / XLSX).
+Se usa desde las vistas de reportes y desde el worker de reportes en segundo plano.
+"""
+import csv
+import tempfile
+
+from django.contrib.auth.models import User
+from django.utils.timezone import make_naive
+
+from .permissions import nombres_de_sucursales
+
+try:
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+except Exception:
+    openpyxl = None  # Si no está instalado, mostramos instrucción en la vista
+
+# Filas que se leen por viaje a la base de datos al exportar (cursor del servidor)
+EXPORT_CHUNK_SIZE = 2000
+
+ENCABEZADOS_VENTAS = [
+    "Fecha/Hora", "Sucursal", "Caja ID", "Producto", "Código", "Cantidad",
+    "Precio Unitario", "Total", "Usuario"
+]
+
+# Límite de filas por hoja de Excel; al llenarse se continúa en otra hoja
+EXCEL_MAX_FILAS = 1048576
+EXCEL_ANCHOS = [17, 20, 8, 30, 16, 9, 15, 14, 16]
+
+# Columnas planas para exportar sin instanciar modelos (ver filas_ventas). Sucursal
+# y usuario van por id y se nombran en Python: la consulta solo une Caja y Producto
+COLUMNAS_EXPORT = (
+    "creado_en", "caja__sucursal_id", "caja_id", "producto__nombre",
+    "producto__codigo", "cantidad", "precio_unitario", "total", "usuario_id",
+)
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en vez de guardarla."""
+    def write(self, value):
+        return value
+
+
+def filas_ventas(qs):
+    """
+    Itera las ventas como tuplas planas (fecha, sucursal, caja_id, producto,
+    código, cantidad, precio, total, usuario) en orden cronológico, leyendo por
+    bloques con un cursor del servidor: la memoria no crece con el rango.
+    Los nombres de sucursal salen de la caché y los de usuario de una consulta
+    aparte (tabla chica), en vez de unirlos fila por fila.
+    """
+    sucursales = dict(nombres_de_sucursales())
+    usuarios = dict(User.objects.values_list("id", "username"))
+    filas = qs.order_by("creado_en").values_list(*COLUMNAS_EXPORT).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for creado_en, sucursal_id, caja_id, producto, codigo, cantidad, precio, total, usuario_id in filas:
+        yield (creado_en, sucursales.get(sucursal_id, ""), caja_id, producto, codigo,
+               cantidad, precio, total, usuarios.get(usuario_id))
+
+
+def csv_stream(qs):
+    """Genera el CSV por bloques de EXPORT_CHUNK_SIZE líneas, con total acumulado."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ENCABEZADOS_VENTAS)
+
+    total_general = 0
+    bloque = []
+    for creado_en, sucursal, caja_id, producto, codigo, cantidad, precio, total, usuario in filas_ventas(qs):
+        bloque.append(writer.writerow([
+            make_naive(creado_en).strftime("%Y-%m-%d %H:%M"),
+            sucursal,
+            caja_id,
+            producto,
+            codigo or "",
+            cantidad,
+            f"{precio}",
+            f"{total}",
+            usuario or "-",
+        ]))
+        total_general += float(total)
+        if len(bloque) >= EXPORT_CHUNK_SIZE:
+            yield "".join(bloque)
+            bloque = []
+    if bloque:
+        yield "".join(bloque)
+
+    yield writer.writerow([])
+    yield writer.writerow(["", "", "", "", "", "", "TOTAL", f"{total_general:.2f}", ""])
+
+
+def xlsx_spool(qs):
+    """
+    Escribe las ventas en un libro openpyxl de solo escritura (write_only), sin
+    mantener las celdas en memoria, y lo vuelca a un archivo temporal.
+    Si se supera EXCEL_MAX_FILAS se abren hojas "Ventas (2)", "Ventas (3)", ...
+    Devuelve el archivo temporal posicionado al inicio.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    hojas = 0
+    ws = None
+    filas_en_hoja = EXCEL_MAX_FILAS
+
+    def nueva_hoja():
+        nonlocal hojas, filas_en_hoja
+        hojas += 1
+        hoja = wb.create_sheet("Ventas" if hojas == 1 else f"Ventas ({hojas})")
+        # Ajuste básico de ancho (en write_only debe hacerse antes de escribir filas)
+        for col, ancho in enumerate(EXCEL_ANCHOS, start=1):
+            hoja.column_dimensions[get_column_letter(col)].width = ancho
+        hoja.append(ENCABEZADOS_VENTAS)
+        filas_en_hoja = 1
+        return hoja
+
+    total_general = 0
+    for creado_en, sucursal, caja_id, producto, codigo, cantidad, precio, total, usuario in filas_ventas(qs):
+        if filas_en_hoja >= EXCEL_MAX_FILAS:
+            ws = nueva_hoja()
+        ws.append([
+            make_naive(creado_en).strftime("%Y-%m-%d %H:%M"),
+            sucursal,
+            caja_id,
+            producto,
+            codigo or "",
+            cantidad,
+            float(precio),
+            float(total),
+            usuario or "-",
+        ])
+        filas_en_hoja += 1
+        total_general += float(total)
+
+    # La fila en blanco y la de TOTAL deben caber en la última hoja
+    if ws is None or filas_en_hoja + 2 > EXCEL_MAX_FILAS:
+        ws = nueva_hoja()
+    ws.append([])
+    ws.append(["", "", "", "", "", "", "TOTAL", total_general, ""])
+
+    tmp = tempfile.TemporaryFile(suffix=".xlsx")
+    wb.save(tmp)
+    tmp.seek(0)
+    return tmp
@@ -0,0 +1,22 @@
+# inventario/fechas.py
+"""
+Rangos de fechas aptos para índices.
+
+Filtrar con creado_en__date__gte/lte envuelve la columna en una función de fecha
+y obliga a recorrer toda la tabla. En su lugar se convierte el rango de días
+locales (TIME_ZONE) a un intervalo semiabierto de datetimes con zona:
+    inicio <= creado_en < fin
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def inicio_del_dia(dia):
+    """Medianoche del día dado en la zona horaria del proyecto (TIME_ZONE)."""
+    return timezone.make_aware(datetime.combine(dia, time.min), timezone.get_default_timezone())
+
+
+def rango_dias(desde, hasta):
+    """(inicio, fin) para filtrar creado_en__gte=inicio, creado_en__lt=fin (ambos días inclusive)."""
+    return inicio_del_dia(desde), inicio_del_dia(hasta + timedelta(days=1))
@@ -1,8 +1,28 @@
 # inventario/forms.py
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Caja, Venta, Producto, Sucursal
-from .permissions import role_and_sucursales
+from .models import Caja, Venta, Producto, Sucursal, Transferencia
+from .permissions import nombres_de_sucursales, role_and_sucursal_ids, ROLES_GLOBALES
+from .stock import permitir_sobreventa
+
+
+def _limitar_sucursales(campo, user):
+    """
+    Deja en el campo solo las sucursales del usuario: el queryset valida lo
+    enviado y las opciones salen de la caché (sin consulta al mostrar el form).
+    """
+    if user:
+        rol, ids = role_and_sucursal_ids(user)
+        if rol in ROLES_GLOBALES:
+            campo.queryset = Sucursal.objects.all()
+            ids = None
+        else:
+            campo.queryset = Sucursal.objects.filter(id__in=ids)
+    else:
+        campo.queryset = Sucursal.objects.none()
+        ids = frozenset()
+    vacia = [] if campo.empty_label is None else [('', campo.empty_label)]
+    campo.choices = vacia + nombres_de_sucursales(ids)
 
 
 class CajaAperturaForm(forms.ModelForm):
@@ -14,17 +34,7 @@ class CajaAperturaForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
 
-        if self.user:
-            rol, sucursales = role_and_sucursales(self.user)
-            if rol in ['Administrador', 'Subadministrador']:
-                self.fields['sucursal'].queryset = Sucursal.objects.all()
-            else:
-                self.fields['sucursal'].queryset = Sucursal.objects.filter(
-                    id__in=[s.id for s in sucursales]
-                )
-        else:
-            self.fields['sucursal'].queryset = Sucursal.objects.none()
-
+        _limitar_sucursales(self.fields['sucursal'], self.user)
         self.fields['apertura_monto'].min_value = 0
 
     def clean(self):
@@ -43,9 +53,16 @@ class CajaAperturaForm(forms.ModelForm):
 
 
 class VentaForm(forms.ModelForm):
+    """
+    El producto se elige con el buscador (caja_productos_buscar) y llega como id:
+    el queryset no se recorre al renderizar y se valida con un solo get(pk=...).
+    """
     class Meta:
         model = Venta
         fields = ['producto', 'cantidad']
+        widgets = {
+            'producto': forms.TextInput(attrs={'list': 'productos', 'autocomplete': 'off', 'data-autocompletar': ''}),
+        }
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
@@ -56,15 +73,16 @@ class VentaForm(forms.ModelForm):
 
         # Filtrar productos por rol
         if self.user:
-            rol, sucursales = role_and_sucursales(self.user)
-            if rol not in ['Administrador', 'Subadministrador']:
-                productos_qs = productos_qs.filter(sucursal__in=sucursales)
+            rol, ids = role_and_sucursal_ids(self.user)
+            if rol not in ROLES_GLOBALES:
+                productos_qs = productos_qs.filter(sucursal_id__in=ids)
 
         # Filtrar por sucursal de la caja activa
         if self.caja:
-            productos_qs = productos_qs.filter(sucursal=self.caja.sucursal)
+            productos_qs = productos_qs.filter(sucursal_id=self.caja.sucursal_id)
 
         self.fields['producto'].queryset = productos_qs
+        self.fields['producto'].error_messages['invalid_choice'] = 'Producto inválido para esta caja.'
         self.fields['cantidad'].min_value = 1
 
     def clean(self):
@@ -75,18 +93,61 @@ class VentaForm(forms.ModelForm):
         if producto and cantidad:
             if cantidad <= 0:
                 self.add_error('cantidad', 'La cantidad debe ser mayor que 0.')
-            if producto.stock < cantidad:
-                # Permitimos registrar pero avisamos (la vista muestra mensaje)
-                # Si quieres bloquear, descomenta la siguiente línea:
-                # self.add_error('cantidad', 'Stock insuficiente para la venta.')
-                pass
+            if producto.stock < cantidad and not permitir_sobreventa():
+                # Aviso temprano; el chequeo definitivo es el UPDATE condicional
+                # de stock.descontar() al registrar la venta.
+                self.add_error('cantidad', 'Stock insuficiente para la venta.')
+        return cleaned
+
+
+class TicketLineaForm(forms.Form):
+    """
+    Línea de un ticket. Solo valida tipos; los productos se comprueban todos
+    juntos (una consulta) en ventas.registrar_ticket().
+    """
+    producto = forms.IntegerField(min_value=1, widget=forms.TextInput(
+        attrs={'list': 'productos', 'autocomplete': 'off', 'inputmode': 'numeric', 'data-autocompletar': ''}
+    ))
+    cantidad = forms.IntegerField(min_value=1)
+
+
+TicketLineaFormSet = forms.formset_factory(TicketLineaForm, extra=5)
+
+
+class TransferenciaForm(forms.ModelForm):
+    class Meta:
+        model = Transferencia
+        fields = ['origen', 'destino', 'nota']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Solo la usan roles globales: todas las sucursales, opciones desde la caché
+        for nombre in ('origen', 'destino'):
+            campo = self.fields[nombre]
+            campo.choices = [('', campo.empty_label)] + nombres_de_sucursales()
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get('origen') and cleaned.get('origen') == cleaned.get('destino'):
+            raise ValidationError("El origen y el destino deben ser sucursales distintas.")
         return cleaned
 
 
+class TransferenciaLineaForm(forms.Form):
+    """Línea de una transferencia: id del producto en la sucursal de origen."""
+    producto = forms.IntegerField(min_value=1)
+    cantidad = forms.IntegerField(min_value=1)
+
+
+TransferenciaLineaFormSet = forms.formset_factory(TransferenciaLineaForm, extra=10)
+
+
 class ProductoForm(forms.ModelForm):
     class Meta:
         model = Producto
-        fields = ['nombre', 'descripcion', 'precio', 'stock', 'sucursal']
+        fields = ['nombre', 'codigo', 'descripcion', 'precio', 'stock', 'punto_reorden', 'sucursal']
+        labels = {'codigo': 'Código de barras / SKU', 'punto_reorden': 'Punto de reorden'}
+        help_texts = {'punto_reorden': 'Con stock igual o menor aparece en la lista de reposición.'}
 
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
@@ -95,13 +156,21 @@ class ProductoForm(forms.ModelForm):
         self.fields['precio'].min_value = 0
         self.fields['stock'].min_value = 0
 
-        if user:
-            rol, sucursales = role_and_sucursales(user)
-            if rol in ['Administrador', 'Subadministrador']:
-                self.fields['sucursal'].queryset = Sucursal.objects.all()
-            else:
-                self.fields['sucursal'].queryset = Sucursal.objects.filter(
-                    id__in=[s.id for s in sucursales]
-                )
-        else:
-            self.fields['sucursal'].queryset = Sucursal.objects.none()
+        _limitar_sucursales(self.fields['sucursal'], user)
+
+
+class ProductoImportarForm(forms.Form):
+    """Carga masiva del catálogo (ver importacion.py)."""
+    sucursal = forms.ModelChoiceField(queryset=Sucursal.objects.none())
+    archivo = forms.FileField(help_text="CSV o XLSX con columnas: codigo, nombre, descripcion, precio, stock")
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        _limitar_sucursales(self.fields['sucursal'], user)
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data['archivo']
+        if not archivo.name.lower().endswith(('.csv', '.xlsx')):
+            raise ValidationError("El archivo debe ser .csv o .xlsx.")
+        return archivo
@@ -0,0 +1,291 @@
+# inventario/importacion.py
+"""
+Importación / exportación del catálogo de productos de una sucursal (CSV o XLSX).
+
+Las filas se leen en streaming, se validan y se guardan por lotes: las que
+traen código se insertan con bulk_create(update_conflicts=...) sobre la
+restricción única (sucursal, codigo); las que no, se emparejan por nombre.
+Un error en una fila se reporta y la carga sigue. En los productos existentes
+solo se actualizan las columnas que trae el archivo (un CSV "nombre,precio"
+no toca stock ni descripción); los valores por defecto son para los nuevos.
+Lo usan el comando importar_productos y la vista de carga de productos.
+"""
+import csv
+import io
+import itertools
+import unicodedata
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, connection, transaction
+
+from .models import MovimientoStock, Producto
+from . import busqueda, cache, codigos, movimientos
+
+try:
+    import openpyxl
+except Exception:
+    openpyxl = None
+
+COLUMNAS = ("codigo", "nombre", "descripcion", "precio", "stock")
+CAMPOS_ACTUALIZABLES = ["nombre", "descripcion", "precio", "stock"]
+# Columnas que pueden faltar en el archivo: los productos nuevos toman el default del modelo
+OPCIONALES = ("descripcion", "stock")
+IMPORT_LOTE = 2000
+
+_PRECIO_MAX = Decimal("99999999.99")  # max_digits=10, decimal_places=2
+
+
+class Resultado:
+    def __init__(self):
+        self.filas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.errores = []  # [(num_fila, mensaje), ...]
+
+    def error(self, fila, mensaje):
+        self.errores.append((fila, mensaje))
+
+
+# ---------- Lectura ----------
+
+def _normalizar(encabezado):
+    texto = unicodedata.normalize("NFKD", str(encabezado or "")).encode("ascii", "ignore").decode()
+    return texto.strip().lower()
+
+
+def _fila(encabezados, valores):
+    """{columna: valor} con todas las columnas del encabezado, aunque la fila venga corta."""
+    return dict(zip(encabezados, itertools.chain(valores, itertools.repeat(""))))
+
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    primera = texto.readline()
+    # Excel en español suele exportar con ';'
+    delimitador = ";" if primera.count(";") > primera.count(",") else ","
+    lector = csv.reader(itertools.chain([primera], texto), delimiter=delimitador)
+    encabezados = [_normalizar(h) for h in next(lector, [])]
+    for num, valores in enumerate(lector, start=2):
+        if any(v.strip() for v in valores):
+            yield num, _fila(encabezados, valores)
+
+
+def _filas_xlsx(archivo):
+    if openpyxl is None:
+        raise ValueError("Instala openpyxl para importar archivos .xlsx: pip install openpyxl")
+    wb = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = wb.active.iter_rows(values_only=True)
+        encabezados = [_normalizar(h) for h in next(filas, ())]
+        for num, valores in enumerate(filas, start=2):
+            if any(v not in (None, "") for v in valores):
+                yield num, _fila(encabezados, valores)
+    finally:
+        wb.close()
+
+
+def leer_filas(archivo, nombre_archivo):
+    """Itera (num_fila, {columna: valor}) de un archivo binario CSV o XLSX."""
+    if nombre_archivo.lower().endswith(".xlsx"):
+        return _filas_xlsx(archivo)
+    return _filas_csv(archivo)
+
+
+# ---------- Validación ----------
+
+def _texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)  # códigos numéricos leídos de Excel
+    return str(valor).strip()
+
+
+def validar_fila(datos):
+    """
+    Devuelve los campos del producto o lanza ValueError con el motivo. Las
+    columnas OPCIONALES que no vienen en datos quedan fuera de los campos.
+    """
+    nombre = _texto(datos.get("nombre"))
+    if not nombre:
+        raise ValueError("Falta el nombre.")
+    if len(nombre) > 120:
+        raise ValueError("El nombre supera 120 caracteres.")
+    codigo = _texto(datos.get("codigo")) or None
+    if codigo and len(codigo) > 64:
+        raise ValueError("El código supera 64 caracteres.")
+    try:
+        precio = Decimal(_texto(datos.get("precio")).replace(",", ".")).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Precio inválido: {datos.get('precio')!r}")
+    if not precio.is_finite():
+        # NaN/Infinity se leen sin error pero no se pueden comparar ni guardar
+        raise ValueError(f"Precio inválido: {datos.get('precio')!r}")
+    if not Decimal(0) <= precio <= _PRECIO_MAX:
+        raise ValueError(f"Precio fuera de rango: {precio}")
+    campos = {"codigo": codigo, "nombre": nombre, "precio": precio}
+    if "descripcion" in datos:
+        campos["descripcion"] = _texto(datos["descripcion"])
+    if "stock" in datos:
+        stock = _texto(datos["stock"]) or "0"
+        try:
+            stock = int(Decimal(stock))
+        except (InvalidOperation, ValueError, OverflowError):
+            raise ValueError(f"Stock inválido: {datos['stock']!r}")
+        if stock < 0:
+            raise ValueError("El stock no puede ser negativo.")
+        campos["stock"] = stock
+    return campos
+
+
+# ---------- Escritura ----------
+
+def _actualizar_por_id(productos, campos):
+    """
+    UPDATE ... WHERE id = %s con executemany: bulk_update() arma un CASE por
+    campo y fila, que en lotes grandes cuesta más compilar que ejecutar.
+    """
+    tabla = connection.ops.quote_name(Producto._meta.db_table)
+    asignaciones = ", ".join(f"{connection.ops.quote_name(c)} = %s" for c in campos)
+    with connection.cursor() as cur:
+        cur.executemany(
+            f"UPDATE {tabla} SET {asignaciones} WHERE id = %s",
+            [[getattr(p, c) for c in campos] + [p.pk] for p in productos],
+        )
+
+
+def _guardar(sucursal_id, con_codigo, sin_codigo):
+    """
+    Upsert de un lote ya deduplicado. Devuelve (creados, actualizados, ids).
+    con_codigo: {codigo: campos}; sin_codigo: {nombre: campos}.
+    La importación fija el stock: al libro va la diferencia contra el stock
+    leído en el mismo lote. En los existentes solo se actualizan los campos
+    presentes en las filas (todas traen las columnas del mismo encabezado).
+    """
+    creados = actualizados = 0
+    ids = []
+    deltas = {}
+    base = Producto.objects.filter(sucursal_id=sucursal_id)
+    presentes = set().union(*con_codigo.values(), *sin_codigo.values())
+    actualizables = [c for c in CAMPOS_ACTUALIZABLES if c in presentes]
+    con_stock = "stock" in presentes
+
+    if con_codigo:
+        previo = dict(base.filter(codigo__in=list(con_codigo)).values_list("codigo", "stock"))
+        guardados = Producto.objects.bulk_create(
+            [Producto(sucursal_id=sucursal_id, **campos) for campos in con_codigo.values()],
+            update_conflicts=True,
+            unique_fields=["sucursal", "codigo"],
+            update_fields=actualizables,
+        )
+        actualizados += len(previo)
+        creados += len(con_codigo) - len(previo)
+        if all(p.pk for p in guardados):
+            id_de = {p.codigo: p.pk for p in guardados}  # SQLite/PostgreSQL devuelven los ids (RETURNING)
+        else:
+            id_de = dict(base.filter(codigo__in=list(con_codigo)).values_list("codigo", "id"))
+        ids += id_de.values()
+        if con_stock:
+            for codigo, campos in con_codigo.items():
+                deltas[id_de[codigo]] = campos["stock"] - previo.get(codigo, 0)
+
+    if sin_codigo:
+        por_nombre = {
+            nombre: (pid, stock) for nombre, pid, stock in
+            base.filter(codigo__isnull=True, nombre__in=list(sin_codigo)).values_list("nombre", "id", "stock")
+        }
+        nuevos, cambios = [], []
+        for nombre, campos in sin_codigo.items():
+            producto = Producto(sucursal_id=sucursal_id, **campos)
+            if nombre in por_nombre:
+                producto.pk, stock_previo = por_nombre[nombre]
+                if con_stock:
+                    deltas[producto.pk] = producto.stock - stock_previo
+                cambios.append(producto)
+            else:
+                nuevos.append(producto)
+        if cambios:
+            _actualizar_por_id(cambios, actualizables)
+        Producto.objects.bulk_create(nuevos)
+        deltas.update({p.pk: p.stock for p in nuevos})
+        actualizados += len(cambios)
+        creados += len(nuevos)
+        ids += [p.pk for p in cambios + nuevos]
+
+    movimientos.registrar(deltas, MovimientoStock.IMPORTACION)
+    return creados, actualizados, ids
+
+
+def _procesar_lote(sucursal_id, lote, resultado):
+    # Deduplicar dentro del lote: {clave: (num_fila, campos)}, gana la última fila
+    con_codigo, sin_codigo = {}, {}
+    for num, campos in lote:
+        destino, clave = (con_codigo, campos["codigo"]) if campos["codigo"] else (sin_codigo, campos["nombre"])
+        if clave in destino:
+            resultado.error(destino[clave][0], f"Repetido más abajo (fila {num}); se usa esa fila.")
+        destino[clave] = (num, campos)
+
+    def campos_de(destino):
+        return {clave: campos for clave, (_num, campos) in destino.items()}
+
+    try:
+        with transaction.atomic():
+            creados, actualizados, ids = _guardar(sucursal_id, campos_de(con_codigo), campos_de(sin_codigo))
+    except DatabaseError:
+        # Algo del lote no entró: se reintenta fila por fila para aislar el error
+        creados = actualizados = 0
+        ids = []
+        for con, destino in ((True, con_codigo), (False, sin_codigo)):
+            for clave, (num, campos) in destino.items():
+                uno = {clave: campos}
+                try:
+                    with transaction.atomic():
+                        c, a, i = _guardar(sucursal_id, uno if con else {}, {} if con else uno)
+                except DatabaseError as exc:
+                    resultado.error(num, f"No se pudo guardar: {exc}")
+                    continue
+                creados, actualizados, ids = creados + c, actualizados + a, ids + i
+
+    resultado.creados += creados
+    resultado.actualizados += actualizados
+    # bulk_create/bulk_update no disparan señales: índice de búsqueda y cachés a mano
+    busqueda.indexar(ids)
+    for producto_id in ids:
+        codigos.olvidar(producto_id)
+    if ids:
+        cache.invalidar_por(Producto)
+
+
+def importar(filas, sucursal_id, lote=IMPORT_LOTE):
+    """
+    Importa (num_fila, datos) en la sucursal por lotes. Los errores de cada fila
+    se acumulan en el Resultado y no detienen la carga.
+    """
+    resultado = Resultado()
+    pendientes = []
+    for num, datos in filas:
+        resultado.filas += 1
+        try:
+            pendientes.append((num, validar_fila(datos)))
+        except ValueError as exc:
+            resultado.error(num, str(exc))
+            continue
+        if len(pendientes) >= lote:
+            _procesar_lote(sucursal_id, pendientes, resultado)
+            pendientes = []
+    if pendientes:
+        _procesar_lote(sucursal_id, pendientes, resultado)
+    resultado.errores.sort()
+    return resultado
+
+
+def exportar_csv(sucursal_id, salida):
+    """Escribe el catálogo de la sucursal en CSV (mismas columnas que la importación)."""
+    writer = csv.writer(salida)
+    writer.writerow(COLUMNAS)
+    qs = Producto.objects.filter(sucursal_id=sucursal_id).order_by("nombre").values_list(*COLUMNAS)
+    n = 0
+    for codigo, nombre, descripcion, precio, stock in qs.iterator(chunk_size=IMPORT_LOTE):
+        writer.writerow([codigo or "", nombre, descripcion, f"{precio}", stock])
+        n += 1
+    return n
@@ -0,0 +1,87 @@
+# inventario/inicio.py
+"""
+Datos de la pantalla de inicio.
+
+Las opciones del menú se arman una vez por rol (Perfil.rol, el mismo que usa
+permissions.user_role) y el resumen del día (ventas de hoy y cajas abiertas
+de las sucursales del usuario) se guarda en el espacio 'inicio' de la caché
+(cache.py), que invalidan las ventas y los cambios de cajas: con el rol ya
+cacheado el inicio no consulta la BD más allá de la sesión.
+"""
+import hashlib
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from . import cache
+from .models import Caja, VentaDiaria
+
+_INVENTARIO = {"titulo": "Inventario", "desc": "Registrar y consultar productos.", "url": "producto_list", "boton": "Ir a Productos"}
+_CAJA = {"titulo": "Caja y Ventas", "desc": "Apertura, ventas y cierre diario.", "url": "caja_estado", "boton": "Ir a Caja"}
+_STOCK_BAJO = {"titulo": "Reposición", "desc": "Productos en punto de reorden.", "url": "producto_stock_bajo", "boton": "Ver stock bajo"}
+_TRANSFERENCIAS = {"titulo": "Transferencias", "desc": "Mover stock entre sucursales.", "url": "transferencia_lista", "boton": "Ir a Transferencias"}
+_REPORTES = {"titulo": "Reportes", "desc": "Exportar ventas y ver el dashboard.", "url": "reportes_home", "boton": "Ir a Reportes"}
+_SUCURSALES = {"titulo": "Sucursales", "desc": "Crear y editar sucursales.", "url": "sucursal_list", "boton": "Ir a Sucursales"}
+_USUARIOS = {"titulo": "Usuarios", "desc": "Crear usuarios y asignar roles.", "url": "usuario_list", "boton": "Ir a Usuarios"}
+
+OPCIONES_POR_ROL = {
+    'Administrador': (_INVENTARIO, _CAJA, _STOCK_BAJO, _TRANSFERENCIAS, _REPORTES, _SUCURSALES, _USUARIOS),
+    'Subadministrador': (_INVENTARIO, _CAJA, _STOCK_BAJO, _TRANSFERENCIAS, _REPORTES, _SUCURSALES, _USUARIOS),
+    'Supervisión': (_INVENTARIO, _CAJA, _STOCK_BAJO, _REPORTES),
+    'Cajero': (_INVENTARIO, _CAJA, _STOCK_BAJO),
+}
+
+
+def opciones(rol):
+    return OPCIONES_POR_ROL.get(rol, ())
+
+
+def _clave(sucursal_ids, hoy):
+    # Una entrada por conjunto de sucursales (todas para Administrador/Subadministrador)
+    ids = ','.join(map(str, sorted(sucursal_ids)))
+    return f'{hoy.isoformat()}:{hashlib.md5(ids.encode()).hexdigest()}'
+
+
+def resumen_del_dia(sucursal_ids):
+    """
+    {'sucursales': [{nombre, vendido, unidades, cajas_abiertas}, ...], 'vendido',
+    'unidades', 'cajas_abiertas'} de hoy para las sucursales dadas. Se
+    recalcula (dos consultas agregadas, VentaDiaria y Caja) tras una venta o un
+    cambio de caja, o al vencer cache.ttl('inicio').
+    """
+    if not sucursal_ids:
+        return None
+    hoy = timezone.localdate()
+    return cache.obtener('inicio', _clave(sucursal_ids, hoy), lambda: _resumen(sucursal_ids, hoy))
+
+
+def _resumen(sucursal_ids, hoy):
+    filas = {}
+
+    def fila(sucursal_id, nombre):
+        return filas.setdefault(sucursal_id, {'nombre': nombre, 'vendido': 0, 'unidades': 0, 'cajas_abiertas': 0})
+
+    ventas = (
+        VentaDiaria.objects.filter(fecha=hoy, sucursal_id__in=sucursal_ids)
+        .values('sucursal_id', 'sucursal__nombre').annotate(vendido=Sum('total'), unidades=Sum('cantidad'))
+        .order_by()
+    )
+    for v in ventas:
+        f = fila(v['sucursal_id'], v['sucursal__nombre'])
+        f['vendido'], f['unidades'] = v['vendido'], v['unidades']
+    abiertas = (
+        Caja.objects.filter(estado='ABIERTA', sucursal_id__in=sucursal_ids)
+        .values('sucursal_id', 'sucursal__nombre').annotate(n=Count('id'))
+        .order_by()
+    )
+    for c in abiertas:
+        fila(c['sucursal_id'], c['sucursal__nombre'])['cajas_abiertas'] = c['n']
+
+    sucursales = sorted(filas.values(), key=lambda f: f['nombre'])
+    return {
+        'sucursales': sucursales,
+        'vendido': sum(f['vendido'] for f in sucursales),
+        'unidades': sum(f['unidades'] for f in sucursales),
+        'cajas_abiertas': sum(f['cajas_abiertas'] for f in sucursales),
+        'generado': timezone.now(),
+    }
@@ -0,0 +1,92 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from inventario.models import Producto, Sucursal
+from inventario import busqueda
+
+
+class _Rollback(Exception):
+    pass
+
+
+PALABRAS = (
+    "arroz leche pan queso galletas tostadas cafe chocolate jugo agua gaseosa aceite azucar sal "
+    "harina atun frijol lenteja pasta salsa mantequilla yogur huevos jamon salchicha cereal avena "
+    "detergente jabon shampoo papel servilletas integral clasico light familiar premium"
+).split()
+# Marcas sintéticas para que el vocabulario se parezca a un catálogo real
+MARCAS = [f"marca{chr(97 + i % 26)}{i}" for i in range(5000)]
+CONSULTAS = ["marcak10", "marcab27", "tost marcaq16", "leche marcaz25", "choc", "xyz"]
+
+
+def _icontains(qs, texto):
+    """Ruta anterior: tres LIKE '%texto%' (uno a través del join con sucursal)."""
+    return qs.filter(
+        Q(nombre__icontains=texto) | Q(descripcion__icontains=texto) | Q(sucursal__nombre__icontains=texto)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la latencia de la búsqueda de productos (COUNT + primera página, como "
+        "ProductoListView) con icontains vs. FTS5. Inserta productos sintéticos dentro "
+        "de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--productos", type=int, default=500_000)
+        parser.add_argument("--repeticiones", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        if not busqueda.disponible():
+            raise CommandError("Se necesita SQLite con el índice FTS5 (migración 0012).")
+        sucursal = Sucursal.objects.first()
+        if not sucursal:
+            raise CommandError("Se necesita al menos una sucursal.")
+
+        try:
+            with transaction.atomic():
+                t0 = time.perf_counter()
+                self._sembrar(sucursal, opts["productos"])
+                self.stdout.write(f"{opts['productos']} productos sembrados e indexados en {time.perf_counter() - t0:.1f} s")
+                base = Producto.objects.select_related("sucursal").order_by("-fecha_creacion", "nombre")
+                for texto in CONSULTAS:
+                    viejo = self._medir(lambda: _icontains(base, texto), opts["repeticiones"])
+                    nuevo = self._medir(lambda: busqueda.buscar(base, texto), opts["repeticiones"])
+                    self.stdout.write(
+                        f"{texto!r:<16} icontains {viejo[0]:8.1f} ms | fts5 {nuevo[0]:6.1f} ms | {nuevo[1]} resultado(s)"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _sembrar(self, sucursal, n, lote=20_000):
+        rnd = random.Random(7)
+        for inicio in range(0, n, lote):
+            Producto.objects.bulk_create([
+                Producto(
+                    nombre=f"{rnd.choice(PALABRAS)} {rnd.choice(MARCAS)} {rnd.choice(PALABRAS)}".title(),
+                    descripcion=" ".join(rnd.sample(PALABRAS, 8)),
+                    precio=Decimal(rnd.randint(500, 50_000)), stock=rnd.randint(0, 100), sucursal=sucursal,
+                )
+                for _ in range(min(lote, n - inicio))
+            ])
+        # bulk_create no dispara señales: se reconstruye el índice
+        busqueda.reindexar_todo()
+
+    @staticmethod
+    def _medir(armar, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            qs = armar()
+            total = qs.count()
+            list(qs[:20])
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(tiempos), total
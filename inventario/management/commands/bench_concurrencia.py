@@ -0,0 +1,102 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from inventario import basedatos
+from inventario.models import Caja, Producto
+from inventario.ventas import registrar_ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Rendimiento de ventas concurrentes con el perfil de base de datos activo "
+        "(INVENTARIO_DB, INVENTARIO_SQLITE_AJUSTES): varios hilos registran tickets en la "
+        "misma caja y se informa tickets/s, latencia y bloqueos. Para comparar perfiles "
+        "correr el comando con distintas variables de entorno. Los tickets se confirman desde "
+        "varias conexiones, así que solo corre sobre una base desechable (basedatos.es_desechable: "
+        "p. ej. cp db.sqlite3 /tmp/bench.sqlite3 y SQLITE_PATH=/tmp/bench.sqlite3) y no limpia nada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--caja", type=int, required=True, help="Id de una caja ABIERTA.")
+        parser.add_argument("--hilos", type=int, nargs="+", default=[1, 4, 8])
+        parser.add_argument("--tickets", type=int, default=400, help="Tickets por corrida.")
+        parser.add_argument("--productos", type=int, default=10, help="Productos de la sucursal a usar.")
+        parser.add_argument("--lineas", type=int, default=3, help="Líneas por ticket (máximo).")
+
+    def handle(self, *args, **opts):
+        if not basedatos.es_desechable(connection):
+            raise CommandError(
+                f"{connection.settings_dict['NAME']} no es una base de pruebas: usa una copia, "
+                "p. ej. SQLITE_PATH=/tmp/bench.sqlite3 (ver basedatos.es_desechable)."
+            )
+        caja = Caja.objects.filter(id=opts["caja"], estado="ABIERTA").select_related("apertura_usuario").first()
+        if not caja:
+            raise CommandError("Se necesita una caja ABIERTA.")
+        ids = list(
+            Producto.objects.filter(sucursal_id=caja.sucursal_id).order_by("id")
+            .values_list("id", flat=True)[:opts["productos"]]
+        )
+        if not ids:
+            raise CommandError("La sucursal de la caja no tiene productos.")
+
+        self.stdout.write(f"Perfil: {basedatos.perfil(connection)}")
+        for hilos in opts["hilos"]:
+            self._corrida(caja, ids, hilos, opts["tickets"], opts["lineas"])
+
+    def _corrida(self, caja, ids, hilos, total, max_lineas):
+        pendientes = iter(range(total))
+        lock = threading.Lock()
+        resultado = {"ok": 0, "bloqueos": 0, "errores": 0}
+        latencias = []
+
+        def trabajador(semilla):
+            azar = random.Random(semilla)
+            try:
+                while True:
+                    with lock:
+                        if next(pendientes, None) is None:
+                            return
+                    lineas = [(azar.choice(ids), azar.randint(1, 3)) for _ in range(azar.randint(1, max_lineas))]
+                    while True:
+                        t0 = time.perf_counter()
+                        try:
+                            registrar_ticket(caja, caja.apertura_usuario, lineas, True)
+                        except OperationalError as e:
+                            # "database is locked": venció el timeout esperando el lock
+                            with lock:
+                                resultado["bloqueos"] += 1
+                                abandonar = resultado["bloqueos"] > total
+                                resultado["errores"] += abandonar
+                            if abandonar:
+                                self.stderr.write(f"Se abandona: {e}")
+                                return
+                            continue
+                        with lock:
+                            resultado["ok"] += 1
+                            latencias.append(time.perf_counter() - t0)
+                        break
+            finally:
+                connections.close_all()
+
+        t0 = time.perf_counter()
+        trabajadores = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        segundos = time.perf_counter() - t0
+
+        latencias.sort()
+        p50 = latencias[len(latencias) // 2] * 1000 if latencias else 0
+        p95 = latencias[int(len(latencias) * 0.95) - 1] * 1000 if latencias else 0
+        self.stdout.write(
+            f"{hilos:>3} hilos: {resultado['ok']} tickets en {segundos:.2f} s "
+            f"({resultado['ok'] / segundos:.0f}/s) | p50 {p50:.1f} ms, p95 {p95:.1f} ms | "
+            f"reintentos por bloqueo: {resultado['bloqueos']}"
+        )
+        if resultado["errores"]:
+            raise CommandError("Demasiados bloqueos: la base no soporta esta concurrencia.")
@@ -0,0 +1,89 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from inventario.consultas import VentasQuery
+from inventario.exportes import COLUMNAS_EXPORT
+from inventario.models import Caja, Producto, Venta
+
+
+class _Rollback(Exception):
+    pass
+
+
+# Lo que pedía cada ruta a la base para exportar las mismas ventas
+PROYECCIONES = {
+    "modelos completos": lambda qs: qs.select_related("producto", "caja", "usuario", "caja__sucursal"),
+    "nombres por join": lambda qs: qs.values_list(
+        "creado_en", "caja__sucursal__nombre", "caja_id", "producto__nombre", "producto__codigo",
+        "cantidad", "precio_unitario", "total", "usuario__username",
+    ),
+    "COLUMNAS_EXPORT": lambda qs: qs.values_list(*COLUMNAS_EXPORT),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide lo que trae de la base la consulta de exportación de ventas (VentasQuery) con "
+        "cada proyección: modelos completos, columnas con nombres unidos por join y "
+        "exportes.COLUMNAS_EXPORT. Informa columnas, bytes por fila (texto de los valores) y "
+        "tiempo de lectura. Inserta ventas sintéticas dentro de una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=100_000)
+        parser.add_argument("--repeticiones", type=int, default=3)
+
+    def handle(self, *args, **opts):
+        caja = Caja.objects.select_related("sucursal").first()
+        producto = caja and Producto.objects.filter(sucursal=caja.sucursal).first()
+        if not producto:
+            raise CommandError("Se necesita al menos una caja y un producto de su sucursal.")
+
+        hoy = timezone.localdate()
+        consulta = VentasQuery(hoy, hoy, caja.sucursal_id)
+        try:
+            with transaction.atomic():
+                self._sembrar(caja, producto, opts["filas"])
+                for nombre, proyectar in PROYECCIONES.items():
+                    sql, params = proyectar(consulta.ventas().order_by("creado_en")).query.sql_with_params()
+                    filas, columnas, bytes_ = self._leer(sql, params)
+                    segundos = min(self._medir(sql, params) for _ in range(opts["repeticiones"]))
+                    self.stdout.write(
+                        f"{nombre:<18} | {columnas:>2} columnas | {bytes_ / max(filas, 1):6.1f} bytes/fila | "
+                        f"{filas} filas en {segundos * 1000:8.1f} ms"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _sembrar(self, caja, producto, n, lote=10_000):
+        precio = Decimal(producto.precio)
+        for inicio in range(0, n, lote):
+            Venta.objects.bulk_create([
+                Venta(caja=caja, producto=producto, cantidad=1, precio_unitario=precio,
+                      total=precio, usuario=caja.apertura_usuario)
+                for _ in range(min(lote, n - inicio))
+            ])
+
+    def _leer(self, sql, params):
+        """(filas, columnas, bytes): el texto de los valores crudos que devuelve el cursor."""
+        filas = bytes_ = 0
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            columnas = len(cursor.description)
+            while lote := cursor.fetchmany(2000):
+                filas += len(lote)
+                bytes_ += sum(len(str(v)) for fila in lote for v in fila if v is not None)
+        return filas, columnas, bytes_
+
+    def _medir(self, sql, params):
+        t0 = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            while cursor.fetchmany(2000):
+                pass
+        return time.perf_counter() - t0
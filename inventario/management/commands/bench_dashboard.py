@@ -0,0 +1,109 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from inventario import dashboard
+from inventario.consultas import VentasQuery
+from inventario.models import Producto, Sucursal, VentaDiaria
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _tres_group_by(desde, hasta):
+    """Ruta anterior: un GROUP BY por gráfica sobre el mismo rango."""
+    qs = VentasQuery(desde, hasta).resumen()
+    dias = list(qs.values("fecha").annotate(total=Sum("total")))
+    prod = list(qs.values("producto__nombre").annotate(total=Sum("total")).order_by("-total")[:10])
+    suc = list(qs.values("sucursal__nombre").annotate(total=Sum("total")).order_by("-total"))
+    return dias, prod, suc
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo del dashboard con tres GROUP BY vs. una sola consulta (dashboard.series) "
+        "sobre un resumen diario sintético (días × productos × sucursales) y verifica que las series "
+        "coincidan. Inserta las filas dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, nargs="+", default=[30, 365])
+        parser.add_argument("--productos", type=int, default=200, help="Productos por sucursal.")
+        parser.add_argument("--repeticiones", type=int, default=3)
+
+    def handle(self, *args, **opts):
+        sucursales = list(Sucursal.objects.values_list("id", flat=True))
+        if not sucursales:
+            raise CommandError("Se necesita al menos una sucursal.")
+        hasta = timezone.localdate()
+
+        for n_dias in sorted(opts["dias"]):
+            desde = hasta - timedelta(days=n_dias - 1)
+            try:
+                with transaction.atomic():
+                    filas = self._sembrar(sucursales, opts["productos"], desde, hasta)
+                    consulta = VentasQuery(desde, hasta)
+                    self._comparar(_tres_group_by(desde, hasta), dashboard.series(consulta))
+                    antes = self._medir(lambda: _tres_group_by(desde, hasta), opts["repeticiones"])
+                    despues = self._medir(lambda: dashboard.series(consulta), opts["repeticiones"])
+                    self.stdout.write(
+                        f"{n_dias:>4} días, {filas:>8} filas | 3 GROUP BY {antes * 1000:8.1f} ms | "
+                        f"una consulta {despues * 1000:8.1f} ms | x{antes / despues:.1f}"
+                    )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _sembrar(self, sucursales, por_sucursal, desde, hasta):
+        VentaDiaria.objects.filter(fecha__gte=desde, fecha__lte=hasta).delete()
+        productos = Producto.objects.bulk_create([
+            Producto(sucursal_id=s, nombre=f"Bench dashboard {s}-{i}", precio=Decimal("1000"), stock=0)
+            for s in sucursales for i in range(por_sucursal)
+        ])
+        if not all(p.pk for p in productos):
+            productos = list(Producto.objects.filter(nombre__startswith="Bench dashboard "))
+        dias = (hasta - desde).days + 1
+        lote = []
+        total = 0
+        for d in range(dias):
+            fecha = desde + timedelta(days=d)
+            for p in productos:
+                lote.append(VentaDiaria(sucursal_id=p.sucursal_id, producto_id=p.pk, fecha=fecha,
+                                        cantidad=(p.pk + d) % 7 + 1, total=Decimal((p.pk * 31 + d) % 9000 + 500)))
+            if len(lote) >= 20000:
+                VentaDiaria.objects.bulk_create(lote, batch_size=5000)
+                total += len(lote)
+                lote = []
+        VentaDiaria.objects.bulk_create(lote, batch_size=5000)
+        return total + len(lote)
+
+    def _comparar(self, anterior, nuevo):
+        dias, prod, suc = anterior
+        esperado = {
+            "dias": {d["fecha"].strftime("%Y-%m-%d"): float(d["total"]) for d in dias},
+            "productos": [float(p["total"]) for p in prod],
+            "sucursales": {s["sucursal__nombre"]: float(s["total"]) for s in suc},
+        }
+        obtenido = {
+            "dias": {d: t for d, t in zip(*nuevo["dias"]) if t},
+            "productos": nuevo["productos"][1],
+            "sucursales": dict(zip(*nuevo["sucursales"])),
+        }
+        for clave in esperado:
+            if esperado[clave] != obtenido[clave]:
+                raise CommandError(f"La serie {clave} no coincide con la de tres GROUP BY.")
+
+    def _medir(self, fn, repeticiones):
+        mejor = None
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            fn()
+            segundos = time.perf_counter() - t0
+            mejor = segundos if mejor is None else min(mejor, segundos)
+        return mejor
@@ -0,0 +1,107 @@
+import io
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.timezone import make_naive
+
+from inventario.models import Caja, Producto, Venta
+from inventario import exportes
+from inventario.fechas import rango_dias
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _xlsx_en_memoria(qs):
+    """Ruta anterior: instancia modelos y arma un Workbook normal en memoria."""
+    import openpyxl
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Ventas"
+    ws.append(exportes.ENCABEZADOS_VENTAS)
+    total_general = 0
+    for v in qs.select_related("producto", "caja", "usuario", "caja__sucursal").order_by("creado_en"):
+        ws.append([
+            make_naive(v.creado_en).strftime("%Y-%m-%d %H:%M"),
+            v.caja.sucursal.nombre,
+            v.caja_id,
+            v.producto.nombre,
+            v.cantidad,
+            float(v.precio_unitario),
+            float(v.total),
+            getattr(v.usuario, "username", "-"),
+        ])
+        total_general += float(v.total)
+    ws.append([])
+    ws.append(["", "", "", "", "", "TOTAL", total_general, ""])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf
+
+
+def _xlsx_write_only(qs):
+    tmp = exportes.xlsx_spool(qs)
+    tmp.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara memoria pico y tiempo de la exportación XLSX en memoria vs. write_only. "
+        "Inserta ventas sintéticas dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000])
+        parser.add_argument("--solo-nuevo", action="store_true",
+                            help="No ejecuta la ruta en memoria (útil para rangos enormes).")
+
+    def handle(self, *args, **opts):
+        if exportes.openpyxl is None:
+            raise CommandError("Instala openpyxl: pip install openpyxl")
+
+        caja = Caja.objects.select_related("sucursal").first()
+        producto = caja and Producto.objects.filter(sucursal=caja.sucursal).first()
+        if not producto:
+            raise CommandError("Se necesita al menos una caja y un producto de su sucursal.")
+
+        for n in sorted(opts["filas"]):
+            try:
+                with transaction.atomic():
+                    self._sembrar(caja, producto, n)
+                    hoy = timezone.localdate()
+                    inicio, fin = rango_dias(hoy, hoy)
+                    qs = Venta.objects.filter(caja=caja, creado_en__gte=inicio, creado_en__lt=fin)
+                    rutas = [("write_only", _xlsx_write_only)]
+                    if not opts["solo_nuevo"]:
+                        rutas.insert(0, ("en memoria", _xlsx_en_memoria))
+                    for nombre, fn in rutas:
+                        segundos, pico = self._medir(fn, qs)
+                        self.stdout.write(
+                            f"{n:>9} filas | {nombre:<10} | {segundos:8.2f} s | pico {pico / 2**20:9.1f} MiB"
+                        )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _sembrar(self, caja, producto, n, lote=10_000):
+        precio = Decimal(producto.precio)
+        for inicio in range(0, n, lote):
+            Venta.objects.bulk_create([
+                Venta(caja=caja, producto=producto, cantidad=1, precio_unitario=precio,
+                      total=precio, usuario=caja.apertura_usuario)
+                for _ in range(min(lote, n - inicio))
+            ])
+
+    def _medir(self, fn, qs):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn(qs)
+        segundos = time.perf_counter() - t0
+        _actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return segundos, pico
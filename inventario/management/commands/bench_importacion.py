@@ -0,0 +1,62 @@
+import csv
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventario.models import Sucursal
+from inventario import importacion
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide filas/segundo de importar_productos con un CSV sintético: primera carga "
+        "(inserciones) y recarga del mismo archivo (actualizaciones). Todo dentro de una "
+        "transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=20_000)
+        parser.add_argument("--sin-codigo", type=float, default=0.1,
+                            help="Fracción de filas sin código (se emparejan por nombre).")
+
+    def handle(self, *args, **opts):
+        sucursal = Sucursal.objects.first()
+        if not sucursal:
+            raise CommandError("Se necesita al menos una sucursal.")
+
+        datos = self._csv(opts["filas"], opts["sin_codigo"])
+        try:
+            with transaction.atomic():
+                for etapa in ("carga inicial", "recarga"):
+                    t0 = time.perf_counter()
+                    res = importacion.importar(
+                        importacion.leer_filas(io.BytesIO(datos), "bench.csv"), sucursal.id
+                    )
+                    segundos = time.perf_counter() - t0
+                    self.stdout.write(
+                        f"{etapa:<14} {res.filas} filas en {segundos:6.2f} s "
+                        f"({res.filas / segundos:8.0f}/s) | creados {res.creados} | "
+                        f"actualizados {res.actualizados} | errores {len(res.errores)}"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    @staticmethod
+    def _csv(n, sin_codigo):
+        rnd = random.Random(11)
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(importacion.COLUMNAS)
+        for i in range(n):
+            codigo = "" if rnd.random() < sin_codigo else f"BENCH{i:08d}"
+            w.writerow([codigo, f"Producto de prueba {i}", "Carga sintética", f"{rnd.randint(100, 99999)}.50",
+                        rnd.randint(0, 500)])
+        return buf.getvalue().encode()
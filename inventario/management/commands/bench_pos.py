@@ -0,0 +1,87 @@
+import json
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from inventario.models import Caja, Producto
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide ventas por segundo del flujo HTML (formulario + redirect a caja_detalle) "
+        "frente a la API JSON del punto de venta. Las ventas se registran dentro de una "
+        "transacción que se revierte al final: no quedan ventas, stock ni movimientos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--caja", type=int, required=True, help="Id de una caja ABIERTA.")
+        parser.add_argument("--producto", type=int, required=True, help="Id de un producto de esa sucursal.")
+        parser.add_argument("--usuario", required=True, help="Username de un Cajero de esa sucursal.")
+        parser.add_argument("--ventas", type=int, default=200, help="Ventas por cada flujo.")
+        parser.add_argument("--host", default="localhost", help="Cabecera Host (debe estar en ALLOWED_HOSTS).")
+
+    def handle(self, *args, **opts):
+        caja = Caja.objects.filter(id=opts["caja"], estado="ABIERTA").first()
+        producto = Producto.objects.filter(id=opts["producto"]).first()
+        usuario = User.objects.filter(username=opts["usuario"]).first()
+        if not caja or not producto or producto.sucursal_id != caja.sucursal_id or not usuario:
+            raise CommandError("Se necesita una caja ABIERTA, un producto de su sucursal y un usuario Cajero.")
+
+        n = opts["ventas"]
+        try:
+            # El cliente de pruebas corre en este hilo y con esta conexión: todo queda en la transacción
+            with transaction.atomic():
+                cliente = Client(HTTP_HOST=opts["host"])
+                cliente.force_login(usuario)
+                html = self._medir(n, lambda i: self._venta_html(cliente, caja, producto))
+                api = self._medir(n, lambda i: self._venta_api(cliente, caja, producto))
+                # Reintentos con la misma clave: no deben crear tickets nuevos
+                clave = uuid.uuid4().hex
+                tickets_antes = caja.tickets.count()
+                for _ in range(3):
+                    self._venta_api(cliente, caja, producto, clave)
+                repetidos = caja.tickets.count() - tickets_antes
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"HTML: {n} ventas en {html:.2f} s ({n / html:.0f}/s)")
+        self.stdout.write(f"API:  {n} ventas en {api:.2f} s ({n / api:.0f}/s)  x{html / api:.1f}")
+        if repetidos != 1:
+            raise CommandError(f"Idempotency-Key: 3 reintentos crearon {repetidos} ticket(s).")
+        self.stdout.write(self.style.SUCCESS("Idempotency-Key: 3 reintentos, 1 ticket."))
+
+    @staticmethod
+    def _medir(n, fn):
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        return time.perf_counter() - t0
+
+    @staticmethod
+    def _venta_html(cliente, caja, producto):
+        url = reverse("venta_nueva", args=[caja.id])
+        cliente.get(url)
+        r = cliente.post(url, {"producto": producto.id, "cantidad": 1}, follow=True)
+        if r.status_code != 200 or not r.redirect_chain:
+            raise CommandError(f"Flujo HTML falló ({r.status_code}).")
+
+    @staticmethod
+    def _venta_api(cliente, caja, producto, clave=None):
+        cabeceras = {"HTTP_IDEMPOTENCY_KEY": clave} if clave else {}
+        r = cliente.post(
+            reverse("api_venta", args=[caja.id]),
+            json.dumps({"lineas": [{"producto": producto.id, "cantidad": 1}]}),
+            content_type="application/json", **cabeceras,
+        )
+        if r.status_code != 201:
+            raise CommandError(f"API falló ({r.status_code}): {r.content[:200]!r}")
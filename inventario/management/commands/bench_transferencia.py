@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from inventario.models import Producto, Sucursal
+from inventario.transferencias import transferir
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica una transferencia sintética de N líneas entre dos sucursales y reporta "
+        "consultas y tiempo. La mitad de los productos ya existe en el destino. Todo "
+        "dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lineas", type=int, nargs="+", default=[10, 100, 1000])
+
+    def handle(self, *args, **opts):
+        sucursales = list(Sucursal.objects.order_by("id")[:2])
+        usuario = User.objects.order_by("id").first()
+        if len(sucursales) < 2 or not usuario:
+            raise CommandError("Se necesitan dos sucursales y un usuario.")
+        origen, destino = sucursales
+
+        for n in opts["lineas"]:
+            try:
+                with transaction.atomic():
+                    origenes = Producto.objects.bulk_create([
+                        Producto(sucursal=origen, nombre=f"Bench transfer {i}",
+                                 codigo=f"BT{i:06d}" if i % 2 else None, precio=1000, stock=50)
+                        for i in range(n)
+                    ])
+                    Producto.objects.bulk_create([
+                        Producto(sucursal=destino, nombre=p.nombre, codigo=p.codigo, precio=1000, stock=5)
+                        for p in origenes[: n // 2]
+                    ])
+                    antes = self._stock_total(origen, destino)
+                    with CaptureQueriesContext(connection) as consultas:
+                        t0 = time.perf_counter()
+                        transferir(origen.id, destino.id, usuario, [(p.pk, 3) for p in origenes])
+                        segundos = time.perf_counter() - t0
+                    despues = self._stock_total(origen, destino)
+                    self.stdout.write(
+                        f"{n:>6} líneas | {len(consultas):>3} consultas | {segundos * 1000:8.1f} ms | "
+                        f"stock origen {antes[0]}→{despues[0]}, destino {antes[1]}→{despues[1]}"
+                    )
+                    if sum(antes) != sum(despues) or antes[0] - despues[0] != 3 * n:
+                        raise CommandError("El stock total no se conservó.")
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    @staticmethod
+    def _stock_total(origen, destino):
+        qs = Producto.objects.filter(nombre__startswith="Bench transfer")
+        return (
+            qs.filter(sucursal=origen).aggregate(s=Sum("stock"))["s"] or 0,
+            qs.filter(sucursal=destino).aggregate(s=Sum("stock"))["s"] or 0,
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventario import movimientos
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea cortes de stock al cierre de --hasta (por defecto ayer) para los productos con "
+        "movimientos desde su último corte. Con --purgar borra los movimientos ya cubiertos "
+        "por un corte. Pensado para correr a diario (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hasta", help="Fecha AAAA-MM-DD (inclusive).")
+        parser.add_argument("--purgar", action="store_true",
+                            help="Borrar los movimientos anteriores al último corte de cada producto.")
+        parser.add_argument("--verificar", action="store_true",
+                            help="Comparar el stock actual con el que resulta del libro.")
+
+    def handle(self, *args, **opts):
+        hasta = None
+        if opts["hasta"]:
+            try:
+                hasta = parse_date(opts["hasta"])
+            except ValueError:
+                hasta = None
+            if hasta is None:
+                raise CommandError("--hasta debe tener el formato AAAA-MM-DD.")
+
+        try:
+            creados, borrados = movimientos.compactar(hasta, purgar=opts["purgar"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(f"Cortes creados: {creados} | movimientos borrados: {borrados}")
+
+        if opts["verificar"]:
+            desvios = movimientos.verificar()
+            for producto_id, guardado, libro in desvios[:50]:
+                self.stdout.write(f"Producto {producto_id}: stock {guardado}, según el libro {libro}")
+            if desvios:
+                raise CommandError(f"{len(desvios)} producto(s) con stock distinto al del libro.")
+            self.stdout.write(self.style.SUCCESS("El libro coincide con el stock actual."))
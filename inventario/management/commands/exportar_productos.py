@@ -0,0 +1,24 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.models import Sucursal
+from inventario import importacion
+
+
+class Command(BaseCommand):
+    help = "Exporta el catálogo de una sucursal a CSV, en el formato que lee importar_productos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sucursal", type=int, required=True)
+        parser.add_argument("--salida", help="Archivo CSV (por defecto, la salida estándar).")
+
+    def handle(self, *args, **opts):
+        if not Sucursal.objects.filter(id=opts["sucursal"]).exists():
+            raise CommandError("La sucursal no existe.")
+        if opts["salida"]:
+            with open(opts["salida"], "w", newline="", encoding="utf-8") as f:
+                n = importacion.exportar_csv(opts["sucursal"], f)
+            self.stderr.write(self.style.SUCCESS(f"{n} producto(s) exportado(s) a {opts['salida']}"))
+        else:
+            importacion.exportar_csv(opts["sucursal"], sys.stdout)
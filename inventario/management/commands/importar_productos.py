@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.models import Sucursal
+from inventario import importacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa el catálogo de una sucursal desde CSV o XLSX (columnas: codigo, nombre, "
+        "descripcion, precio, stock). Actualiza por código (o por nombre si la fila no trae "
+        "código) y reporta los errores por fila sin detener la carga."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo")
+        parser.add_argument("--sucursal", type=int, required=True)
+        parser.add_argument("--lote", type=int, default=importacion.IMPORT_LOTE)
+        parser.add_argument("--max-errores", type=int, default=50, help="Errores a listar (el resto solo se cuenta).")
+
+    def handle(self, *args, **opts):
+        if not Sucursal.objects.filter(id=opts["sucursal"]).exists():
+            raise CommandError("La sucursal no existe.")
+
+        t0 = time.perf_counter()
+        try:
+            with open(opts["archivo"], "rb") as f:
+                res = importacion.importar(
+                    importacion.leer_filas(f, opts["archivo"]), opts["sucursal"], lote=opts["lote"]
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        segundos = time.perf_counter() - t0
+
+        for fila, mensaje in res.errores[:opts["max_errores"]]:
+            self.stdout.write(self.style.WARNING(f"Fila {fila}: {mensaje}"))
+        if len(res.errores) > opts["max_errores"]:
+            self.stdout.write(f"... y {len(res.errores) - opts['max_errores']} error(es) más")
+        self.stdout.write(self.style.SUCCESS(
+            f"{res.filas} fila(s) en {segundos:.2f} s ({res.filas / max(segundos, 1e-9):.0f}/s): "
+            f"{res.creados} creado(s), {res.actualizados} actualizado(s), {len(res.errores)} error(es)"
+        ))
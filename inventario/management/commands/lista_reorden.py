@@ -0,0 +1,34 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventario import reorden
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista de reposición del día en CSV: productos con stock <= punto de reorden, "
+        "leídos del índice parcial producto_stock_bajo. Pensado para correr a diario (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sucursal", type=int, action="append", help="Limitar a esta sucursal (repetible).")
+        parser.add_argument("--salida", help="Archivo CSV de salida (por defecto la salida estándar).")
+
+    def handle(self, *args, **opts):
+        salida = open(opts["salida"], "w", newline="", encoding="utf-8") if opts["salida"] else sys.stdout
+        try:
+            writer = csv.writer(salida)
+            writer.writerow(["fecha", "sucursal", "codigo", "producto", "stock", "punto_reorden", "faltan"])
+            hoy = timezone.localdate().isoformat()
+            n = 0
+            for f in reorden.lista(opts["sucursal"]).iterator(chunk_size=2000):
+                writer.writerow([hoy, f["sucursal__nombre"], f["codigo"] or "", f["nombre"],
+                                 f["stock"], f["punto_reorden"], f["faltan"]])
+                n += 1
+        finally:
+            if salida is not sys.stdout:
+                salida.close()
+        self.stderr.write(f"{n} producto(s) a reponer.")
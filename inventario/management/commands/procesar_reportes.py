@@ -0,0 +1,53 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from inventario import reportes_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker local de reportes en segundo plano: toma ReporteJob pendientes "
+        "y genera sus archivos con un pool de hilos (solo base de datos + disco)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hilos", type=int, default=2, help="Reportes simultáneos.")
+        parser.add_argument("--intervalo", type=float, default=2.0,
+                            help="Segundos de espera cuando la cola está vacía.")
+        parser.add_argument("--una-vez", action="store_true",
+                            help="Procesa lo pendiente y termina.")
+
+    def handle(self, *args, **opts):
+        hilos = max(1, opts["hilos"])
+        recuperados = reportes_jobs.recuperar_interrumpidos()
+        if recuperados:
+            self.stdout.write(self.style.WARNING(f"{recuperados} reporte(s) interrumpido(s) vuelven a la cola"))
+
+        libres = threading.Semaphore(hilos)
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            while True:
+                libres.acquire()
+                job = reportes_jobs.reclamar_siguiente()
+                if job is None:
+                    libres.release()
+                    if opts["una_vez"]:
+                        break
+                    time.sleep(opts["intervalo"])
+                    continue
+                pool.submit(self._ejecutar, job, libres)
+
+    def _ejecutar(self, job, libres):
+        try:
+            job = reportes_jobs.procesar(job)
+            if job.estado == 'LISTO':
+                self.stdout.write(self.style.SUCCESS(f"{job} -> {job.archivo.name}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{job}: {job.error}"))
+        finally:
+            # Cada hilo abre su propia conexión; se cierra al terminar el job
+            connections.close_all()
+            libres.release()
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from inventario import resumenes
+
+
+def fecha(valor):
+    return datetime.strptime(valor, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen diario de ventas (VentaDiaria) a partir de las ventas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", type=fecha, help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--hasta", type=fecha, help="YYYY-MM-DD (inclusive)")
+
+    def handle(self, *args, **opts):
+        n = resumenes.reconstruir(opts["desde"], opts["hasta"])
+        self.stdout.write(self.style.SUCCESS(f"Resumen diario reconstruido: {n} fila(s)"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario import busqueda
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de productos (FTS5, solo SQLite)."
+
+    def handle(self, *args, **opts):
+        if not busqueda.disponible():
+            raise CommandError("No hay índice FTS5 en esta base de datos (se usa búsqueda icontains).")
+        n = busqueda.reindexar_todo()
+        self.stdout.write(self.style.SUCCESS(f"Índice de búsqueda reconstruido: {n} producto(s)"))
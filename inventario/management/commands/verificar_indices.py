@@ -0,0 +1,63 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from inventario.models import Caja, Sucursal
+from inventario.consultas import VentasQuery
+from inventario.exportes import COLUMNAS_EXPORT
+from inventario.views_caja import COLUMNAS_DETALLE
+
+
+# Tablas grandes que nunca deberían recorrerse completas
+TABLAS_VIGILADAS = ("inventario_venta", "inventario_caja", "inventario_ventadiaria")
+
+
+class Command(BaseCommand):
+    help = (
+        "Revisa con EXPLAIN QUERY PLAN (SQLite) que las consultas de reportes y caja "
+        "usen índices y no recorran completas las tablas de ventas/cajas."
+    )
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite":
+            raise CommandError("Esta verificación interpreta planes de SQLite.")
+
+        hoy = timezone.localdate()
+        suc_id = Sucursal.objects.values_list("id", flat=True).first() or 0
+        caja_id = Caja.objects.values_list("id", flat=True).first() or 0
+
+        consultas = {
+            "exportar (todas)": VentasQuery(hoy, hoy).ventas().order_by("creado_en").values_list(*COLUMNAS_EXPORT),
+            "exportar (sucursal)": VentasQuery(hoy, hoy, suc_id).ventas().order_by("creado_en").values_list(*COLUMNAS_EXPORT),
+            "exportar (alcance)": VentasQuery(hoy, hoy, None, frozenset([suc_id])).ventas().order_by("creado_en").values_list(*COLUMNAS_EXPORT),
+            "dashboard (resumen)": VentasQuery(hoy, hoy, suc_id).resumen().values("fecha"),
+            "caja_estado": Caja.objects.filter(sucursal__in=[suc_id], fecha=hoy).order_by("-creado_en"),
+            "apertura de caja": Caja.objects.filter(sucursal_id=suc_id, fecha=hoy, estado="ABIERTA"),
+            "caja_detalle": Caja(id=caja_id).ventas.order_by("-creado_en", "-id").values(*COLUMNAS_DETALLE),
+            "caja_detalle (cursor)": Caja(id=caja_id).ventas.filter(
+                Q(creado_en__lt=timezone.now()) | Q(creado_en=timezone.now(), id__lt=1)
+            ).order_by("-creado_en", "-id").values(*COLUMNAS_DETALLE),
+        }
+
+        fallas = 0
+        for nombre, qs in consultas.items():
+            plan = qs.explain()
+            malas = [linea for linea in plan.splitlines() if self._recorre_tabla(linea)]
+            if malas:
+                fallas += 1
+                self.stdout.write(self.style.ERROR(f"✗ {nombre}"))
+                for linea in malas:
+                    self.stdout.write(f"    {linea.strip()}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✓ {nombre}"))
+
+        if fallas:
+            raise CommandError(f"{fallas} consulta(s) recorren tablas completas.")
+
+    @staticmethod
+    def _recorre_tabla(linea):
+        m = re.search(r"\bSCAN (\w+)", linea)
+        return bool(m) and m.group(1) in TABLAS_VIGILADAS and "USING" not in linea
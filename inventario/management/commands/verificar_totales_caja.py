@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario import cajas
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los contadores de cada caja (total vendido, unidades, ventas) con sus "
+        "ventas reales. Con --reparar corrige las cajas desviadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--caja", type=int, action="append", help="Limitar a esta caja (repetible).")
+        parser.add_argument("--reparar", action="store_true")
+
+    def handle(self, *args, **opts):
+        desvios = cajas.verificar(reparar=opts["reparar"], cajas=opts["caja"])
+        for caja_id, guardado, real in desvios:
+            self.stdout.write(
+                f"Caja {caja_id}: guardado total={guardado[0]} items={guardado[1]} ventas={guardado[2]} | "
+                f"real total={real[0]} items={real[1]} ventas={real[2]}"
+            )
+        if not desvios:
+            self.stdout.write(self.style.SUCCESS("Contadores consistentes."))
+        elif opts["reparar"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(desvios)} caja(s) reparada(s)."))
+        else:
+            raise CommandError(f"{len(desvios)} caja(s) con contadores desviados (usa --reparar).")
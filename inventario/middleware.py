@@ -0,0 +1,19 @@
+# inventario/middleware.py
+from django.utils.functional import SimpleLazyObject
+
+from .permissions import principal
+
+
+class PrincipalMiddleware:
+    """
+    Expone request.principal (rol y sucursales permitidas, ver
+    permissions.Principal). Perezoso: solo se calcula si alguien lo usa.
+    Debe ir después de AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.principal = SimpleLazyObject(lambda: principal(request.user))
+        return self.get_response(request)
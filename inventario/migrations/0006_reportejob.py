@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_remove_perfil_sucursales_perfil_sucursal_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReporteJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('formato', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel')], max_length=4)),
+                ('desde', models.DateField()),
+                ('hasta', models.DateField()),
+                ('alcance', models.CharField(max_length=255)),
+                ('firma', models.CharField(blank=True, max_length=64)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'PENDIENTE'), ('PROCESANDO', 'PROCESANDO'), ('LISTO', 'LISTO'), ('ERROR', 'ERROR')], default='PENDIENTE', max_length=10)),
+                ('archivo', models.FileField(blank=True, upload_to='reportes/')),
+                ('error', models.TextField(blank=True)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('terminado_en', models.DateTimeField(blank=True, null=True)),
+                ('sucursal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='inventario.sucursal')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reportes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'creado_en'], name='inventario__estado_5feaa0_idx'), models.Index(fields=['formato', 'desde', 'hasta', 'alcance'], name='inventario__formato_714427_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def poblar_resumen(apps, schema_editor):
+    """Carga inicial del resumen diario a partir de las ventas existentes."""
+    Venta = apps.get_model('inventario', 'Venta')
+    VentaDiaria = apps.get_model('inventario', 'VentaDiaria')
+    filas = (
+        Venta.objects
+        .values('caja__sucursal_id', 'producto_id', dia=TruncDate('creado_en'))
+        .annotate(cant=Sum('cantidad'), monto=Sum('total'))
+    )
+    VentaDiaria.objects.bulk_create([
+        VentaDiaria(sucursal_id=f['caja__sucursal_id'], producto_id=f['producto_id'],
+                    fecha=f['dia'], cantidad=f['cant'], total=f['monto'])
+        for f in filas.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0006_reportejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='inventario.producto')),
+                ('sucursal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='inventario.sucursal')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha'], name='inventario__fecha_133004_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sucursal', 'fecha', 'producto'), name='venta_diaria_unica')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0007_ventadiaria'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='caja',
+            index=models.Index(fields=['sucursal', 'fecha', 'estado'], name='inventario__sucursa_991b99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['sucursal', 'nombre'], name='inventario__sucursa_8be67f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['caja', 'creado_en'], name='inventario__caja_id_ee52d2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['creado_en'], name='inventario__creado__f647ed_idx'),
+        ),
+    ]
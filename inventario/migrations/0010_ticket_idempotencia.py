@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0009_ticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='clave_idempotencia',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.UniqueConstraint(fields=('caja', 'clave_idempotencia'), name='ticket_idempotencia_unica'),
+        ),
+    ]
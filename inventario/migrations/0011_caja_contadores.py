@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:25
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def poblar_contadores(apps, schema_editor):
+    """Carga inicial de los contadores a partir de las ventas existentes."""
+    Caja = apps.get_model('inventario', 'Caja')
+    Venta = apps.get_model('inventario', 'Venta')
+    filas = (
+        Venta.objects.values('caja_id')
+        .annotate(monto=Sum('total'), items=Sum('cantidad'), n=Count('id'))
+        .order_by()
+    )
+    for f in filas.iterator():
+        Caja.objects.filter(pk=f['caja_id']).update(
+            total_vendido=f['monto'], num_items=f['items'], num_ventas=f['n'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0010_ticket_idempotencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caja',
+            name='total_vendido',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='caja',
+            name='num_items',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='caja',
+            name='num_ventas',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+from django.db import migrations
+
+# Copia fija del SQL de inventario/busqueda.py a la fecha de esta migración: los
+# cambios posteriores de ese módulo no deben alterar lo que hace una migración ya aplicada.
+SQL_CREAR = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventario_producto_fts USING fts5("
+    "nombre, descripcion, sucursal, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+)
+
+SQL_CARGAR = (
+    "INSERT INTO inventario_producto_fts (rowid, nombre, descripcion, sucursal) "
+    "SELECT p.id, p.nombre, p.descripcion, s.nombre "
+    "FROM inventario_producto p JOIN inventario_sucursal s ON s.id = p.sucursal_id"
+)
+
+SQL_OPTIMIZAR = "INSERT INTO inventario_producto_fts(inventario_producto_fts) VALUES ('optimize')"
+
+
+def crear_indice(apps, schema_editor):
+    """Crea y carga el índice FTS5 de productos (solo SQLite)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(SQL_CREAR)
+    schema_editor.execute(SQL_CARGAR)
+    schema_editor.execute(SQL_OPTIMIZAR)
+
+
+def borrar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS inventario_producto_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0011_caja_contadores'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, borrar_indice),
+    ]
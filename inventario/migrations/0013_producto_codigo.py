@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0012_producto_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='codigo',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='producto',
+            constraint=models.UniqueConstraint(fields=('sucursal', 'codigo'), name='producto_codigo_unico', violation_error_message='Ya existe un producto con ese código en la sucursal.'),
+        ),
+    ]
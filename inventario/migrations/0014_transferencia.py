@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0013_producto_codigo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transferencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nota', models.CharField(blank=True, max_length=200)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('destino', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transferencias_entrada', to='inventario.sucursal')),
+                ('origen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transferencias_salida', to='inventario.sucursal')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TransferenciaLinea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField()),
+                ('producto_destino', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventario.producto')),
+                ('producto_origen', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventario.producto')),
+                ('transferencia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineas', to='inventario.transferencia')),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def corte_inicial(apps, schema_editor):
+    """
+    El libro empieza vacío: un corte con el stock actual de cada producto es el
+    punto de partida para calcular el stock a una fecha.
+    """
+    Producto = apps.get_model('inventario', 'Producto')
+    CorteStock = apps.get_model('inventario', 'CorteStock')
+    ahora = timezone.now()
+    CorteStock.objects.bulk_create([
+        CorteStock(producto_id=pid, fecha=ahora, stock=stock)
+        for pid, stock in Producto.objects.values_list('id', 'stock').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0014_transferencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorteStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField()),
+                ('stock', models.PositiveIntegerField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cortes', to='inventario.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha'], name='inventario__fecha_f23be0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'fecha'), name='corte_stock_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovimientoStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('VENTA', 'Venta'), ('AJUSTE', 'Ajuste'), ('TRANSFERENCIA', 'Transferencia'), ('IMPORTACION', 'Importación')], max_length=14)),
+                ('cantidad', models.IntegerField()),
+                ('referencia', models.CharField(blank=True, max_length=40)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='inventario.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['producto', 'creado_en'], name='inventario__product_137d2b_idx'), models.Index(fields=['creado_en'], name='inventario__creado__c7be4d_idx')],
+            },
+        ),
+        migrations.RunPython(corte_inicial, migrations.RunPython.noop),
+    ]
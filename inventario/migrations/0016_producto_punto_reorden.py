@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0015_movimientos_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='punto_reorden',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('stock__lte', models.F('punto_reorden'))), fields=['sucursal', 'stock'], name='producto_stock_bajo'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    La tabla de sucursales seguía con el esquema de 0001 (created_at NOT NULL sin
+    valor en el modelo, direccion/telefono NOT NULL): crear una sucursal fallaba.
+    """
+
+    dependencies = [
+        ('inventario', '0016_producto_punto_reorden'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='sucursal',
+            name='created_at',
+        ),
+        migrations.AlterField(
+            model_name='sucursal',
+            name='nombre',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='sucursal',
+            name='direccion',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sucursal',
+            name='telefono',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+    ]
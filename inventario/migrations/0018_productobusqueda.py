@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Solo estado: ProductoBusqueda es la tabla FTS5 que crea 0012 (managed=False),
+    declarada para que busqueda.buscar() la una a Producto con el ORM.
+    """
+
+    dependencies = [
+        ('inventario', '0017_sucursal_alinear_modelo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductoBusqueda',
+            fields=[
+                ('producto', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='busqueda', serialize=False, to='inventario.producto')),
+            ],
+            options={
+                'db_table': 'inventario_producto_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    El índice (sucursal, fecha, estado) de 0008 repetía el índice único de
+    Caja: cada INSERT/UPDATE de caja mantenía dos índices para las mismas
+    búsquedas.
+    """
+
+    dependencies = [
+        ('inventario', '0018_productobusqueda'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='caja',
+            name='inventario__sucursa_991b99_idx',
+        ),
+    ]
@@ -43,9 +43,15 @@ class Caja(models.Model):
     estado = models.CharField(max_length=10, choices=ESTADOS, default='ABIERTA')
     apertura_usuario = models.ForeignKey(User, on_delete=models.PROTECT, related_name='cajas_abiertas')
     cierre_usuario = models.ForeignKey(User, on_delete=models.PROTECT, related_name='cajas_cerradas', null=True, blank=True)
+    # Contadores que se actualizan junto con cada venta (ver cajas.py)
+    total_vendido = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    num_items = models.IntegerField(default=0, editable=False)
+    num_ventas = models.IntegerField(default=0, editable=False)
     creado_en = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # Su índice único ya sirve para buscar la caja del día por sucursal
+        # (caja_estado, validación de apertura): no hace falta otro
         unique_together = ('sucursal', 'fecha', 'estado')
 
     def __str__(self):
@@ -54,18 +60,73 @@ class Caja(models.Model):
 
 class Producto(models.Model):
     nombre = models.CharField(max_length=120)
+    # Código de barras / SKU, único dentro de la sucursal (ver codigos.py)
+    codigo = models.CharField(max_length=64, null=True, blank=True)
     descripcion = models.TextField(blank=True)
     precio = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
+    # Con stock <= punto_reorden el producto entra en la lista de reposición (ver reorden.py)
+    punto_reorden = models.PositiveIntegerField(default=0)
     sucursal = models.ForeignKey(Sucursal, on_delete=models.CASCADE, related_name='productos')
     fecha_creacion = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['sucursal', 'nombre']),
+            # Índice parcial: solo contiene los productos a reponer
+            models.Index(
+                fields=['sucursal', 'stock'], name='producto_stock_bajo',
+                condition=models.Q(stock__lte=models.F('punto_reorden')),
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sucursal', 'codigo'], name='producto_codigo_unico',
+                violation_error_message='Ya existe un producto con ese código en la sucursal.',
+            ),
+        ]
+
     def __str__(self):
         return self.nombre
 
 
+class ProductoBusqueda(models.Model):
+    """
+    Fila del índice FTS5 de productos (tabla virtual de la migración 0012, solo
+    SQLite). Sin tabla propia: existe para que busqueda.buscar() pueda unirla
+    a Producto por rowid en el ORM.
+    """
+    producto = models.OneToOneField(
+        Producto, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='busqueda',
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'inventario_producto_fts'
+
+
+class Ticket(models.Model):
+    """Cabecera de una venta de varios productos; cada línea es una Venta."""
+    caja = models.ForeignKey(Caja, on_delete=models.CASCADE, related_name='tickets')
+    usuario = models.ForeignKey(User, on_delete=models.PROTECT)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    # Clave enviada por la terminal (API POS) para no duplicar reintentos
+    clave_idempotencia = models.CharField(max_length=64, null=True, blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['caja', 'clave_idempotencia'], name='ticket_idempotencia_unica'),
+        ]
+
+    def __str__(self):
+        return f"Ticket #{self.pk} - {self.total}"
+
+
 class Venta(models.Model):
     caja = models.ForeignKey(Caja, on_delete=models.CASCADE, related_name='ventas')
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name='lineas', null=True, blank=True)
     producto = models.ForeignKey(Producto, on_delete=models.PROTECT)
     cantidad = models.PositiveIntegerField()
     precio_unitario = models.DecimalField(max_digits=12, decimal_places=2)
@@ -73,5 +134,162 @@ class Venta(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.PROTECT)
     creado_en = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Ventas de una caja en orden (caja_detalle, cierre)
+            models.Index(fields=['caja', 'creado_en']),
+            # Rangos de fechas de los reportes (ver fechas.rango_dias)
+            models.Index(fields=['creado_en']),
+        ]
+
     def __str__(self):
         return f"Venta {self.producto} x{self.cantidad}"
+
+
+class ReporteJob(models.Model):
+    """
+    Exportación de ventas ejecutada en segundo plano (ver manage.py procesar_reportes).
+    El archivo generado queda en MEDIA_ROOT/reportes/ y se reutiliza mientras la
+    firma de las ventas del rango no cambie.
+    """
+    ESTADOS = (
+        ('PENDIENTE', 'PENDIENTE'),
+        ('PROCESANDO', 'PROCESANDO'),
+        ('LISTO', 'LISTO'),
+        ('ERROR', 'ERROR'),
+    )
+    FORMATOS = (
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+    )
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reportes')
+    formato = models.CharField(max_length=4, choices=FORMATOS)
+    desde = models.DateField()
+    hasta = models.DateField()
+    # None = todas las sucursales del alcance
+    sucursal = models.ForeignKey(Sucursal, on_delete=models.CASCADE, null=True, blank=True)
+    # Sucursales permitidas al solicitante ("*" = sin restricción, o ids "1,3")
+    alcance = models.CharField(max_length=255)
+    # Huella de las ventas del rango al generar el archivo (ver consultas.VentasQuery.firma)
+    firma = models.CharField(max_length=64, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='PENDIENTE')
+    archivo = models.FileField(upload_to='reportes/', blank=True)
+    error = models.TextField(blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'creado_en']),
+            models.Index(fields=['formato', 'desde', 'hasta', 'alcance']),
+        ]
+
+    def __str__(self):
+        return f"Reporte {self.formato} {self.desde} a {self.hasta} ({self.estado})"
+
+
+class VentaDiaria(models.Model):
+    """
+    Resumen de ventas por (sucursal, producto, día local). Se acumula al registrar
+    cada venta (ver resumenes.py) y se puede reconstruir con
+    manage.py reconstruir_ventas_diarias. El dashboard lee de aquí.
+    """
+    sucursal = models.ForeignKey(Sucursal, on_delete=models.CASCADE, related_name='ventas_diarias')
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='ventas_diarias')
+    fecha = models.DateField()
+    cantidad = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sucursal', 'fecha', 'producto'], name='venta_diaria_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.sucursal} - {self.producto}: {self.total}"
+
+
+class Transferencia(models.Model):
+    """
+    Traslado de mercancía entre sucursales. Se aplica al crearse: el stock sale
+    de los productos de origen y entra en los equivalentes del destino en la
+    misma transacción (ver transferencias.py).
+    """
+    origen = models.ForeignKey(Sucursal, on_delete=models.CASCADE, related_name='transferencias_salida')
+    destino = models.ForeignKey(Sucursal, on_delete=models.CASCADE, related_name='transferencias_entrada')
+    usuario = models.ForeignKey(User, on_delete=models.PROTECT)
+    nota = models.CharField(max_length=200, blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Transferencia #{self.pk} {self.origen} → {self.destino}"
+
+
+class TransferenciaLinea(models.Model):
+    transferencia = models.ForeignKey(Transferencia, on_delete=models.CASCADE, related_name='lineas')
+    producto_origen = models.ForeignKey(Producto, on_delete=models.PROTECT, related_name='+')
+    producto_destino = models.ForeignKey(Producto, on_delete=models.PROTECT, related_name='+')
+    cantidad = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.producto_origen} x{self.cantidad}"
+
+
+class MovimientoStock(models.Model):
+    """
+    Libro de movimientos de stock: solo se agregan filas. Cada cambio de
+    Producto.stock escribe aquí su diferencia con signo (ver movimientos.py).
+    """
+    VENTA = 'VENTA'
+    AJUSTE = 'AJUSTE'
+    TRANSFERENCIA = 'TRANSFERENCIA'
+    IMPORTACION = 'IMPORTACION'
+    TIPOS = (
+        (VENTA, 'Venta'),
+        (AJUSTE, 'Ajuste'),
+        (TRANSFERENCIA, 'Transferencia'),
+        (IMPORTACION, 'Importación'),
+    )
+
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='movimientos')
+    tipo = models.CharField(max_length=14, choices=TIPOS)
+    cantidad = models.IntegerField()
+    # Origen del movimiento, p. ej. "ticket:12" o "transferencia:3"
+    referencia = models.CharField(max_length=40, blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Rango de movimientos de un producto desde su último corte
+            models.Index(fields=['producto', 'creado_en']),
+            # Segmentos por fecha para compactar_movimientos
+            models.Index(fields=['creado_en']),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.producto} {self.cantidad:+d}"
+
+
+class CorteStock(models.Model):
+    """
+    Stock de un producto en un momento dado (incluye los movimientos con
+    creado_en < fecha). Los crea manage.py compactar_movimientos.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='cortes')
+    fecha = models.DateTimeField()
+    stock = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'fecha'], name='corte_stock_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.producto} al {self.fecha}: {self.stock}"
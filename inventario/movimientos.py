@@ -0,0 +1,126 @@
+# inventario/movimientos.py
+"""
+Libro de movimientos de stock (MovimientoStock) y cortes (CorteStock).
+
+Cada cambio de Producto.stock agrega, con un bulk_create en la misma
+transacción, la diferencia realmente aplicada por producto (ver stock.py,
+importacion.py y la señal de ajuste manual en signals.py).
+
+El stock a una fecha sale del último corte anterior más los movimientos
+desde ese corte, no de recorrer toda la historia. manage.py
+compactar_movimientos crea cortes periódicos para que ese rango quede acotado.
+Igual que en fechas.py los intervalos son semiabiertos: un corte con fecha F
+incluye los movimientos con creado_en < F.
+
+El libro empieza con el corte inicial de la migración 0015: antes de esa fecha
+los productos que ya existían no tienen historia.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import DateTimeField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .fechas import inicio_del_dia
+from .models import CorteStock, MovimientoStock, Producto
+
+COMPACTAR_LOTE = 1000
+
+_SIN_CORTE = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def registrar(deltas, tipo, referencia=''):
+    """Agrega un movimiento por producto ({producto_id: diferencia}); omite los ceros."""
+    movimientos = [
+        MovimientoStock(producto_id=pid, tipo=tipo, cantidad=delta, referencia=referencia)
+        for pid, delta in deltas.items() if delta
+    ]
+    MovimientoStock.objects.bulk_create(movimientos, batch_size=500)
+    return len(movimientos)
+
+
+def _momento(fecha):
+    """Un date se toma como el fin de ese día local (inicio del siguiente)."""
+    if isinstance(fecha, datetime):
+        return fecha
+    return inicio_del_dia(fecha + timedelta(days=1))
+
+
+def stock_al(fecha, productos=None):
+    """
+    {producto_id: stock} en una fecha (datetime, o date = al cierre de ese día).
+    productos: queryset de Producto (por defecto todos). Una sola consulta con
+    dos subconsultas por producto sobre índices: su último corte <= fecha y la
+    suma de sus movimientos entre ese corte y la fecha.
+    """
+    momento = _momento(fecha)
+    qs = Producto.objects.all() if productos is None else productos
+    cortes = CorteStock.objects.filter(producto=OuterRef('pk'), fecha__lte=momento).order_by('-fecha')
+    movimientos = (
+        MovimientoStock.objects.filter(
+            producto=OuterRef('pk'),
+            creado_en__gte=Coalesce(OuterRef('corte_fecha'), Value(_SIN_CORTE, output_field=DateTimeField())),
+            creado_en__lt=momento,
+        )
+        .order_by().values('producto').annotate(suma=Sum('cantidad')).values('suma')
+    )
+    filas = (
+        qs.order_by()
+        .annotate(corte_fecha=Subquery(cortes.values('fecha')[:1]))
+        .annotate(corte_stock=Subquery(cortes.values('stock')[:1]), delta=Subquery(movimientos))
+        .values_list('pk', 'corte_stock', 'delta')
+    )
+    return {pid: (base or 0) + (delta or 0) for pid, base, delta in filas}
+
+
+def compactar(hasta=None, purgar=False, lote=COMPACTAR_LOTE):
+    """
+    Crea un corte en 'hasta' (por defecto el cierre de ayer) para cada producto
+    con movimientos desde el corte anterior. Solo recorre el segmento
+    [último corte, hasta). Con purgar, borra los movimientos que ya quedaron
+    cubiertos por un corte: el stock a fechas anteriores se sigue pudiendo
+    consultar, pero solo con la resolución de los cortes.
+    Devuelve (cortes_creados, movimientos_borrados). ValueError si hasta no pasó.
+    """
+    momento = _momento(hasta or timezone.localdate() - timedelta(days=1))
+    if momento > timezone.now():
+        # Un corte a futuro dejaría fuera movimientos que todavía pueden llegar
+        raise ValueError("Solo se pueden compactar fechas ya cerradas.")
+    desde = CorteStock.objects.filter(fecha__lt=momento).aggregate(m=Max('fecha'))['m'] or _SIN_CORTE
+
+    pendientes = list(
+        MovimientoStock.objects.filter(creado_en__gte=desde, creado_en__lt=momento)
+        .order_by().values_list('producto', flat=True).distinct()
+    )
+    antes = CorteStock.objects.filter(fecha=momento).count()
+    for i in range(0, len(pendientes), lote):
+        stock = stock_al(momento, Producto.objects.filter(pk__in=pendientes[i:i + lote]))
+        # ignore_conflicts: volver a correr con la misma fecha no duplica cortes
+        CorteStock.objects.bulk_create(
+            [CorteStock(producto_id=pid, fecha=momento, stock=s) for pid, s in stock.items()],
+            ignore_conflicts=True,
+        )
+    creados = CorteStock.objects.filter(fecha=momento).count() - antes
+
+    borrados = 0
+    if purgar:
+        ultimo_corte = (
+            CorteStock.objects.filter(producto=OuterRef('producto'), fecha__lte=momento)
+            .order_by('-fecha').values('fecha')[:1]
+        )
+        borrados, _ = (
+            MovimientoStock.objects.filter(creado_en__lt=momento)
+            .filter(creado_en__lt=Subquery(ultimo_corte)).delete()
+        )
+    return creados, borrados
+
+
+def verificar(productos=None):
+    """[(producto_id, stock_guardado, stock_del_libro), ...] de los productos desviados."""
+    qs = Producto.objects.all() if productos is None else productos
+    libro = stock_al(timezone.now() + timedelta(seconds=1), qs)
+    return [
+        (pid, stock, libro.get(pid, 0))
+        for pid, stock in qs.values_list('pk', 'stock').iterator()
+        if stock != libro.get(pid, 0)
+    ]
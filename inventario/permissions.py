@@ -1,38 +1,119 @@
 # inventario/permissions.py
+from dataclasses import dataclass, field
+
+from . import cache
 from .models import Sucursal
 
+# Roles con acceso a todas las sucursales
+ROLES_GLOBALES = ('Administrador', 'Subadministrador')
+
+# Caché entre requests en los espacios 'sucursales' y 'perfiles' (cache.py);
+# se invalida con señales de Sucursal/Perfil, ver signals.py. Las sucursales
+# que autorizan (Principal.sucursal_ids) se leen siempre de la BD: con la caché
+# local por proceso, otro worker seguiría autorizando una sucursal borrada
+
+
+def todas_las_sucursal_ids():
+    """frozenset con los ids de todas las sucursales (sin caché, ver arriba)."""
+    return frozenset(Sucursal.objects.values_list('id', flat=True))
+
+
+def nombres_de_sucursales(ids=None):
+    """
+    [(id, nombre), ...] por nombre de las sucursales indicadas (todas con None),
+    para los selectores. Sale de la caché: no consulta la BD.
+    """
+    nombres = cache.obtener(
+        'sucursales', 'nombres', lambda: list(Sucursal.objects.order_by('nombre', 'id').values_list('id', 'nombre')),
+    )
+    return nombres if ids is None else [(i, n) for i, n in nombres if i in ids]
+
+
+def invalidar_perfil(user_id):
+    cache.borrar('perfiles', user_id)
+
+
+def _perfil_cacheado(user):
+    """(rol, sucursal_id) del Perfil del usuario, o (None, None) si no tiene."""
+    if not getattr(user, 'pk', None):
+        return None, None
+    if user.__class__.perfil.is_cached(user):
+        # Cargado junto con el usuario (backends.PerfilBackend): sin consultas
+        perfil = getattr(user, 'perfil', None)
+        return (perfil.rol, perfil.sucursal_id) if perfil else (None, None)
+
+    def leer():
+        perfil = getattr(user, 'perfil', None)
+        return (perfil.rol, perfil.sucursal_id) if perfil else (None, None)
+    return cache.obtener('perfiles', user.pk, leer)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Rol y sucursales permitidas del usuario del request."""
+    rol: str | None
+    sucursal_id: int | None
+    sucursal_ids: frozenset = field(default_factory=frozenset)
+
+    @property
+    def es_global(self) -> bool:
+        return self.rol in ROLES_GLOBALES
+
+    def puede(self, sucursal_id) -> bool:
+        return sucursal_id in self.sucursal_ids
+
+
+def principal(user) -> Principal:
+    """
+    Principal del usuario. Se memoriza en el propio objeto user, que vive lo
+    que dura el request; PrincipalMiddleware lo expone como request.principal.
+    """
+    memo = getattr(user, '_principal', None)
+    if memo is None:
+        rol, sucursal_id = _perfil_cacheado(user)
+        if rol in ROLES_GLOBALES:
+            ids = todas_las_sucursal_ids()
+        elif sucursal_id and user.__class__.perfil.is_cached(user):
+            # Perfil leído en este request: la FK garantiza que la sucursal existe
+            ids = frozenset([sucursal_id])
+        elif sucursal_id:
+            # Perfil de la caché: la sucursal pudo borrarse (SET_NULL no dispara señales de Perfil)
+            ids = frozenset(Sucursal.objects.filter(id=sucursal_id).values_list('id', flat=True))
+        else:
+            ids = frozenset()
+        memo = Principal(rol=rol, sucursal_id=sucursal_id, sucursal_ids=ids)
+        user._principal = memo
+    return memo
+
+
+def role_and_sucursal_ids(user):
+    """Retorna (rol, frozenset_de_ids_de_sucursales_permitidas). Ver principal()."""
+    p = principal(user)
+    return p.rol, p.sucursal_ids
+
+
 def user_role(user):
     """
     Retorna el rol del usuario según su Perfil, o None si no tiene perfil.
     """
-    perfil = getattr(user, 'perfil', None)
-    return getattr(perfil, 'rol', None) if perfil else None
+    return principal(user).rol
 
 
 def role_and_sucursales(user):
     """
-    Retorna (rol, lista_de_sucursales_permitidas) para el usuario.
+    Retorna (rol, sucursales_permitidas) para el usuario (queryset perezoso).
 
     - Administrador / Subadministrador: acceso a TODAS las sucursales.
     - Cajero / Supervisión: solo a su sucursal asignada (si existe).
-    - Sin perfil: (None, [])
+    - Sin perfil: (None, vacío)
+    Para filtrar o validar preferir role_and_sucursal_ids(), que no consulta la BD.
     """
-    perfil = getattr(user, 'perfil', None)
-    if not perfil:
-        return None, []
-
-    if perfil.rol in ['Administrador', 'Subadministrador']:
-        return perfil.rol, list(Sucursal.objects.all())
-    elif perfil.sucursal:
-        return perfil.rol, [perfil.sucursal]
-    else:
-        return perfil.rol, []
+    rol, ids = role_and_sucursal_ids(user)
+    return rol, Sucursal.objects.filter(id__in=ids)
 
 
 def role_and_sucursal(user, sucursal_id):
     """
     True si el usuario puede operar sobre la sucursal indicada (por id).
-    Implementado sobre role_and_sucursales().
     """
-    rol, sucursales = role_and_sucursales(user)
-    return any(s.id == sucursal_id for s in sucursales)
+    return principal(user).puede(sucursal_id)
@@ -0,0 +1,36 @@
+# inventario/reorden.py
+"""
+Productos a reponer: stock <= punto_reorden.
+
+El índice parcial producto_stock_bajo (sucursal, stock) solo guarda esas
+filas, así que la lista sale de recorrer el índice y no la tabla. La base lo
+mantiene al día con el mismo UPDATE que descuenta stock al vender
+(stock.descontar_lote), sin trabajo extra en Python. Para que el motor use
+el índice, las consultas deben repetir la condición tal cual
+(stock__lte=F('punto_reorden')), como hace stock_bajo().
+
+Un producto sin punto de reorden (0) aparece solo cuando se agota.
+"""
+from django.db.models import F
+
+from .models import Producto
+
+CAMPOS = ('id', 'sucursal_id', 'sucursal__nombre', 'codigo', 'nombre', 'stock', 'punto_reorden')
+
+
+def stock_bajo(sucursal_ids=None):
+    """Queryset de productos a reponer, por sucursal y de menor a mayor stock."""
+    qs = Producto.objects.filter(stock__lte=F('punto_reorden'))
+    if sucursal_ids is not None:
+        qs = qs.filter(sucursal_id__in=sucursal_ids)
+    return qs.order_by('sucursal_id', 'stock', 'id')
+
+
+def lista(sucursal_ids=None):
+    """Filas (dict) para la vista y el comando lista_reorden; faltan = punto_reorden - stock."""
+    return stock_bajo(sucursal_ids).annotate(faltan=F('punto_reorden') - F('stock')).values(*CAMPOS, 'faltan')
+
+
+def en_reorden(producto_ids):
+    """[(id, nombre, stock), ...] de los indicados que quedaron en punto de reorden."""
+    return list(stock_bajo().filter(pk__in=list(producto_ids)).values_list('id', 'nombre', 'stock'))
@@ -0,0 +1,104 @@
+# inventario/reportes_jobs.py
+"""
+Cola de reportes en segundo plano sobre la propia base de datos (sin broker).
+
+- solicitar(): crea un ReporteJob o reutiliza uno equivalente (mismo alcance,
+  formato, rango y sucursal) si está en curso o si su archivo sigue vigente.
+- reclamar_siguiente() / procesar(): los usa el worker (manage.py procesar_reportes).
+"""
+import tempfile
+
+from django.core.files import File
+from django.utils import timezone
+
+from .models import ReporteJob
+from .consultas import VentasQuery, alcance_de
+from .exportes import csv_stream, xlsx_spool
+
+
+def solicitar(usuario, formato, consulta):
+    """
+    Devuelve el ReporteJob que atiende la solicitud (consulta: VentasQuery):
+      1) uno equivalente PENDIENTE/PROCESANDO, o
+      2) uno LISTO cuya firma coincide con las ventas actuales del rango, o
+      3) uno nuevo en estado PENDIENTE.
+    """
+    alcance = alcance_de(consulta.permitidas_ids)
+    previos = ReporteJob.objects.filter(
+        formato=formato, desde=consulta.desde, hasta=consulta.hasta,
+        sucursal_id=consulta.sucursal_id, alcance=alcance,
+    ).order_by('-creado_en')
+
+    en_curso = previos.filter(estado__in=['PENDIENTE', 'PROCESANDO']).first()
+    if en_curso:
+        return en_curso
+
+    firma = consulta.firma()
+    vigente = previos.filter(estado='LISTO', firma=firma).first()
+    if vigente:
+        return vigente
+
+    return ReporteJob.objects.create(
+        usuario=usuario, formato=formato, desde=consulta.desde, hasta=consulta.hasta,
+        sucursal_id=consulta.sucursal_id, alcance=alcance,
+    )
+
+
+def recuperar_interrumpidos():
+    """Devuelve a la cola los jobs que quedaron PROCESANDO (p. ej. el worker murió)."""
+    return ReporteJob.objects.filter(estado='PROCESANDO').update(estado='PENDIENTE')
+
+
+def reclamar_siguiente():
+    """
+    Toma el job PENDIENTE más antiguo. El UPDATE condicional garantiza que dos
+    hilos/procesos no reclamen el mismo job.
+    """
+    candidatos = ReporteJob.objects.filter(estado='PENDIENTE').order_by('creado_en')
+    for job_id in candidatos.values_list('id', flat=True)[:10]:
+        if ReporteJob.objects.filter(id=job_id, estado='PENDIENTE').update(estado='PROCESANDO'):
+            return ReporteJob.objects.get(id=job_id)
+    return None
+
+
+def procesar(job):
+    """Genera el archivo del job y lo guarda en MEDIA_ROOT/reportes/."""
+    consulta = VentasQuery.de_job(job)
+    qs = consulta.ventas()
+    try:
+        firma = consulta.firma()
+        nombre = f"ventas_{job.desde.isoformat()}_a_{job.hasta.isoformat()}.{job.formato}"
+        if job.formato == 'xlsx':
+            tmp = xlsx_spool(qs)
+        else:
+            tmp = tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="")
+            for bloque in csv_stream(qs):
+                tmp.write(bloque)
+            tmp.seek(0)
+        with tmp:
+            job.archivo.save(nombre, File(tmp), save=False)
+        job.firma = firma
+        job.estado = 'LISTO'
+        job.error = ''
+    except Exception as exc:
+        job.estado = 'ERROR'
+        job.error = str(exc)
+    job.terminado_en = timezone.now()
+    job.save()
+
+    if job.estado == 'LISTO':
+        _descartar_obsoletos(job)
+    return job
+
+
+def _descartar_obsoletos(job):
+    """Borra archivos y registros de jobs equivalentes anteriores (ya no vigentes)."""
+    obsoletos = ReporteJob.objects.filter(
+        formato=job.formato, desde=job.desde, hasta=job.hasta,
+        sucursal_id=job.sucursal_id, alcance=job.alcance,
+        estado__in=['LISTO', 'ERROR'], creado_en__lt=job.creado_en,
+    )
+    for viejo in obsoletos:
+        if viejo.archivo:
+            viejo.archivo.delete(save=False)
+        viejo.delete()
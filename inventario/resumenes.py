@@ -0,0 +1,120 @@
+# inventario/resumenes.py
+"""
+Mantenimiento del resumen diario de ventas (VentaDiaria).
+
+Cada venta suma su cantidad/total en la fila (sucursal, producto, día local)
+con un UPDATE de F-expressions; así los reportes agregan días × productos
+en vez de recorrer todas las ventas.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Sum, When
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Venta, VentaDiaria
+from .fechas import inicio_del_dia
+from . import cache
+
+
+def acumular(sucursal_id, producto_id, fecha, cantidad, total):
+    """Suma cantidad/total en la fila del día; la crea si no existe."""
+    filtro = dict(sucursal_id=sucursal_id, producto_id=producto_id, fecha=fecha)
+    cambios = dict(cantidad=F('cantidad') + cantidad, total=F('total') + total)
+    if VentaDiaria.objects.filter(**filtro).update(**cambios):
+        return
+    try:
+        with transaction.atomic():
+            VentaDiaria.objects.create(cantidad=cantidad, total=total, **filtro)
+    except IntegrityError:
+        # Otra venta concurrente creó la fila entre el UPDATE y el INSERT
+        VentaDiaria.objects.filter(**filtro).update(**cambios)
+
+
+def acumular_lote(sucursal_id, fecha, por_producto):
+    """
+    Versión por lote de acumular() para un ticket: {producto_id: (cantidad, total)}.
+    Un UPDATE con CASE para las filas existentes y un bulk_create para las nuevas.
+    """
+    existentes = set(VentaDiaria.objects.filter(
+        sucursal_id=sucursal_id, fecha=fecha, producto_id__in=list(por_producto),
+    ).values_list('producto_id', flat=True))
+    if existentes:
+        VentaDiaria.objects.filter(
+            sucursal_id=sucursal_id, fecha=fecha, producto_id__in=existentes,
+        ).update(
+            cantidad=Case(*[When(producto_id=p, then=F('cantidad') + por_producto[p][0]) for p in existentes]),
+            total=Case(*[When(producto_id=p, then=F('total') + por_producto[p][1]) for p in existentes]),
+        )
+    nuevos = [p for p in por_producto if p not in existentes]
+    if not nuevos:
+        return
+    try:
+        with transaction.atomic():
+            VentaDiaria.objects.bulk_create([
+                VentaDiaria(sucursal_id=sucursal_id, producto_id=p, fecha=fecha,
+                            cantidad=por_producto[p][0], total=por_producto[p][1])
+                for p in nuevos
+            ])
+    except IntegrityError:
+        # Otra venta concurrente creó alguna de las filas: se resuelven una a una
+        for p in nuevos:
+            acumular(sucursal_id, p, fecha, *por_producto[p])
+
+
+def acumular_venta(venta):
+    acumular(
+        venta.caja.sucursal_id,
+        venta.producto_id,
+        timezone.localdate(venta.creado_en),
+        venta.cantidad,
+        venta.total,
+    )
+
+
+def descontar_venta(venta):
+    """
+    Resta una venta borrada de su fila. Nunca crea filas: si no existe (p. ej.
+    se borró en cascada con su sucursal/producto) no hay nada que restar.
+    """
+    VentaDiaria.objects.filter(
+        sucursal__cajas=venta.caja_id,
+        producto_id=venta.producto_id,
+        fecha=timezone.localdate(venta.creado_en),
+    ).update(
+        cantidad=Greatest(F('cantidad') - venta.cantidad, 0),
+        total=F('total') - venta.total,
+    )
+
+
+@transaction.atomic
+def reconstruir(desde=None, hasta=None, lote=1000):
+    """
+    Recalcula el resumen desde las ventas (rango de días opcional, inclusive).
+    Devuelve la cantidad de filas generadas.
+    """
+    resumen = VentaDiaria.objects.all()
+    ventas = Venta.objects.all()
+    if desde:
+        resumen = resumen.filter(fecha__gte=desde)
+        ventas = ventas.filter(creado_en__gte=inicio_del_dia(desde))
+    if hasta:
+        resumen = resumen.filter(fecha__lte=hasta)
+        ventas = ventas.filter(creado_en__lt=inicio_del_dia(hasta + timedelta(days=1)))
+    resumen.delete()
+
+    filas = (
+        ventas
+        .values('caja__sucursal_id', 'producto_id', dia=TruncDate('creado_en'))
+        .annotate(cant=Sum('cantidad'), monto=Sum('total'))
+        .order_by()
+    )
+    nuevos = [
+        VentaDiaria(sucursal_id=f['caja__sucursal_id'], producto_id=f['producto_id'],
+                    fecha=f['dia'], cantidad=f['cant'], total=f['monto'])
+        for f in filas.iterator()
+    ]
+    VentaDiaria.objects.bulk_create(nuevos, batch_size=lote)
+    cache.invalidar_por(Venta)
+    return len(nuevos)
@@ -1,8 +1,12 @@
 # inventario/signals.py
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.db import transaction
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Perfil
+from .models import Caja, MovimientoStock, Perfil, Producto, Sucursal, Venta
+from . import basedatos, busqueda, cache, cajas, codigos, movimientos, resumenes
+from .permissions import invalidar_perfil
 
 @receiver(post_save, sender=User)
 def crear_perfil(sender, instance, created, **kwargs):
@@ -12,3 +16,69 @@ def crear_perfil(sender, instance, created, **kwargs):
     """
     if created:
         Perfil.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=Venta)
+def descontar_venta_diaria(sender, instance, **kwargs):
+    """Mantiene el resumen diario y los contadores de la caja al borrar una venta (p. ej. desde el admin)."""
+    resumenes.descontar_venta(instance)
+    # La huella del dashboard solo mira la última venta: un borrado se nota por esta versión
+    transaction.on_commit(lambda: cache.invalidar('bajas'))
+    cajas.restar_venta(instance)
+
+
+@receiver([post_save, post_delete], sender=Sucursal)
+@receiver([post_save, post_delete], sender=Producto)
+@receiver([post_save, post_delete], sender=Caja)
+@receiver([post_save, post_delete], sender=Venta)
+def invalidar_cache(sender, **kwargs):
+    """Nueva versión de los espacios de caché que dependen del modelo (cache.DEPENDENCIAS)."""
+    cache.invalidar_por(sender)
+
+
+@receiver(post_save, sender=Producto)
+def indexar_producto(sender, instance, **kwargs):
+    """Mantiene el índice de búsqueda (FTS5) y la caché de códigos al crear/editar un producto."""
+    busqueda.indexar([instance.pk])
+    codigos.olvidar(instance.pk)
+
+
+@receiver(pre_save, sender=Producto)
+def recordar_stock_previo(sender, instance, raw=False, **kwargs):
+    """Stock guardado antes de la edición (formulario, admin) para el ajuste en el libro."""
+    if raw or not instance.pk:
+        instance._stock_previo = 0
+        return
+    instance._stock_previo = Producto.objects.filter(pk=instance.pk).values_list('stock', flat=True).first() or 0
+
+
+@receiver(post_save, sender=Producto)
+def registrar_ajuste_stock(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'stock' not in update_fields):
+        return
+    movimientos.registrar(
+        {instance.pk: instance.stock - getattr(instance, '_stock_previo', 0)}, MovimientoStock.AJUSTE,
+    )
+
+
+@receiver(post_delete, sender=Producto)
+def desindexar_producto(sender, instance, **kwargs):
+    busqueda.desindexar(instance.pk)
+    codigos.olvidar(instance.pk)
+
+
+@receiver(post_save, sender=Sucursal)
+def reindexar_sucursal(sender, instance, created, **kwargs):
+    if not created:
+        busqueda.reindexar_sucursal(instance.pk, instance.nombre)
+
+
+@receiver([post_save, post_delete], sender=Perfil)
+def invalidar_cache_perfil(sender, instance, **kwargs):
+    invalidar_perfil(instance.user_id)
+
+
+@receiver(connection_created)
+def ajustar_conexion(sender, connection, **kwargs):
+    """PRAGMAs de SQLite en cada conexión nueva (ver basedatos.py)."""
+    basedatos.configurar(connection)
@@ -0,0 +1,106 @@
+# inventario/stock.py
+"""
+Movimientos de stock con UPDATE condicionales (F-expressions), sin leer el
+valor en Python: dos cajeros vendiendo a la vez no se pisan las actualizaciones.
+
+Cada función agrega al libro (MovimientoStock) la diferencia aplicada por
+producto, en la misma transacción (ver movimientos.py).
+
+Política de sobreventa: settings.INVENTARIO_PERMITIR_SOBREVENTA
+  - True  (por defecto): la venta se registra y el stock queda en 0.
+  - False: la venta se rechaza con StockInsuficiente.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import MovimientoStock, Producto
+from . import movimientos
+
+
+class StockInsuficiente(Exception):
+    """No hay stock suficiente y la política no permite sobreventa."""
+
+
+def permitir_sobreventa():
+    return getattr(settings, 'INVENTARIO_PERMITIR_SOBREVENTA', True)
+
+
+class _Faltante(Exception):
+    pass
+
+
+def _cantidad_por_producto(cantidades):
+    """
+    CASE id WHEN ... THEN cantidad ... END como una sola expresión SQL.
+    Un OR de condiciones por producto choca con el límite de profundidad de
+    SQLite (1000) y armar un When() por producto cuesta más en Python que el
+    UPDATE mismo con lotes de cientos de productos (transferencias).
+    """
+    columna = f"{connection.ops.quote_name(Producto._meta.db_table)}.{connection.ops.quote_name('id')}"
+    casos = " ".join(["WHEN %s THEN %s"] * len(cantidades))
+    params = [v for par in cantidades.items() for v in par]
+    return RawSQL(f"CASE {columna} {casos} END", params, output_field=IntegerField())
+
+
+def descontar_lote(cantidades, permitir=None, tipo=MovimientoStock.VENTA, referencia=''):
+    """
+    Descuenta stock de varios productos ({producto_id: cantidad}) en un solo
+    UPDATE condicional (CASE por producto). Devuelve el set de ids con faltante
+    (que quedan en 0) o lanza StockInsuficiente si no se permite sobreventa.
+    Debe llamarse dentro de la transacción que registra la venta.
+    """
+    if permitir is None:
+        permitir = permitir_sobreventa()
+    if not cantidades:
+        return set()
+
+    ids = list(cantidades)
+    cantidad = _cantidad_por_producto(cantidades)
+    try:
+        # Caso normal: todos alcanzan -> un UPDATE. Si alguno no, se deshace el savepoint.
+        with transaction.atomic():
+            actualizados = Producto.objects.filter(pk__in=ids, stock__gte=cantidad).update(
+                stock=F('stock') - cantidad
+            )
+            if actualizados != len(cantidades):
+                raise _Faltante
+        movimientos.registrar({pid: -c for pid, c in cantidades.items()}, tipo, referencia)
+        return set()
+    except _Faltante:
+        if not permitir:
+            raise StockInsuficiente("Stock insuficiente para la venta.")
+
+    # Sobreventa permitida: los que no alcanzan quedan en 0, el resto se descuenta
+    # (el stock previo de los faltantes es lo que realmente se descuenta)
+    previos = dict(
+        Producto.objects.select_for_update().filter(pk__in=ids, stock__lt=cantidad).values_list('pk', 'stock')
+    )
+    Producto.objects.filter(pk__in=ids).update(stock=Case(
+        When(stock__gte=cantidad, then=F('stock') - cantidad),
+        default=Value(0),
+    ))
+    movimientos.registrar(
+        {pid: -previos.get(pid, c) for pid, c in cantidades.items()}, tipo, referencia,
+    )
+    return set(previos)
+
+
+def incrementar_lote(cantidades, tipo, referencia=''):
+    """Suma stock a varios productos ({producto_id: cantidad}) en un solo UPDATE."""
+    if not cantidades:
+        return 0
+    actualizados = Producto.objects.filter(pk__in=list(cantidades)).update(
+        stock=F('stock') + _cantidad_por_producto(cantidades)
+    )
+    movimientos.registrar(cantidades, tipo, referencia)
+    return actualizados
+
+
+def descontar(producto_id, cantidad, permitir=None, tipo=MovimientoStock.VENTA, referencia=''):
+    """
+    Descuenta stock de un producto. Devuelve True si alcanzó el stock, False si
+    hubo faltante (y se dejó en 0). Ver descontar_lote().
+    """
+    return producto_id not in descontar_lote({producto_id: cantidad}, permitir, tipo, referencia)
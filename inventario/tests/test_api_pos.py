@@ -0,0 +1,50 @@
+import json
+from decimal import Decimal
+
+from django.urls import reverse
+
+from inventario.models import Caja, Producto, Sucursal, Ticket
+from inventario.tests.utils import TestCase, crear_usuario
+
+
+class ApiPosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sucursal = Sucursal.objects.create(nombre="Centro")
+        cls.cajero = crear_usuario("cajero", "Cajero", cls.sucursal)
+        cls.producto = Producto.objects.create(sucursal=cls.sucursal, nombre="Pan", precio=Decimal("500"), stock=10)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.cajero)
+        self.caja = Caja.objects.create(sucursal=self.sucursal, apertura_monto=0, apertura_usuario=self.cajero)
+
+    def _post(self, url, cuerpo, **cabeceras):
+        return self.client.post(url, json.dumps(cuerpo), content_type="application/json", **cabeceras)
+
+    def test_abrir_caja_con_cuerpo_que_no_es_objeto(self):
+        for cuerpo in ([1, 2], "x", 3):
+            self.assertEqual(self._post(reverse("api_caja_abrir"), cuerpo).status_code, 400)
+
+    def test_lineas_invalidas(self):
+        url = reverse("api_venta", args=[self.caja.id])
+        for linea in ({"producto": None, "cantidad": 1}, {"producto": self.producto.id, "cantidad": [1]},
+                      {"producto": self.producto.id, "cantidad": 1.9}, {"producto": True, "cantidad": 1},
+                      {"producto": 10**23, "cantidad": 1}, {"producto": self.producto.id, "cantidad": 2**31}):
+            self.assertEqual(self._post(url, {"lineas": [linea]}).status_code, 400, linea)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 10)
+
+    def test_reintento_con_la_caja_ya_cerrada(self):
+        url = reverse("api_venta", args=[self.caja.id])
+        cuerpo = {"lineas": [{"producto": self.producto.id, "cantidad": 2}]}
+        primero = self._post(url, cuerpo, HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual(primero.status_code, 201)
+        self.assertEqual(self.client.post(reverse("api_caja_cerrar", args=[self.caja.id])).status_code, 200)
+
+        reintento = self._post(url, cuerpo, HTTP_IDEMPOTENCY_KEY="k1")
+
+        self.assertEqual(reintento.status_code, 201)
+        self.assertEqual(reintento.json()["ticket"], primero.json()["ticket"])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(self._post(url, cuerpo, HTTP_IDEMPOTENCY_KEY="k2").status_code, 409)
@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+from django.urls import reverse
+
+from inventario import busqueda
+from inventario.models import Caja, Producto, Sucursal
+from inventario.tests.utils import TestCase, crear_usuario
+
+
+class BuscarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sucursal = Sucursal.objects.create(nombre="Centro")
+        cls.cajero = crear_usuario("cajero", "Cajero", cls.sucursal)
+        cls.pan = Producto.objects.create(sucursal=cls.sucursal, nombre="Pan de molde", precio=Decimal("900"), stock=5)
+        cls.leche = Producto.objects.create(
+            sucursal=cls.sucursal, nombre="Leche entera", descripcion="ideal con pan tostado",
+            precio=Decimal("700"), stock=5,
+        )
+
+    def test_texto_sin_palabras_no_encuentra_nada(self):
+        for texto in ("", "--", " * "):
+            self.assertEqual(list(busqueda.buscar(Producto.objects.all(), texto)), [], texto)
+
+    def test_prefijos_ordenados_por_relevancia(self):
+        # 'pan' en el nombre pesa más que en la descripción
+        self.assertEqual(list(busqueda.buscar(Producto.objects.all(), "pa")), [self.pan, self.leche])
+        self.assertEqual(list(busqueda.buscar(Producto.objects.all(), "leche pan")), [self.leche])
+
+    def test_buscador_de_la_caja(self):
+        caja = Caja.objects.create(sucursal=self.sucursal, apertura_monto=0, apertura_usuario=self.cajero)
+        self.client.force_login(self.cajero)
+        url = reverse("caja_productos_buscar", args=[caja.id])
+        self.assertEqual(self.client.get(url, {"q": "--"}).json(), {"productos": []})
+        self.assertEqual([p["id"] for p in self.client.get(url, {"q": "lech"}).json()["productos"]], [self.leche.id])
@@ -0,0 +1,72 @@
+"""
+Número de consultas SQL por página, con la caché caliente (segunda petición).
+Las 2 primeras consultas de toda página son la sesión y el usuario (con su
+Perfil, ver PerfilBackend). Los roles globales suman una: los ids de todas las
+sucursales, que no se cachean (ver permissions.principal).
+"""
+from decimal import Decimal
+
+from django.urls import reverse
+
+from inventario.models import Caja, Producto, Sucursal
+from inventario.tests.utils import TestCase, crear_usuario
+from inventario.transferencias import transferir
+from inventario.ventas import registrar_ticket
+
+
+class ConsultasPorPaginaTests(TestCase):
+    # (url_name, argumento, parámetros GET, consultas)
+    COMUNES = (
+        ("home", None, "", 2),
+        ("producto_list", None, "", 4),
+        ("producto_list", None, "?q=pan", 4),
+        ("producto_stock_bajo", None, "", 4),
+        ("api_stock_bajo", None, "", 3),
+        ("caja_estado", None, "", 3),
+        ("caja_detalle", "caja", "", 5),
+        ("caja_productos_buscar", "caja", "?q=pan", 5),
+        ("reportes_home", None, "", 2),
+        ("reportes_dashboard", None, "", 2),
+        ("reportes_dashboard_datos", "serie", "", 3),
+    )
+    CAJERO = (
+        ("venta_nueva", "caja", "", 3),
+        ("ticket_nuevo", "caja", "", 3),
+    )
+    ADMINISTRADOR = (
+        ("producto_update", "producto", "", 3),
+        ("transferencia_lista", None, "", 4),
+        ("transferencia_nueva", None, "", 2),
+        ("sucursal_list", None, "", 4),
+        ("usuario_list", None, "", 4),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        centro = Sucursal.objects.create(nombre="Centro")
+        norte = Sucursal.objects.create(nombre="Norte")
+        cls.cajero = crear_usuario("cajero", "Cajero", centro)
+        cls.admin = crear_usuario("admin", "Administrador")
+        pan = Producto.objects.create(sucursal=centro, nombre="Pan", precio=Decimal("500"), stock=40)
+        Producto.objects.create(sucursal=centro, nombre="Pan integral", precio=Decimal("700"), stock=1,
+                                punto_reorden=5)
+        Producto.objects.create(sucursal=norte, nombre="Leche", precio=Decimal("3000"), stock=8)
+        cls.caja = Caja.objects.create(sucursal=centro, apertura_monto=0, apertura_usuario=cls.cajero)
+        registrar_ticket(cls.caja, cls.cajero, [(pan.id, 2)])
+        transferir(centro.id, norte.id, cls.admin, [(pan.id, 5)])
+        cls.objetos = {"caja": cls.caja.id, "producto": pan.id, "serie": "productos"}
+
+    def _verificar(self, usuario, paginas, adicionales=0):
+        self.client.force_login(usuario)
+        for url_name, argumento, parametros, esperadas in paginas:
+            url = reverse(url_name, args=[self.objetos[argumento]] if argumento else None) + parametros
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)  # calienta las cachés
+                with self.assertNumQueries(esperadas + adicionales):
+                    self.client.get(url)
+
+    def test_cajero(self):
+        self._verificar(self.cajero, self.COMUNES + self.CAJERO)
+
+    def test_administrador(self):
+        self._verificar(self.admin, self.COMUNES + self.ADMINISTRADOR, adicionales=1)
@@ -0,0 +1,82 @@
+"""
+Estrés del descuento de stock: varios hilos venden 1 unidad del mismo producto
+y al final el stock debe cuadrar con las ventas (ningún UPDATE perdido).
+TransactionTestCase: cada hilo usa su propia conexión a la base de pruebas y
+necesita ver los datos confirmados.
+"""
+import threading
+import time
+from decimal import Decimal
+
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase
+
+from inventario.models import Caja, Producto, Sucursal, Venta
+from inventario.stock import StockInsuficiente
+from inventario.tests.utils import crear_usuario
+from inventario.ventas import registrar_venta
+
+HILOS = 8
+VENTAS = 200
+STOCK_INICIAL = 150
+
+
+class EstresStockTests(TransactionTestCase):
+    def setUp(self):
+        sucursal = Sucursal.objects.create(nombre="Centro")
+        cajero = crear_usuario("cajero", "Cajero", sucursal)
+        self.caja = Caja.objects.create(sucursal=sucursal, apertura_monto=0, apertura_usuario=cajero)
+        self.producto = Producto.objects.create(sucursal=sucursal, nombre="Pan", precio=Decimal("500"),
+                                                stock=STOCK_INICIAL)
+
+    def _vender(self, permitir):
+        pendientes = iter(range(VENTAS))
+        lock = threading.Lock()
+        resultado = {"ok": 0, "faltante": 0, "rechazadas": 0}
+
+        def trabajador():
+            try:
+                while True:
+                    with lock:
+                        if next(pendientes, None) is None:
+                            return
+                    while True:
+                        try:
+                            _v, alcanzo = registrar_venta(self.caja, self.producto, 1, self.caja.apertura_usuario,
+                                                          permitir)
+                            clave = "ok" if alcanzo else "faltante"
+                        except StockInsuficiente:
+                            clave = "rechazadas"
+                        except OperationalError:
+                            # SQLite en memoria (caché compartida): "table is locked" no espera el
+                            # busy_timeout, así que se cede el turno antes de reintentar
+                            time.sleep(0.001)
+                            continue
+                        with lock:
+                            resultado[clave] += 1
+                        break
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=trabajador) for _ in range(HILOS)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.producto.refresh_from_db()
+        return resultado
+
+    def test_con_sobreventa(self):
+        r = self._vender(permitir=True)
+
+        self.assertEqual(r["ok"] + r["faltante"], VENTAS)
+        self.assertEqual(r["ok"], STOCK_INICIAL)
+        self.assertEqual(self.producto.stock, 0)
+        self.assertEqual(Venta.objects.filter(producto=self.producto).count(), VENTAS)
+
+    def test_sin_sobreventa(self):
+        r = self._vender(permitir=False)
+
+        self.assertEqual((r["ok"], r["rechazadas"]), (STOCK_INICIAL, VENTAS - STOCK_INICIAL))
+        self.assertEqual(self.producto.stock, 0)
+        self.assertEqual(Venta.objects.filter(producto=self.producto).count(), STOCK_INICIAL)
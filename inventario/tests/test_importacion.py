@@ -0,0 +1,40 @@
+import io
+from decimal import Decimal
+
+from django.test import TestCase
+
+from inventario import importacion
+from inventario.models import Producto, Sucursal
+
+
+def _csv(texto):
+    return importacion.leer_filas(io.BytesIO(texto.encode()), "productos.csv")
+
+
+class ImportarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sucursal = Sucursal.objects.create(nombre="Centro")
+
+    def test_valores_no_finitos_son_error_de_fila(self):
+        res = importacion.importar(_csv(
+            "nombre,precio,stock\n"
+            "Malo,NaN,1\n"
+            "Infinito,Infinity,1\n"
+            "Stock infinito,10,Infinity\n"
+            "Bueno,10,2\n"
+        ), self.sucursal.id)
+
+        self.assertEqual([num for num, _msg in res.errores], [2, 3, 4])
+        self.assertEqual(res.creados, 1)
+        self.assertEqual(Producto.objects.get(sucursal=self.sucursal).nombre, "Bueno")
+
+    def test_columnas_ausentes_no_se_actualizan(self):
+        p = Producto.objects.create(sucursal=self.sucursal, nombre="Arroz", descripcion="1 kg",
+                                    precio=Decimal("3000"), stock=15)
+
+        res = importacion.importar(_csv("nombre,precio\nArroz,3500\n"), self.sucursal.id)
+
+        p.refresh_from_db()
+        self.assertEqual(res.actualizados, 1)
+        self.assertEqual((p.precio, p.stock, p.descripcion), (Decimal("3500"), 15, "1 kg"))
@@ -0,0 +1,25 @@
+from django.urls import reverse
+
+from inventario.models import Sucursal
+from inventario.tests.utils import TestCase, crear_usuario
+
+
+class FiltroSucursalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sucursal = Sucursal.objects.create(nombre="Centro")
+        cls.usuario = crear_usuario("cajero", "Cajero", cls.sucursal)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+
+    def test_sucursal_no_decimal(self):
+        # '²' pasa str.isdigit() pero int() la rechaza
+        self.assertEqual(self.client.get(reverse("api_stock_bajo"), {"sucursal": "²"}).status_code, 403)
+        self.assertEqual(self.client.get(reverse("producto_stock_bajo"), {"sucursal": "²"}).status_code, 200)
+
+    def test_sucursal_propia(self):
+        r = self.client.get(reverse("api_stock_bajo"), {"sucursal": self.sucursal.id})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"productos": []})
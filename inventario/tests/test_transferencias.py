@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.test import TestCase
+
+from inventario.models import MovimientoStock, Producto, Sucursal
+from inventario.transferencias import transferir
+
+
+class TransferirTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user("admin")
+        cls.origen = Sucursal.objects.create(nombre="Origen")
+        cls.destino = Sucursal.objects.create(nombre="Destino")
+
+    def _producto(self, sucursal, nombre, stock, codigo=None):
+        return Producto.objects.create(sucursal=sucursal, nombre=nombre, codigo=codigo,
+                                       precio=Decimal("1000"), stock=stock)
+
+    def test_productos_con_el_mismo_nombre_suman_en_el_destino(self):
+        a = self._producto(self.origen, "Galletas", 10)
+        b = self._producto(self.origen, "Galletas", 10)
+
+        transferir(self.origen.id, self.destino.id, self.usuario, [(a.id, 3), (b.id, 4)])
+
+        a.refresh_from_db()
+        b.refresh_from_db()
+        salida = 20 - a.stock - b.stock
+        destino = Producto.objects.filter(sucursal=self.destino)
+        self.assertEqual(destino.count(), 1)
+        self.assertEqual(salida, 7)
+        self.assertEqual(destino.get().stock, salida)
+
+    def test_el_libro_cuadra_entre_origen_y_destino(self):
+        a = self._producto(self.origen, "Galletas", 10)
+        b = self._producto(self.origen, "Galletas", 10)
+        c = self._producto(self.origen, "Jugo", 5, codigo="770123")
+        self._producto(self.destino, "Jugo", 1, codigo="770123")
+
+        transferencia = transferir(self.origen.id, self.destino.id, self.usuario, [(a.id, 3), (b.id, 4), (c.id, 2)])
+
+        libro = MovimientoStock.objects.filter(tipo=MovimientoStock.TRANSFERENCIA,
+                                               referencia=f"transferencia:{transferencia.id}")
+        self.assertEqual(libro.filter(producto__sucursal=self.origen).aggregate(t=Sum("cantidad"))["t"], -9)
+        self.assertEqual(libro.filter(producto__sucursal=self.destino).aggregate(t=Sum("cantidad"))["t"], 9)
+        self.assertEqual(Producto.objects.get(sucursal=self.destino, codigo="770123").stock, 3)
@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase as _TestCase
+
+
+def crear_usuario(username, rol="Cajero", sucursal=None):
+    """Usuario con su Perfil (lo crea la señal de User) ya en el rol y sucursal pedidos."""
+    user = User.objects.create_user(username)
+    perfil = user.perfil
+    perfil.rol, perfil.sucursal = rol, sucursal
+    perfil.save()
+    return user
+
+
+class TestCase(_TestCase):
+    """
+    TestCase que empieza con la caché vacía: es la misma durante toda la corrida y
+    las invalidaciones por modelo van en on_commit, que dentro de un TestCase no llega.
+    """
+    def setUp(self):
+        super().setUp()
+        cache.clear()
@@ -0,0 +1,107 @@
+# inventario/transferencias.py
+"""
+Transferencias de stock entre sucursales.
+
+Cada sucursal tiene sus propios Producto, así que cada línea se empareja con
+el producto equivalente del destino: por código si lo tiene, si no por nombre.
+Los que no existen en el destino se crean (copia con stock 0). El descuento y
+el incremento son dos UPDATE con CASE (stock.descontar_lote / incrementar_lote)
+dentro de una transacción, con sus movimientos en el libro de stock: el
+número de consultas no depende de las líneas.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from .models import MovimientoStock, Producto, Transferencia, TransferenciaLinea
+from . import busqueda, stock
+
+
+def _clave(producto):
+    return ('codigo', producto.codigo) if producto.codigo else ('nombre', producto.nombre)
+
+
+def _equivalentes(origenes, destino_id):
+    """
+    {producto_origen_id: producto_destino} creando los que falten.
+    Una consulta para buscar y, si hace falta, un bulk_create.
+    """
+    codigos = [p.codigo for p in origenes if p.codigo]
+    nombres = [p.nombre for p in origenes if not p.codigo]
+    encontrados = {}
+    for p in Producto.objects.filter(
+        Q(codigo__in=codigos) | Q(codigo__isnull=True, nombre__in=nombres), sucursal_id=destino_id,
+    ).only('id', 'codigo', 'nombre'):
+        encontrados.setdefault(_clave(p), p)
+
+    # Un producto por clave: dos del origen con el mismo nombre (sin código) van al mismo destino
+    faltan = {}
+    for p in origenes:
+        if _clave(p) not in encontrados:
+            faltan.setdefault(_clave(p), p)
+    faltan = list(faltan.values())
+    if faltan:
+        nuevos = Producto.objects.bulk_create([
+            Producto(sucursal_id=destino_id, nombre=p.nombre, codigo=p.codigo,
+                     descripcion=p.descripcion, precio=p.precio, stock=0)
+            for p in faltan
+        ])
+        if not all(p.pk for p in nuevos):
+            # Backend sin RETURNING en bulk_create: se releen
+            nuevos = Producto.objects.filter(
+                Q(codigo__in=[p.codigo for p in faltan if p.codigo])
+                | Q(codigo__isnull=True, nombre__in=[p.nombre for p in faltan if not p.codigo]),
+                sucursal_id=destino_id,
+            )
+        for p in nuevos:
+            encontrados.setdefault(_clave(p), p)
+        busqueda.indexar([p.pk for p in nuevos])
+
+    return {p.pk: encontrados[_clave(p)] for p in origenes}
+
+
+def transferir(origen_id, destino_id, usuario, lineas, nota=''):
+    """
+    Crea y aplica una transferencia con lineas [(producto_origen_id, cantidad), ...].
+    Lanza ValidationError si los datos no son válidos y stock.StockInsuficiente si
+    algún producto del origen no alcanza (una transferencia nunca deja stock
+    negativo ni usa la política de sobreventa). En ambos casos no se aplica nada.
+    """
+    if origen_id == destino_id:
+        raise ValidationError("El origen y el destino deben ser sucursales distintas.")
+    lineas = [(int(pid), int(cant)) for pid, cant in lineas]
+    if not lineas:
+        raise ValidationError("La transferencia no tiene líneas.")
+    if any(cant <= 0 for _pid, cant in lineas):
+        raise ValidationError("La cantidad debe ser mayor que 0.")
+
+    cantidades = defaultdict(int)
+    for pid, cant in lineas:
+        cantidades[pid] += cant
+
+    origenes = Producto.objects.filter(sucursal_id=origen_id).in_bulk(list(cantidades))
+    invalidos = sorted(set(cantidades) - set(origenes))
+    if invalidos:
+        raise ValidationError(f"Productos inválidos para la sucursal de origen: {', '.join(map(str, invalidos))}")
+
+    with transaction.atomic():
+        transferencia = Transferencia.objects.create(
+            origen_id=origen_id, destino_id=destino_id, usuario=usuario, nota=nota,
+        )
+        referencia = f"transferencia:{transferencia.id}"
+        # El descuento antes que el destino: si falta stock se aborta sin crear productos allá
+        stock.descontar_lote(dict(cantidades), False, MovimientoStock.TRANSFERENCIA, referencia)
+        destino_de = _equivalentes(list(origenes.values()), destino_id)
+        # Varios productos del origen pueden tener el mismo equivalente: se suman
+        por_destino = defaultdict(int)
+        for pid, cant in cantidades.items():
+            por_destino[destino_de[pid].pk] += cant
+        stock.incrementar_lote(dict(por_destino), MovimientoStock.TRANSFERENCIA, referencia)
+        TransferenciaLinea.objects.bulk_create([
+            TransferenciaLinea(transferencia=transferencia, producto_origen_id=pid,
+                               producto_destino=destino_de[pid], cantidad=cant)
+            for pid, cant in cantidades.items()
+        ], batch_size=500)
+    return transferencia
@@ -5,10 +5,13 @@ from . import views_reportes
 
 from . import views
 from .views_productos import (
-    ProductoListView, ProductoCreateView, ProductoUpdateView, ProductoDeleteView
+    ProductoListView, ProductoCreateView, ProductoUpdateView, ProductoDeleteView, ProductoImportarView,
+    ProductoStockBajoView,
 )
 from . import views_caja
 from . import views_admin
+from . import views_pos
+from . import views_transferencias
 
 urlpatterns = [
     # Home
@@ -25,6 +28,8 @@ urlpatterns = [
     # Productos
     path('productos/', ProductoListView.as_view(), name='producto_list'),
     path('productos/nuevo/', ProductoCreateView.as_view(), name='producto_create'),
+    path('productos/importar/', ProductoImportarView.as_view(), name='producto_importar'),
+    path('productos/stock-bajo/', ProductoStockBajoView.as_view(), name='producto_stock_bajo'),
     path('productos/<int:pk>/editar/', ProductoUpdateView.as_view(), name='producto_update'),
     path('productos/<int:pk>/eliminar/', ProductoDeleteView.as_view(), name='producto_delete'),
 
@@ -32,9 +37,24 @@ urlpatterns = [
     path('caja/', views_caja.caja_estado, name='caja_estado'),
     path('caja/abrir/', views_caja.caja_abrir, name='caja_abrir'),
     path('caja/<int:caja_id>/', views_caja.caja_detalle, name='caja_detalle'),
+    path('caja/<int:caja_id>/ventas/', views_caja.caja_ventas_mas, name='caja_ventas_mas'),
+    path('caja/<int:caja_id>/productos/buscar/', views_caja.caja_productos_buscar, name='caja_productos_buscar'),
+    path('caja/<int:caja_id>/escanear/', views_caja.caja_producto_escanear, name='caja_producto_escanear'),
     path('caja/<int:caja_id>/venta/nueva/', views_caja.venta_nueva, name='venta_nueva'),
+    path('caja/<int:caja_id>/ticket/nuevo/', views_caja.ticket_nuevo, name='ticket_nuevo'),
     path('caja/<int:caja_id>/cerrar/', views_caja.caja_cerrar, name='caja_cerrar'),
 
+    # API JSON del punto de venta
+    path('api/caja/abrir/', views_pos.api_caja_abrir, name='api_caja_abrir'),
+    path('api/caja/<int:caja_id>/ventas/', views_pos.api_venta, name='api_venta'),
+    path('api/caja/<int:caja_id>/cerrar/', views_pos.api_caja_cerrar, name='api_caja_cerrar'),
+    path('api/productos/stock-bajo/', views_pos.api_stock_bajo, name='api_stock_bajo'),
+
+    # Transferencias de stock entre sucursales
+    path('transferencias/', views_transferencias.transferencia_lista, name='transferencia_lista'),
+    path('transferencias/nueva/', views_transferencias.transferencia_nueva, name='transferencia_nueva'),
+    path('transferencias/<int:transferencia_id>/', views_transferencias.transferencia_detalle, name='transferencia_detalle'),
+
     # Administración (usuarios y sucursales)
     path('adminapp/sucursales/', views_admin.SucursalListView.as_view(), name='sucursal_list'),
     path('adminapp/sucursales/nueva/', views_admin.SucursalCreateView.as_view(), name='sucursal_create'),
@@ -50,6 +70,10 @@ urlpatterns = [
     path('reportes/ventas.csv', views_reportes.reporte_ventas_csv, name='reporte_ventas_csv'),
     path('reportes/ventas.xlsx', views_reportes.reporte_ventas_excel, name='reporte_ventas_excel'),
     path('reportes/dashboard/', views_reportes.reportes_dashboard, name='reportes_dashboard'),
+    path('reportes/dashboard/datos/<str:serie>/', views_reportes.reportes_dashboard_datos, name='reportes_dashboard_datos'),
+    path('reportes/jobs/nuevo/', views_reportes.reporte_job_crear, name='reporte_job_crear'),
+    path('reportes/jobs/<int:job_id>/', views_reportes.reporte_job_estado, name='reporte_job_estado'),
+    path('reportes/jobs/<int:job_id>/descargar/', views_reportes.reporte_job_descargar, name='reporte_job_descargar'),
 
 
 ]
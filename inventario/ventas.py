@@ -0,0 +1,102 @@
+# inventario/ventas.py
+"""
+Registro de ventas: venta + stock + resumen diario + contadores de la caja
+en una sola transacción.
+Lo usan las vistas de caja y los comandos de carga/estrés.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Producto, Ticket, Venta
+from . import cache, cajas, resumenes, stock
+
+
+def registrar_venta(caja, producto, cantidad, usuario, permitir_sobreventa=None):
+    """
+    Registra la venta y descuenta stock atómicamente.
+    Devuelve (venta, alcanzo_stock). Lanza stock.StockInsuficiente si la
+    política bloquea la sobreventa (no queda nada registrado).
+    """
+    with transaction.atomic():
+        venta = Venta.objects.create(
+            caja=caja,
+            producto=producto,
+            cantidad=cantidad,
+            precio_unitario=producto.precio,
+            total=producto.precio * cantidad,
+            usuario=usuario,
+        )
+        alcanzo = stock.descontar(producto.id, cantidad, permitir_sobreventa, referencia=f"venta:{venta.id}")
+        resumenes.acumular_venta(venta)
+        cajas.sumar(caja.id, venta.total, cantidad)
+    return venta, alcanzo
+
+
+def registrar_ticket(caja, usuario, lineas, permitir_sobreventa=None, clave_idempotencia=None):
+    """
+    Registra un ticket de varias líneas [(producto_id, cantidad), ...] con un
+    número fijo de consultas: productos con in_bulk, líneas con bulk_create y
+    stock con un solo UPDATE, todo en una transacción.
+    Devuelve (ticket, ids_con_faltante). Lanza ValidationError si alguna línea
+    no es válida y stock.StockInsuficiente si la política bloquea la sobreventa.
+    Con clave_idempotencia, un reintento con la misma clave en la misma caja
+    devuelve el ticket ya registrado sin volver a cobrar.
+    """
+    if clave_idempotencia:
+        previo = Ticket.objects.filter(caja=caja, clave_idempotencia=clave_idempotencia).first()
+        if previo:
+            return previo, set()
+
+    lineas = [(int(pid), int(cant)) for pid, cant in lineas]
+    if not lineas:
+        raise ValidationError("El ticket no tiene líneas.")
+    if any(cant <= 0 for _pid, cant in lineas):
+        raise ValidationError("La cantidad debe ser mayor que 0.")
+
+    productos = Producto.objects.filter(sucursal_id=caja.sucursal_id).in_bulk({pid for pid, _c in lineas})
+    invalidos = sorted({pid for pid, _c in lineas if pid not in productos})
+    if invalidos:
+        raise ValidationError(f"Productos inválidos para esta sucursal: {', '.join(map(str, invalidos))}")
+
+    cantidades = defaultdict(int)
+    por_producto = defaultdict(lambda: [0, Decimal(0)])
+    for pid, cant in lineas:
+        cantidades[pid] += cant
+        por_producto[pid][0] += cant
+        por_producto[pid][1] += productos[pid].precio * cant
+
+    try:
+        with transaction.atomic():
+            # El ticket va primero: si la clave ya existe falla antes de tocar el stock
+            ticket = Ticket.objects.create(
+                caja=caja, usuario=usuario, total=sum(t for _c, t in por_producto.values()),
+                clave_idempotencia=clave_idempotencia or None,
+            )
+            faltantes = stock.descontar_lote(
+                dict(cantidades), permitir_sobreventa, referencia=f"ticket:{ticket.id}",
+            )
+            Venta.objects.bulk_create([
+                Venta(
+                    caja=caja, ticket=ticket, producto=productos[pid], cantidad=cant,
+                    precio_unitario=productos[pid].precio, total=productos[pid].precio * cant,
+                    usuario=usuario,
+                )
+                for pid, cant in lineas
+            ])
+            resumenes.acumular_lote(
+                caja.sucursal_id, timezone.localdate(ticket.creado_en),
+                {pid: tuple(v) for pid, v in por_producto.items()},
+            )
+            cajas.sumar(caja.id, ticket.total, sum(cantidades.values()), len(lineas))
+            # Las líneas van con bulk_create, sin la señal post_save de Venta
+            cache.invalidar_por(Venta)
+    except IntegrityError:
+        # Reintento concurrente con la misma clave: se devuelve el ticket que ganó
+        if not clave_idempotencia:
+            raise
+        return Ticket.objects.get(caja=caja, clave_idempotencia=clave_idempotencia), set()
+    return ticket, faltantes
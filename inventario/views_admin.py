@@ -10,6 +10,7 @@ from django.contrib import messages
 
 from .forms_admin import UsuarioForm, PerfilForm, SucursalForm
 from .models import Perfil, Sucursal
+from .permissions import principal
 
 
 # ======== Helpers ========
@@ -18,7 +19,7 @@ class AdminRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
     """Restringe el acceso a Administrador/Subadministrador."""
     def test_func(self):
         try:
-            return self.request.user.perfil.rol in ['Administrador', 'Subadministrador']
+            return principal(self.request.user).es_global
         except Exception:
             return False
 
@@ -78,7 +79,7 @@ class UsuarioListView(AdminRequiredMixin, ListView):
 
     def get_queryset(self):
         # Traer también su perfil si existe
-        return User.objects.select_related('perfil').order_by('username')
+        return User.objects.select_related('perfil', 'perfil__sucursal').order_by('username')
 
 
 class UsuarioCreateView(AdminRequiredMixin, View):
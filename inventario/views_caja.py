@@ -1,21 +1,28 @@
 # inventario/views_caja.py
 
+from datetime import datetime
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.db.models import Sum
-from django.core.exceptions import PermissionDenied
+from django.db.models import F, Q
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.contrib import messages
 
 from .models import Caja, Venta, Producto
-from .forms import CajaAperturaForm, VentaForm
-from .permissions import role_and_sucursales, user_role
+from .forms import CajaAperturaForm, VentaForm, TicketLineaFormSet
+from .permissions import role_and_sucursal_ids, user_role
+from .stock import StockInsuficiente
+from .ventas import registrar_venta, registrar_ticket
+from . import busqueda, cache, codigos, reorden
 
 
-def _usuario_puede_en_sucursal(user, sucursal):
-    """Valida si el usuario puede operar en la sucursal dada."""
-    rol, sucursales = role_and_sucursales(user)
-    return any(s.id == sucursal.id for s in sucursales)
+def _usuario_puede_en_sucursal(user, sucursal_id):
+    """Valida si el usuario puede operar en la sucursal dada (por id)."""
+    rol, ids = role_and_sucursal_ids(user)
+    return sucursal_id in ids
 
 
 @login_required
@@ -24,8 +31,11 @@ def caja_estado(request):
     Vista simple para mostrar cajas del día por sucursal accesible al usuario.
     (Opcional: si no la usas en urls, puedes omitirla.)
     """
-    rol, sucursales = role_and_sucursales(request.user)
-    cajas = Caja.objects.filter(sucursal__in=sucursales, fecha=timezone.now().date()).order_by('-creado_en')
+    rol, ids = role_and_sucursal_ids(request.user)
+    cajas = (
+        Caja.objects.filter(sucursal_id__in=ids, fecha=timezone.now().date())
+        .select_related('sucursal').order_by('-creado_en')
+    )
     return render(request, 'inventario/caja_estado.html', {
         'cajas': cajas,
         'rol': rol
@@ -38,13 +48,11 @@ def caja_abrir(request):
     Abre una caja para la sucursal permitida según el rol.
     Admin/Subadmin: pueden abrir para cualquiera; Cajero/Supervisión: solo su sucursal.
     """
-    rol, sucursales = role_and_sucursales(request.user)
-
     if request.method == 'POST':
         form = CajaAperturaForm(request.POST, user=request.user)
         if form.is_valid():
             caja = form.save(commit=False)
-            if not _usuario_puede_en_sucursal(request.user, caja.sucursal):
+            if not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
                 raise PermissionDenied("No tienes permiso para esta sucursal.")
 
             caja.apertura_usuario = request.user
@@ -60,23 +68,152 @@ def caja_abrir(request):
     return render(request, 'inventario/caja_abrir.html', {'form': form})
 
 
+# Ventas por página en caja_detalle y en "cargar más"
+VENTAS_POR_PAGINA = 50
+
+# Solo las columnas que muestra la tabla de ventas
+COLUMNAS_DETALLE = (
+    'id', 'creado_en', 'producto__nombre', 'cantidad', 'precio_unitario', 'total', 'usuario__username',
+)
+
+
+def _cursor(venta):
+    return f"{venta['creado_en'].isoformat()}|{venta['id']}"
+
+
+def _pagina_ventas(caja, cursor=None):
+    """
+    Página de ventas (más recientes primero) con paginación por cursor
+    (creado_en, id): cada página es un rango del índice, sin OFFSET.
+    Devuelve (ventas, cursor_siguiente_o_None). Lanza ValueError si el cursor es inválido.
+    """
+    qs = Venta.objects.filter(caja=caja)
+    if cursor:
+        fecha, _sep, venta_id = cursor.rpartition('|')
+        fecha, venta_id = datetime.fromisoformat(fecha), int(venta_id)
+        qs = qs.filter(Q(creado_en__lt=fecha) | Q(creado_en=fecha, id__lt=venta_id))
+    ventas = list(qs.order_by('-creado_en', '-id').values(*COLUMNAS_DETALLE)[:VENTAS_POR_PAGINA + 1])
+    if len(ventas) > VENTAS_POR_PAGINA:
+        ventas = ventas[:VENTAS_POR_PAGINA]
+        return ventas, _cursor(ventas[-1])
+    return ventas, None
+
+
 @login_required
 def caja_detalle(request, caja_id):
     """
-    Ver detalle de una caja (ventas, estado).
+    Ver detalle de una caja (ventas, estado). Muestra la primera página de
+    ventas; las siguientes se piden a caja_ventas_mas.
     """
     caja = get_object_or_404(Caja, id=caja_id)
 
-    if not _usuario_puede_en_sucursal(request.user, caja.sucursal):
+    if not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
         raise PermissionDenied("No tienes permiso para ver esta caja.")
 
-    ventas = caja.ventas.select_related('producto').order_by('-creado_en')
+    ventas, siguiente = _pagina_ventas(caja)
     return render(request, 'inventario/caja_detalle.html', {
         'caja': caja,
-        'ventas': ventas
+        'ventas': ventas,
+        'siguiente': siguiente,
     })
 
 
+@login_required
+def caja_ventas_mas(request, caja_id):
+    """
+    Siguiente página de ventas de la caja como JSON:
+    {"html": filas <tr> renderizadas, "siguiente": cursor o null}.
+    """
+    caja = get_object_or_404(Caja, id=caja_id)
+
+    if not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
+        raise PermissionDenied("No tienes permiso para ver esta caja.")
+
+    try:
+        ventas, siguiente = _pagina_ventas(caja, request.GET.get('cursor'))
+    except ValueError:
+        return JsonResponse({'error': 'Cursor inválido.'}, status=400)
+    html = render_to_string('inventario/_caja_ventas_filas.html', {'ventas': ventas})
+    return JsonResponse({'html': html, 'siguiente': siguiente})
+
+
+# Máximo de sugerencias por consulta del buscador
+SUGERENCIAS_MAX = 20
+
+
+@login_required
+def caja_productos_buscar(request, caja_id):
+    """
+    Buscador de productos para los formularios de venta/ticket:
+    ?q=texto (prefijos, ver busqueda.py), un código exacto o un id; ?n=cantidad (10 por defecto).
+    Devuelve {"productos": [{id, nombre, precio, stock}, ...]} de la sucursal de la caja.
+    """
+    caja = get_object_or_404(Caja, id=caja_id)
+
+    if not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
+        raise PermissionDenied("No tienes permiso para esta caja.")
+
+    q = request.GET.get('q', '').strip()
+    try:
+        n = min(max(int(request.GET.get('n', 10)), 1), SUGERENCIAS_MAX)
+    except ValueError:
+        n = 10
+    if not q:
+        return JsonResponse({'productos': []})
+
+    campos = ('id', 'nombre', 'precio', 'stock')
+    base = Producto.objects.filter(sucursal_id=caja.sucursal_id)
+    exacto = Q(codigo=q) | Q(id=int(q)) if q.isdecimal() else Q(codigo=q)
+    resultados = list(base.filter(exacto).values(*campos))
+    vistos = {p['id'] for p in resultados}
+    for p in busqueda.buscar(base, q).values(*campos)[:n]:
+        if p['id'] not in vistos and len(resultados) < n:
+            resultados.append(p)
+    return JsonResponse({'productos': [
+        {'id': p['id'], 'nombre': p['nombre'], 'precio': str(p['precio']), 'stock': p['stock']}
+        for p in resultados
+    ]})
+
+
+@login_required
+def caja_producto_escanear(request, caja_id):
+    """
+    Resuelve ?codigo= (código de barras / SKU) a un producto de la sucursal de la caja.
+    Una búsqueda por índice único, o ninguna si el código está en la caché (codigos.py).
+    """
+    caja = get_object_or_404(Caja.objects.only('id', 'sucursal_id'), id=caja_id)
+
+    if not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
+        raise PermissionDenied("No tienes permiso para esta caja.")
+
+    producto = codigos.resolver(caja.sucursal_id, request.GET.get('codigo'))
+    if producto is None:
+        return JsonResponse({'error': 'Código no encontrado.'}, status=404)
+    return JsonResponse({'id': producto['id'], 'nombre': producto['nombre'], 'precio': str(producto['precio'])})
+
+
+def _validar_operacion_en_caja(user, caja, accion="registrar ventas"):
+    """
+    Reglas para vender o cerrar una caja: solo 'Cajero', de la misma sucursal.
+    Lanza PermissionDenied; devuelve False si la caja no está ABIERTA.
+    """
+    if user_role(user) != 'Cajero':
+        raise PermissionDenied(f"Solo el Cajero puede {accion}.")
+    if caja.estado != 'ABIERTA':
+        return False
+    if not _usuario_puede_en_sucursal(user, caja.sucursal_id):
+        raise PermissionDenied("No tienes permiso para esta sucursal.")
+    return True
+
+
+def _avisar_reorden(request, producto_ids):
+    """Aviso tras vender: productos que quedaron en punto de reorden (consulta al índice parcial)."""
+    bajos = reorden.en_reorden(producto_ids)
+    if bajos:
+        detalle = ", ".join(f"{nombre} ({stock})" for _pid, nombre, stock in bajos)
+        messages.info(request, f"Reponer: {detalle}.")
+
+
 @login_required
 def venta_nueva(request, caja_id):
     """
@@ -86,33 +223,26 @@ def venta_nueva(request, caja_id):
     caja = get_object_or_404(Caja, id=caja_id)
 
     # Validaciones de permisos
-    if user_role(request.user) != 'Cajero':
-        raise PermissionDenied("Solo el Cajero puede registrar ventas.")
-    if caja.estado != 'ABIERTA':
+    if not _validar_operacion_en_caja(request.user, caja):
         messages.error(request, "La caja no está ABIERTA.")
         return redirect('caja_detalle', caja_id=caja.id)
-    if not _usuario_puede_en_sucursal(request.user, caja.sucursal):
-        raise PermissionDenied("No tienes permiso para esta sucursal.")
 
     if request.method == 'POST':
         form = VentaForm(request.POST, user=request.user, caja=caja)
         if form.is_valid():
-            venta = form.save(commit=False)
-            venta.caja = caja
-            venta.precio_unitario = venta.producto.precio
-            venta.total = venta.precio_unitario * venta.cantidad
-            venta.usuario = request.user
-            venta.save()
-
-            # Actualizar stock (sin bloquear ventas si hay poco stock; solo advertimos)
-            producto = venta.producto
-            if venta.cantidad > producto.stock:
-                messages.warning(request, "Stock insuficiente. Se registró la venta, revisa inventario.")
-            producto.stock = max(0, producto.stock - venta.cantidad)
-            producto.save()
-
-            messages.success(request, "Venta registrada.")
-            return redirect('caja_detalle', caja_id=caja.id)
+            try:
+                # Venta + descuento de stock (UPDATE condicional) en una transacción
+                _venta, alcanzo = registrar_venta(
+                    caja, form.cleaned_data['producto'], form.cleaned_data['cantidad'], request.user
+                )
+            except StockInsuficiente as exc:
+                form.add_error('cantidad', str(exc))
+            else:
+                if not alcanzo:
+                    messages.warning(request, "Stock insuficiente. Se registró la venta, revisa inventario.")
+                _avisar_reorden(request, [form.cleaned_data['producto'].id])
+                messages.success(request, "Venta registrada.")
+                return redirect('caja_detalle', caja_id=caja.id)
     else:
         form = VentaForm(user=request.user, caja=caja)
 
@@ -122,6 +252,65 @@ def venta_nueva(request, caja_id):
     })
 
 
+@login_required
+def ticket_nuevo(request, caja_id):
+    """
+    Registrar un ticket (varios productos) en un solo envío sobre una caja ABIERTA.
+    Mismas reglas que venta_nueva.
+    """
+    caja = get_object_or_404(Caja, id=caja_id)
+
+    if not _validar_operacion_en_caja(request.user, caja):
+        messages.error(request, "La caja no está ABIERTA.")
+        return redirect('caja_detalle', caja_id=caja.id)
+
+    errores = []
+    if request.method == 'POST':
+        formset = TicketLineaFormSet(request.POST)
+        if formset.is_valid():
+            lineas = [
+                (f.cleaned_data['producto'], f.cleaned_data['cantidad'])
+                for f in formset if f.cleaned_data
+            ]
+            try:
+                ticket, faltantes = registrar_ticket(caja, request.user, lineas)
+            except ValidationError as exc:
+                errores = exc.messages
+            except StockInsuficiente as exc:
+                errores = [str(exc)]
+            else:
+                if faltantes:
+                    messages.warning(request, "Stock insuficiente en algunos productos. Se registró el ticket, revisa inventario.")
+                _avisar_reorden(request, {pid for pid, _c in lineas})
+                messages.success(request, f"Ticket registrado. Total: {ticket.total}")
+                return redirect('caja_detalle', caja_id=caja.id)
+    else:
+        formset = TicketLineaFormSet()
+
+    return render(request, 'inventario/ticket_form.html', {
+        'caja': caja,
+        'formset': formset,
+        'errores': errores,
+    })
+
+
+def _cerrar_caja(caja, user):
+    """
+    Cierra la caja si sigue ABIERTA; False si ya estaba cerrada (p. ej. un doble
+    envío o dos cierres a la vez: solo el primero escribe cierre_usuario y monto).
+    """
+    # UPDATE directo: usa el contador vigente y no pisa ventas concurrentes con un save()
+    cerradas = Caja.objects.filter(pk=caja.pk, estado='ABIERTA').update(
+        cierre_monto=F('apertura_monto') + F('total_vendido'),
+        cierre_usuario=user,
+        estado='CERRADA',
+    )
+    if cerradas:
+        cache.invalidar_por(Caja)
+    caja.refresh_from_db()
+    return bool(cerradas)
+
+
 @login_required
 def caja_cerrar(request, caja_id):
     """
@@ -130,29 +319,20 @@ def caja_cerrar(request, caja_id):
     """
     caja = get_object_or_404(Caja, id=caja_id)
 
-    if user_role(request.user) != 'Cajero':
-        raise PermissionDenied("Solo el Cajero puede cerrar la caja.")
-    if caja.estado != 'ABIERTA':
+    if not _validar_operacion_en_caja(request.user, caja, "cerrar la caja"):
         messages.error(request, "La caja no está ABIERTA.")
         return redirect('caja_detalle', caja_id=caja.id)
-    if not _usuario_puede_en_sucursal(request.user, caja.sucursal):
-        raise PermissionDenied("No tienes permiso para esta sucursal.")
 
     if request.method == 'POST':
-        total_vendido = caja.ventas.aggregate(s=Sum('total'))['s'] or 0
-        caja.cierre_monto = caja.apertura_monto + total_vendido
-        caja.cierre_usuario = request.user
-        caja.estado = 'CERRADA'
-        caja.save()
+        if not _cerrar_caja(caja, request.user):
+            messages.error(request, "La caja ya está cerrada.")
+            return redirect('caja_detalle', caja_id=caja.id)
 
         messages.success(request, "Caja cerrada correctamente.")
         return redirect('caja_detalle', caja_id=caja.id)
 
-    total_vendido = caja.ventas.aggregate(s=Sum('total'))['s'] or 0
-    esperado = caja.apertura_monto + total_vendido
-
     return render(request, 'inventario/caja_cerrar.html', {
         'caja': caja,
-        'total_vendido': total_vendido,
-        'esperado': esperado
+        'total_vendido': caja.total_vendido,
+        'esperado': caja.apertura_monto + caja.total_vendido
     })
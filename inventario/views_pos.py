@@ -0,0 +1,185 @@
+# inventario/views_pos.py
+"""
+API JSON del punto de venta (abrir caja, registrar ventas, cerrar caja).
+Mismas reglas de permisos que views_caja, sin plantillas ni mensajes.
+"""
+import json
+from functools import wraps
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET, require_POST
+from django.core.exceptions import PermissionDenied, ValidationError
+
+from .models import Caja, Ticket
+from .forms import CajaAperturaForm
+from .stock import StockInsuficiente
+from . import cajas, codigos, reorden
+from .permissions import role_and_sucursal_ids, user_role
+from .ventas import registrar_ticket
+from .views_caja import _usuario_puede_en_sucursal, _validar_operacion_en_caja, _cerrar_caja
+
+# Tope de filas de api_stock_bajo (la lista completa sale de manage.py lista_reorden)
+API_STOCK_BAJO_MAX = 500
+
+# Rangos de los campos: un entero JSON mayor desborda el INTEGER de la base (500)
+ID_MAX = 2**63 - 1         # BigAutoField
+CANTIDAD_MAX = 2**31 - 1   # PositiveIntegerField
+
+
+def _login_json(vista):
+    """Como login_required, pero responde 401 en JSON en vez de redirigir."""
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'No autenticado.'}, status=401)
+        try:
+            return vista(request, *args, **kwargs)
+        except PermissionDenied as exc:
+            return JsonResponse({'error': str(exc) or 'Sin permiso.'}, status=403)
+    return envoltura
+
+
+def _leer_json(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+def _entero_positivo(valor, maximo):
+    """True si valor es un entero JSON entre 1 y maximo (no bool, float ni texto)."""
+    return isinstance(valor, int) and not isinstance(valor, bool) and 1 <= valor <= maximo
+
+
+def _linea_valida(linea):
+    """{"producto": id, "cantidad": n} o {"codigo": "...", "cantidad": n}, con enteros >= 1."""
+    if not isinstance(linea, dict) or not _entero_positivo(linea.get('cantidad'), CANTIDAD_MAX):
+        return False
+    if 'producto' in linea:
+        return _entero_positivo(linea['producto'], ID_MAX)
+    return isinstance(linea.get('codigo'), str)
+
+
+def _caja_json(caja):
+    return {
+        'id': caja.id,
+        'estado': caja.estado,
+        'sucursal': caja.sucursal_id,
+        'apertura_monto': str(caja.apertura_monto),
+        'total_vendido': str(caja.total_vendido),
+        'num_items': caja.num_items,
+        'num_ventas': caja.num_ventas,
+        'cierre_monto': str(caja.cierre_monto) if caja.cierre_monto is not None else None,
+    }
+
+
+def _ticket_json(ticket, faltantes, producto_ids, caja):
+    return JsonResponse({
+        'ticket': ticket.id,
+        'total': str(ticket.total),
+        'faltantes': sorted(faltantes),
+        # Productos del ticket que quedaron en punto de reorden
+        'reponer': [pid for pid, _n, _s in reorden.en_reorden(set(producto_ids))],
+        'caja': _caja_json(cajas.refrescar(caja)),
+    }, status=201)
+
+
+@require_POST
+@_login_json
+def api_caja_abrir(request):
+    """Body: {"sucursal": id, "fecha": "YYYY-MM-DD", "apertura_monto": "100.00"}"""
+    datos = _leer_json(request)
+    if not isinstance(datos, dict):
+        return JsonResponse({'error': 'Se espera un objeto JSON.'}, status=400)
+    form = CajaAperturaForm(datos, user=request.user)
+    if not form.is_valid():
+        return JsonResponse({'errores': form.errors}, status=400)
+    caja = form.save(commit=False)
+    if not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
+        raise PermissionDenied("No tienes permiso para esta sucursal.")
+    caja.apertura_usuario = request.user
+    caja.estado = 'ABIERTA'
+    caja.save()
+    return JsonResponse(_caja_json(caja), status=201)
+
+
+@require_POST
+@_login_json
+def api_venta(request, caja_id):
+    """
+    Body: {"lineas": [{"producto": id, "cantidad": n}, ...]}; en vez de "producto"
+    cada línea puede traer "codigo" (código de barras escaneado).
+    Cabecera opcional Idempotency-Key: un reintento con la misma clave devuelve
+    el mismo ticket en vez de cobrar de nuevo.
+    """
+    caja = get_object_or_404(Caja, id=caja_id)
+    clave = (request.headers.get('Idempotency-Key') or '').strip()[:64] or None
+    # Un reintento se responde con el ticket ya registrado aunque la caja se haya cerrado después
+    previo = clave and Ticket.objects.filter(caja=caja, clave_idempotencia=clave).first()
+    if previo:
+        if user_role(request.user) != 'Cajero' or not _usuario_puede_en_sucursal(request.user, caja.sucursal_id):
+            raise PermissionDenied("No tienes permiso para esta caja.")
+        return _ticket_json(previo, set(), previo.lineas.values_list('producto_id', flat=True), caja)
+    if not _validar_operacion_en_caja(request.user, caja):
+        return JsonResponse({'error': 'La caja no está ABIERTA.'}, status=409)
+
+    datos = _leer_json(request)
+    if not isinstance(datos, dict) or not isinstance(datos.get('lineas'), list):
+        return JsonResponse({'error': 'Se espera {"lineas": [...]}.'}, status=400)
+    lineas = []
+    for linea in datos['lineas']:
+        if not _linea_valida(linea):
+            return JsonResponse(
+                {'error': 'Cada línea necesita producto (o codigo) y cantidad, enteros mayores que 0.'}, status=400
+            )
+        if 'producto' in linea:
+            lineas.append((linea['producto'], linea['cantidad']))
+            continue
+        producto = codigos.resolver(caja.sucursal_id, linea['codigo'])
+        if producto is None:
+            return JsonResponse({'errores': [f"Código no encontrado: {linea['codigo']}"]}, status=400)
+        lineas.append((producto['id'], linea['cantidad']))
+
+    try:
+        ticket, faltantes = registrar_ticket(caja, request.user, lineas, clave_idempotencia=clave)
+    except (ValidationError, ValueError) as exc:
+        mensajes = exc.messages if isinstance(exc, ValidationError) else ["Línea inválida."]
+        return JsonResponse({'errores': mensajes}, status=400)
+    except StockInsuficiente as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+
+    return _ticket_json(ticket, faltantes, [pid for pid, _c in lineas], caja)
+
+
+
+@require_POST
+@_login_json
+def api_caja_cerrar(request, caja_id):
+    caja = get_object_or_404(Caja, id=caja_id)
+    if not _validar_operacion_en_caja(request.user, caja, "cerrar la caja"):
+        return JsonResponse({'error': 'La caja no está ABIERTA.'}, status=409)
+    if not _cerrar_caja(caja, request.user):
+        return JsonResponse({'error': 'La caja ya está cerrada.'}, status=409)
+    return JsonResponse(_caja_json(caja))
+
+
+@require_GET
+@_login_json
+def api_stock_bajo(request):
+    """
+    Productos a reponer de las sucursales del usuario (?sucursal=id para una sola).
+    {"productos": [{id, sucursal, codigo, nombre, stock, punto_reorden}, ...]}
+    """
+    _rol, ids = role_and_sucursal_ids(request.user)
+    sucursal = request.GET.get('sucursal')
+    if sucursal:
+        if not sucursal.isdecimal() or int(sucursal) not in ids:
+            raise PermissionDenied("No tienes permiso para esta sucursal.")
+        ids = [int(sucursal)]
+    filas = reorden.stock_bajo(ids).values('id', 'sucursal_id', 'codigo', 'nombre', 'stock', 'punto_reorden')
+    return JsonResponse({'productos': [
+        {'id': f['id'], 'sucursal': f['sucursal_id'], 'codigo': f['codigo'], 'nombre': f['nombre'],
+         'stock': f['stock'], 'punto_reorden': f['punto_reorden']}
+        for f in filas[:API_STOCK_BAJO_MAX]
+    ]})
@@ -1,14 +1,15 @@
 # inventario/views_productos.py
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, FormView
 from django.urls import reverse_lazy
 from django.core.exceptions import PermissionDenied
 from django.contrib import messages
-from django.db.models import Q
+from django.utils.dateparse import parse_date
 
-from .forms import ProductoForm
+from .forms import ProductoForm, ProductoImportarForm
 from .models import Producto
-from .permissions import role_and_sucursales, user_role
+from .permissions import nombres_de_sucursales, role_and_sucursal_ids, user_role
+from . import busqueda, importacion, movimientos, reorden
 
 
 ALLOWED_ROLES_FOR_EDIT = {'Administrador', 'Subadministrador'}
@@ -18,13 +19,13 @@ class ProductoBase(LoginRequiredMixin):
     """Utilidades comunes para vistas de productos."""
 
     def get_rol_y_sucursales(self):
-        return role_and_sucursales(self.request.user)
+        return role_and_sucursal_ids(self.request.user)
 
     def filtrar_por_permiso(self, qs):
-        rol, sucursales = self.get_rol_y_sucursales()
+        rol, ids = self.get_rol_y_sucursales()
         if rol in ALLOWED_ROLES_FOR_EDIT:
             return qs
-        return qs.filter(sucursal__in=sucursales)
+        return qs.filter(sucursal_id__in=ids)
 
     def check_permiso_edicion(self):
         if user_role(self.request.user) not in ALLOWED_ROLES_FOR_EDIT:
@@ -41,19 +42,47 @@ class ProductoListView(ProductoBase, ListView):
         qs = Producto.objects.select_related('sucursal').order_by('-fecha_creacion', 'nombre')
         qs = self.filtrar_por_permiso(qs)
 
-        # Búsqueda básica ?q=texto
+        # Búsqueda ?q=texto (FTS5 por prefijo y relevancia; icontains en otras BD)
         q = self.request.GET.get('q')
         if q:
-            qs = qs.filter(
-                Q(nombre__icontains=q) |
-                Q(descripcion__icontains=q) |
-                Q(sucursal__nombre__icontains=q)
-            )
+            qs = busqueda.buscar(qs, q)
         return qs
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx['q'] = self.request.GET.get('q', '')
+
+        # ?al=AAAA-MM-DD: stock al cierre de ese día (corte + movimientos), solo de la página
+        try:
+            al = parse_date(self.request.GET.get('al') or '')
+        except ValueError:
+            al = None
+        if al:
+            productos = ctx['productos']
+            stock = movimientos.stock_al(al, Producto.objects.filter(pk__in=[p.pk for p in productos]))
+            for p in productos:
+                p.stock_al = stock.get(p.pk, 0)
+        ctx['al'] = al
+        return ctx
+
+
+class ProductoStockBajoView(ProductoBase, ListView):
+    """Productos a reponer (stock <= punto de reorden) de las sucursales permitidas."""
+    template_name = 'inventario/producto_stock_bajo.html'
+    context_object_name = 'productos'
+    paginate_by = 50
+
+    def get_queryset(self):
+        _rol, ids = self.get_rol_y_sucursales()
+        sucursal = self.request.GET.get('sucursal')
+        if sucursal and sucursal.isdecimal() and int(sucursal) in ids:
+            ids = [int(sucursal)]
+        return reorden.lista(ids)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx['sucursales'] = [{'id': i, 'nombre': n} for i, n in nombres_de_sucursales(self.get_rol_y_sucursales()[1])]
+        ctx['sucursal'] = self.request.GET.get('sucursal', '')
         return ctx
 
 
@@ -101,6 +130,42 @@ class ProductoUpdateView(ProductoBase, UpdateView):
         return super().form_valid(form)
 
 
+class ProductoImportarView(ProductoBase, FormView):
+    """Carga masiva de productos desde CSV/XLSX (mismo proceso que importar_productos)."""
+    form_class = ProductoImportarForm
+    template_name = 'inventario/producto_importar.html'
+
+    # Errores que se muestran en pantalla (el resto solo se cuenta)
+    MAX_ERRORES = 200
+
+    def dispatch(self, request, *args, **kwargs):
+        self.check_permiso_edicion()
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        archivo = form.cleaned_data['archivo']
+        try:
+            res = importacion.importar(
+                importacion.leer_filas(archivo, archivo.name), form.cleaned_data['sucursal'].id
+            )
+        except (ValueError, UnicodeDecodeError) as exc:
+            form.add_error('archivo', f"No se pudo leer el archivo: {exc}")
+            return self.form_invalid(form)
+        messages.success(
+            self.request,
+            f"Importación terminada: {res.creados} creado(s), {res.actualizados} actualizado(s), "
+            f"{len(res.errores)} fila(s) con error."
+        )
+        return self.render_to_response(self.get_context_data(
+            form=form, resultado=res, errores=res.errores[:self.MAX_ERRORES],
+        ))
+
+
 class ProductoDeleteView(ProductoBase, DeleteView):
     model = Producto
     template_name = 'inventario/producto_confirm_delete.html'
@@ -1,47 +1,33 @@
 # inventario/views_reportes.py
-import csv, json
-from datetime import datetime, date, timedelta
-from django.http import HttpResponse
-from django.shortcuts import render
+import hashlib
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse, Http404, JsonResponse
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from django.views.decorators.vary import vary_on_cookie
 from django.core.exceptions import PermissionDenied
-from django.db.models import Sum, F
-from django.utils.timezone import make_naive
+from django.utils import timezone
 
-from .models import Venta, Sucursal, Producto
-from .permissions import role_and_sucursales
+from .models import ReporteJob
+from .permissions import nombres_de_sucursales
+from .consultas import VentasQuery, alcance_de, permitidas_de
+from .exportes import openpyxl, csv_stream, xlsx_spool
+from . import cache, dashboard, reportes_jobs
 
-try:
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-except Exception:
-    openpyxl = None  # Si no está instalado, mostramos instrucción en la vista
 
-
-def _parse_date(value, default=None):
-    try:
-        return datetime.strptime(value, "%Y-%m-%d").date()
-    except Exception:
-        return default
-
-
-def _permitted_sucursales(request):
-    """Devuelve (rol, queryset_sucursales_permitidas, ids_permitidos_o_None)"""
-    rol, sucursales = role_and_sucursales(request.user)
-    if rol in ['Administrador', 'Subadministrador']:
-        return rol, Sucursal.objects.all(), None  # None significa sin restricción
-    ids = [s.id for s in sucursales]
-    return rol, Sucursal.objects.filter(id__in=ids), ids
+def _sucursales_para_elegir(request):
+    """[{'id', 'nombre'}, ...] de las sucursales permitidas para los selectores, desde la caché."""
+    return [{'id': i, 'nombre': n} for i, n in nombres_de_sucursales(permitidas_de(request.user))]
 
 
 @login_required
 def reportes_home(request):
     """Pantalla simple con filtros y enlace a CSV/Excel/Dashboard."""
-    rol, qs_suc, _ids = _permitted_sucursales(request)
-    hoy = date.today()
     ctx = {
-        'sucursales': qs_suc,
-        'hoy': hoy,
+        'sucursales': _sucursales_para_elegir(request),
+        'hoy': timezone.localdate(),
         'excel_disponible': bool(openpyxl),
     }
     return render(request, "reportes/reporte_ventas.html", ctx)
@@ -51,54 +37,14 @@ def reportes_home(request):
 def reporte_ventas_csv(request):
     """
     Exporta ventas a CSV: ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD&sucursal=<id|all>
-    Respeta permisos por rol.
+    Respeta permisos por rol. La respuesta se transmite por bloques (streaming),
+    así que la memoria del worker es constante sin importar el rango.
     """
-    rol, _qs_suc, permitidas_ids = _permitted_sucursales(request)
-
-    desde = _parse_date(request.GET.get("desde"), default=date.today())
-    hasta = _parse_date(request.GET.get("hasta"), default=date.today())
-    sucursal_param = request.GET.get("sucursal", "all")
-
-    qs = Venta.objects.select_related("producto", "caja", "usuario", "caja__sucursal")
-    qs = qs.filter(creado_en__date__gte=desde, creado_en__date__lte=hasta)
-
-    if sucursal_param != "all":
-        try:
-            suc_id = int(sucursal_param)
-        except ValueError:
-            raise PermissionDenied("Parámetro de sucursal inválido.")
-        if permitidas_ids is not None and suc_id not in permitidas_ids:
-            raise PermissionDenied("No tienes permiso para esta sucursal.")
-        qs = qs.filter(caja__sucursal_id=suc_id)
-    else:
-        if permitidas_ids is not None:
-            qs = qs.filter(caja__sucursal_id__in=permitidas_ids)
-
-    filename = f"ventas_{desde.isoformat()}_a_{hasta.isoformat()}.csv"
-    resp = HttpResponse(content_type="text/csv; charset=utf-8")
+    consulta = VentasQuery.de_request(request)
+
+    filename = f"ventas_{consulta.desde.isoformat()}_a_{consulta.hasta.isoformat()}.csv"
+    resp = StreamingHttpResponse(csv_stream(consulta.ventas()), content_type="text/csv; charset=utf-8")
     resp['Content-Disposition'] = f'attachment; filename="{filename}"'
-    writer = csv.writer(resp)
-    writer.writerow([
-        "Fecha/Hora", "Sucursal", "Caja ID", "Producto", "Cantidad",
-        "Precio Unitario", "Total", "Usuario"
-    ])
-
-    total_general = 0
-    for v in qs.order_by("creado_en"):
-        writer.writerow([
-            make_naive(v.creado_en).strftime("%Y-%m-%d %H:%M"),
-            v.caja.sucursal.nombre,
-            v.caja_id,
-            v.producto.nombre,
-            v.cantidad,
-            f"{v.precio_unitario}",
-            f"{v.total}",
-            getattr(v.usuario, "username", "-"),
-        ])
-        total_general += float(v.total)
-
-    writer.writerow([])
-    writer.writerow(["", "", "", "", "", "TOTAL", f"{total_general:.2f}", ""])
     return resp
 
 
@@ -107,6 +53,8 @@ def reporte_ventas_excel(request):
     """
     Exporta ventas a Excel (XLSX): ?desde=&hasta=&sucursal=
     Requiere openpyxl: pip install openpyxl
+    El libro se genera en modo write_only sobre un archivo temporal que luego
+    se transmite al cliente.
     """
     if openpyxl is None:
         # Mensaje claro si falta la librería
@@ -115,130 +63,152 @@ def reporte_ventas_excel(request):
             status=501, content_type="text/plain; charset=utf-8"
         )
 
-    rol, _qs_suc, permitidas_ids = _permitted_sucursales(request)
-
-    desde = _parse_date(request.GET.get("desde"), default=date.today())
-    hasta = _parse_date(request.GET.get("hasta"), default=date.today())
-    sucursal_param = request.GET.get("sucursal", "all")
-
-    qs = Venta.objects.select_related("producto", "caja", "usuario", "caja__sucursal")
-    qs = qs.filter(creado_en__date__gte=desde, creado_en__date__lte=hasta)
-
-    if sucursal_param != "all":
-        try:
-            suc_id = int(sucursal_param)
-        except ValueError:
-            raise PermissionDenied("Parámetro de sucursal inválido.")
-        if permitidas_ids is not None and suc_id not in permitidas_ids:
-            raise PermissionDenied("No tienes permiso para esta sucursal.")
-        qs = qs.filter(caja__sucursal_id=suc_id)
-    else:
-        if permitidas_ids is not None:
-            qs = qs.filter(caja__sucursal_id__in=permitidas_ids)
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Ventas"
-
-    headers = ["Fecha/Hora", "Sucursal", "Caja ID", "Producto", "Cantidad", "Precio Unitario", "Total", "Usuario"]
-    ws.append(headers)
-
-    total_general = 0
-    for v in qs.order_by("creado_en"):
-        row = [
-            make_naive(v.creado_en).strftime("%Y-%m-%d %H:%M"),
-            v.caja.sucursal.nombre,
-            v.caja_id,
-            v.producto.nombre,
-            v.cantidad,
-            float(v.precio_unitario),
-            float(v.total),
-            getattr(v.usuario, "username", "-"),
-        ]
-        total_general += float(v.total)
-        ws.append(row)
-
-    ws.append([])
-    ws.append(["", "", "", "", "", "TOTAL", total_general, ""])
-
-    # Ajuste básico de ancho
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[get_column_letter(col)].auto_size = True
-
-    filename = f"ventas_{desde.isoformat()}_a_{hasta.isoformat()}.xlsx"
-    resp = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    consulta = VentasQuery.de_request(request)
+
+    filename = f"ventas_{consulta.desde.isoformat()}_a_{consulta.hasta.isoformat()}.xlsx"
+    return FileResponse(
+        xlsx_spool(consulta.ventas()),
+        as_attachment=True,
+        filename=filename,
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    resp['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(resp)
-    return resp
+
+
+def _job_json(job):
+    data = {
+        "id": job.id,
+        "estado": job.estado,
+        "url_estado": reverse("reporte_job_estado", args=[job.id]),
+    }
+    if job.estado == 'LISTO':
+        data["url_descarga"] = reverse("reporte_job_descargar", args=[job.id])
+    elif job.estado == 'ERROR':
+        data["error"] = job.error
+    return data
+
+
+def _job_visible(request, job_id):
+    """El job es visible para quien lo pidió o para quien tiene el mismo alcance."""
+    job = get_object_or_404(ReporteJob, id=job_id)
+    if job.usuario_id != request.user.id and job.alcance != alcance_de(permitidas_de(request.user)):
+        raise PermissionDenied("No tienes permiso para este reporte.")
+    return job
+
+
+@login_required
+@require_POST
+def reporte_job_crear(request):
+    """
+    Encola una exportación en segundo plano (POST: formato=csv|xlsx, desde, hasta, sucursal).
+    Si ya existe un reporte equivalente en curso o vigente, se devuelve ese.
+    """
+    formato = request.POST.get("formato", "csv")
+    if formato not in dict(ReporteJob.FORMATOS):
+        return JsonResponse({"error": "Formato inválido."}, status=400)
+    if formato == "xlsx" and openpyxl is None:
+        return JsonResponse({"error": "Para exportar a Excel instala openpyxl."}, status=501)
+
+    consulta = VentasQuery.de_request(request, request.POST)
+    job = reportes_jobs.solicitar(request.user, formato, consulta)
+    return JsonResponse(_job_json(job), status=202)
+
+
+@login_required
+def reporte_job_estado(request, job_id):
+    """Estado de un reporte en segundo plano (para consultar periódicamente)."""
+    return JsonResponse(_job_json(_job_visible(request, job_id)))
+
+
+@login_required
+def reporte_job_descargar(request, job_id):
+    job = _job_visible(request, job_id)
+    if job.estado != 'LISTO' or not job.archivo:
+        return JsonResponse(_job_json(job), status=409)
+    filename = f"ventas_{job.desde.isoformat()}_a_{job.hasta.isoformat()}.{job.formato}"
+    return FileResponse(job.archivo.open("rb"), as_attachment=True, filename=filename)
+
+
+def _consulta_dashboard(request):
+    """VentasQuery del dashboard (por defecto los últimos 30 días), memorizada en el request."""
+    memo = getattr(request, "_consulta_dashboard", None)
+    if memo is None:
+        memo = request._consulta_dashboard = VentasQuery.de_request(request, dias=30)
+    return memo
+
+
+SERIES_DASHBOARD = ("dias", "productos", "sucursales")
+
+
+def _huella(request):
+    """
+    (hash, ultima_venta) de los datos del dashboard: rango, alcance, id y fecha
+    de la venta más reciente (una fila por índice, VentasQuery.huella) y las
+    versiones de 'catalogo' (renombres de productos/sucursales) y 'bajas'
+    (ventas borradas). Con datos sin cambios el 304 cuesta esa sola consulta.
+    """
+    memo = getattr(request, "_huella_dashboard", None)
+    if memo is None:
+        c = _consulta_dashboard(request)
+        agg = c.huella()
+        firma = (f"{c.desde}:{c.hasta}:{c.alcance}:{agg['ultimo'] or 0}:{agg['modificado']}:"
+                 f"{cache.version('catalogo')}:{cache.version('bajas')}")
+        memo = request._huella_dashboard = (hashlib.md5(firma.encode()).hexdigest(), agg["modificado"])
+    return memo
+
+
+def _huella_dashboard(request, serie):
+    """(etag, ultima_venta) de una serie: la huella común con el nombre de la serie."""
+    if serie not in SERIES_DASHBOARD:
+        raise Http404("Serie desconocida.")
+    huella, modificado = _huella(request)
+    return f"{serie}-{huella}", modificado
+
+
+@login_required
+@vary_on_cookie
+# no-cache: navegador y proxy guardan la respuesta pero revalidan siempre (con la
+# sesión, así que los permisos se vuelven a comprobar); Vary: Cookie la separa por usuario
+@cache_control(no_cache=True)
+@condition(
+    etag_func=lambda request, serie: _huella_dashboard(request, serie)[0],
+    last_modified_func=lambda request, serie: _huella_dashboard(request, serie)[1],
+)
+def reportes_dashboard_datos(request, serie):
+    """
+    JSON {"labels": [...], "data": [...]} de una serie del dashboard (dias,
+    productos o sucursales) con los mismos filtros GET que la página. Lleva
+    ETag y Last-Modified: si no entraron ventas al rango el navegador recibe
+    un 304 sin que se recalcule nada.
+    """
+    c = _consulta_dashboard(request)
+    # Las tres series salen de una sola consulta (dashboard.series) y se cachean juntas:
+    # la primera gráfica en pedir calcula y las otras dos leen de la caché. La clave es
+    # la huella del ETag (que ya incluye rango y alcance): el cuerpo siempre corresponde
+    # al ETag con que sale, aunque otro proceso haya invalidado su propia caché local
+    huella, _modificado = _huella(request)
+    todas = cache.obtener("dashboard", huella, lambda: dashboard.series(c))
+    labels, data = todas[serie]
+    return JsonResponse({"labels": labels, "data": data})
 
 
 @login_required
 def reportes_dashboard(request):
     """
     Dashboard con tres gráficas:
-      - Ventas por día (últimos 30 días)
+      - Ventas por día (del rango; por defecto los últimos 30 días)
       - Ventas por producto (top 10 en el rango)
       - Ventas por sucursal (en el rango)
     Filtros opcionales: ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD&sucursal=<id|all>
+    La página solo trae los filtros; cada gráfica pide su serie a
+    reportes_dashboard_datos.
     """
-    rol, qs_suc, permitidas_ids = _permitted_sucursales(request)
-
-    # Rango por defecto: últimos 30 días
-    hoy = date.today()
-    default_desde = hoy - timedelta(days=29)
-    desde = _parse_date(request.GET.get("desde"), default=default_desde)
-    hasta = _parse_date(request.GET.get("hasta"), default=hoy)
-    sucursal_param = request.GET.get("sucursal", "all")
-
-    qs = Venta.objects.select_related("producto", "caja", "caja__sucursal")
-    qs = qs.filter(creado_en__date__gte=desde, creado_en__date__lte=hasta)
-
-    if sucursal_param != "all":
-        try:
-            suc_id = int(sucursal_param)
-        except ValueError:
-            raise PermissionDenied("Parámetro de sucursal inválido.")
-        if permitidas_ids is not None and suc_id not in permitidas_ids:
-            raise PermissionDenied("No tienes permiso para esta sucursal.")
-        qs = qs.filter(caja__sucursal_id=suc_id)
-    else:
-        if permitidas_ids is not None:
-            qs = qs.filter(caja__sucursal_id__in=permitidas_ids)
-
-    # Serie diaria (línea)
-    dias = [default_desde + timedelta(days=i) for i in range((hasta - default_desde).days + 1)]
-    mapa_dias = {d: 0.0 for d in dias}
-    agreg_dia = qs.values("creado_en__date").annotate(total=Sum("total"))
-    for item in agreg_dia:
-        d = item["creado_en__date"]
-        if d in mapa_dias:
-            mapa_dias[d] = float(item["total"] or 0)
-    labels_dias = [d.strftime("%Y-%m-%d") for d in dias]
-    data_dias = [mapa_dias[d] for d in dias]
-
-    # Top productos (barras)
-    agreg_prod = qs.values("producto__nombre").annotate(total=Sum("total")).order_by("-total")[:10]
-    labels_prod = [x["producto__nombre"] for x in agreg_prod]
-    data_prod = [float(x["total"] or 0) for x in agreg_prod]
-
-    # NUEVO: Ventas por sucursal (dona/barras)
-    agreg_suc = qs.values("caja__sucursal__nombre").annotate(total=Sum("total")).order_by("-total")
-    labels_suc = [x["caja__sucursal__nombre"] or "Sin sucursal" for x in agreg_suc]
-    data_suc = [float(x["total"] or 0) for x in agreg_suc]
-
+    c = _consulta_dashboard(request)
     ctx = {
-        "sucursales": qs_suc,
-        "desde": desde,
-        "hasta": hasta,
-        "labels_dias": json.dumps(labels_dias),
-        "data_dias": json.dumps(data_dias),
-        "labels_prod": json.dumps(labels_prod),
-        "data_prod": json.dumps(data_prod),
-        "labels_suc": json.dumps(labels_suc),
-        "data_suc": json.dumps(data_suc),
-        "sucursal_param": sucursal_param,
-        "hoy": hoy,
+        "sucursales": _sucursales_para_elegir(request),
+        "desde": c.desde,
+        "hasta": c.hasta,
+        "sucursal_param": request.GET.get("sucursal", "all"),
+        "hoy": timezone.localdate(),
+        "series": {serie: reverse("reportes_dashboard_datos", args=[serie]) for serie in SERIES_DASHBOARD},
     }
     return render(request, "reportes/dashboard.html", ctx)
@@ -0,0 +1,87 @@
+# inventario/views_transferencias.py
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.contrib import messages
+
+from .models import Transferencia
+from .forms import TransferenciaForm, TransferenciaLineaFormSet
+from .permissions import user_role, ROLES_GLOBALES
+from .stock import StockInsuficiente
+from .transferencias import transferir
+
+
+def _validar_permiso(user):
+    """Las transferencias tocan dos sucursales: solo Administrador/Subadministrador."""
+    if user_role(user) not in ROLES_GLOBALES:
+        raise PermissionDenied("No tienes permiso para transferir stock entre sucursales.")
+
+
+@login_required
+def transferencia_lista(request):
+    _validar_permiso(request.user)
+    qs = (
+        Transferencia.objects.select_related('origen', 'destino', 'usuario')
+        .annotate(num_lineas=Count('lineas'))
+        .order_by('-creado_en', '-id')
+    )
+    pagina = Paginator(qs, 20).get_page(request.GET.get('page'))
+    return render(request, 'inventario/transferencia_list.html', {'pagina': pagina})
+
+
+@login_required
+def transferencia_nueva(request):
+    """
+    Crea y aplica una transferencia. Las líneas usan ids de producto de la
+    sucursal de origen; en el destino se emparejan por código o nombre.
+    """
+    _validar_permiso(request.user)
+
+    errores = []
+    if request.method == 'POST':
+        form = TransferenciaForm(request.POST)
+        formset = TransferenciaLineaFormSet(request.POST)
+        if form.is_valid() and formset.is_valid():
+            lineas = [
+                (f.cleaned_data['producto'], f.cleaned_data['cantidad'])
+                for f in formset if f.cleaned_data
+            ]
+            try:
+                transferencia = transferir(
+                    form.cleaned_data['origen'].id, form.cleaned_data['destino'].id,
+                    request.user, lineas, form.cleaned_data['nota'],
+                )
+            except ValidationError as exc:
+                errores = exc.messages
+            except StockInsuficiente:
+                errores = ["Stock insuficiente en la sucursal de origen. No se transfirió nada."]
+            else:
+                messages.success(request, f"Transferencia #{transferencia.id} aplicada.")
+                return redirect('transferencia_detalle', transferencia_id=transferencia.id)
+    else:
+        form = TransferenciaForm()
+        formset = TransferenciaLineaFormSet()
+
+    return render(request, 'inventario/transferencia_form.html', {
+        'form': form,
+        'formset': formset,
+        'errores': errores,
+    })
+
+
+@login_required
+def transferencia_detalle(request, transferencia_id):
+    _validar_permiso(request.user)
+    transferencia = get_object_or_404(
+        Transferencia.objects.select_related('origen', 'destino', 'usuario'), id=transferencia_id
+    )
+    lineas = transferencia.lineas.values(
+        'cantidad', 'producto_origen_id', 'producto_origen__nombre', 'producto_origen__codigo',
+        'producto_destino_id',
+    ).order_by('id')
+    return render(request, 'inventario/transferencia_detalle.html', {
+        'transferencia': transferencia,
+        'lineas': lineas,
+    })
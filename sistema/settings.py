@@ -1,4 +1,5 @@
 # sistema/settings.py
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -24,12 +25,16 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'inventario.middleware.PrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'sistema.urls'
 
+# Carga el Perfil (y su sucursal) junto con el usuario de la sesión
+AUTHENTICATION_BACKENDS = ['inventario.backends.PerfilBackend']
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -51,13 +56,78 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'sistema.wsgi.application'
 
-# Base de datos (SQLite por simplicidad)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Base de datos: perfil elegido con INVENTARIO_DB
+#     (timeout e IMMEDIATE aquí; WAL y demás PRAGMA en inventario/basedatos.py; INVENTARIO_SQLITE_AJUSTES=0 los apaga)
+#     (WAL, busy_timeout, etc. en inventario/basedatos.py; INVENTARIO_SQLITE_AJUSTES=0 los apaga)
+#   postgres: POSTGRES_DB/USER/PASSWORD/HOST/PORT con conexiones persistentes
+#     (DB_CONN_MAX_AGE segundos) o, con POSTGRES_POOL=1, el pool de psycopg 3
+INVENTARIO_DB = os.environ.get('INVENTARIO_DB', 'sqlite')
+INVENTARIO_SQLITE_AJUSTES = os.environ.get('INVENTARIO_SQLITE_AJUSTES', '1') != '0'
+
+if INVENTARIO_DB == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'inventario'),
+            'USER': os.environ.get('POSTGRES_USER', 'inventario'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            # Descarta conexiones persistentes caídas antes de usarlas
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+    if os.environ.get('POSTGRES_POOL') == '1':
+        # Pool de psycopg 3 (pip install "psycopg[pool]"); no admite CONN_MAX_AGE
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {'pool': {
+            'min_size': int(os.environ.get('POSTGRES_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('POSTGRES_POOL_MAX', '10')),
+        }}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+    if INVENTARIO_SQLITE_AJUSTES:
+        DATABASES['default']['OPTIONS'] = {
+            # Segundos esperando el lock de escritura antes de "database is locked"
+            'timeout': 20,
+            # BEGIN IMMEDIATE: toma el lock al empezar la transacción; con DEFERRED
+            # dos transacciones que leen y luego escriben fallan sin esperar el timeout
+            'transaction_mode': 'IMMEDIATE',
+        }
+
+# Caché: backend elegido con INVENTARIO_CACHE (la app la usa vía inventario/cache.py)
+#   local (por defecto): memoria de cada proceso; basta con un solo proceso
+#   archivo: FileBasedCache en CACHE_DIR, compartida por los procesos del servidor
+#   bd: tabla inventario_cache en la base de datos (crear con manage.py createcachetable)
+INVENTARIO_CACHE = os.environ.get('INVENTARIO_CACHE', 'local')
+
+if INVENTARIO_CACHE == 'archivo':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }}
+elif INVENTARIO_CACHE == 'bd':
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'inventario_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }}
+else:
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventario',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }}
+
+# TTL por espacio de caché en segundos, p. ej. {'dashboard': 120} (ver inventario/cache.py)
+INVENTARIO_CACHE_TTL = {}
 
 # Archivos estáticos
 STATIC_URL = 'static/'
@@ -82,3 +152,7 @@ USE_I18N = True
 USE_TZ = True
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Ventas con stock insuficiente: True = se registran y el stock queda en 0;
+# False = se rechazan (ver inventario/stock.py)
+INVENTARIO_PERMITIR_SOBREVENTA = True